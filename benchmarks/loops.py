@@ -0,0 +1,132 @@
+"""
+Benchmark the event loops (see `fastchecks.loops.EVENT_LOOP_NAMES`) running many checks against a local test server.
+
+For each event loop, the checks of `--num_checks` urls (with a regex, on a local server run in another process) are scheduled
+with the native scheduler every second, for `--duration` seconds; it measures:
+* checks/s: the completed checks per second.
+* lag p50 & p99 (ms): how late the loop's timers fire, sampled every 10ms; i.e. how late the scheduler fires the checks when the loop is busy.
+
+Run from the repository's root (uvloop requires `pip install uvloop`), e.g.:
+
+    python -m benchmarks.loops --num_checks 2000 --duration 10
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import subprocess
+import sys
+
+import aiohttp
+from aiohttp import web
+
+from fastchecks.check import check_website
+from fastchecks.loops import EVENT_LOOP_NAMES, event_loop_factory
+from fastchecks.scheduling import HeapScheduler, phase_offset_seconds
+from fastchecks.types import WebsiteCheck
+
+INTERVAL_SECONDS = 1.0
+
+LAG_SAMPLE_PERIOD_SECONDS = 0.01
+
+BODY = "<html><body>" + "Lorem ipsum dolor sit amet. " * 100 + "fastchecks</body></html>"
+
+
+def serve(port: int) -> None:
+    async def page(request: web.Request) -> web.Response:
+        return web.Response(text=BODY, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{name}", page)
+    web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_until_serving(port: int, timeout: float = 10) -> None:
+    async with asyncio.timeout(timeout):
+        while True:
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.close()
+                return
+            except OSError:
+                await asyncio.sleep(0.1)
+
+
+async def _sample_lags(lags: list[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + LAG_SAMPLE_PERIOD_SECONDS
+        await asyncio.sleep(LAG_SAMPLE_PERIOD_SECONDS)
+        lags.append(loop.time() - expected)
+
+
+async def bench(port: int, num_checks: int, duration: float, max_concurrency: int) -> tuple[float, float, float]:
+    await _wait_until_serving(port)
+
+    checks = [
+        WebsiteCheck.with_validation(f"http://127.0.0.1:{port}/page{i}", regex="fastchecks") for i in range(num_checks)
+    ]
+    completed = 0
+    lags: list[float] = []
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=max_concurrency)) as session:
+
+        async def fun(check: WebsiteCheck) -> None:
+            nonlocal completed
+            await check_website(session, check)
+            completed += 1
+
+        scheduler = HeapScheduler(fun, num_workers=max_concurrency)
+        scheduler.add_many(
+            (check.url, check, INTERVAL_SECONDS, phase_offset_seconds(check.url, INTERVAL_SECONDS)) for check in checks
+        )
+
+        sampler = asyncio.create_task(_sample_lags(lags))
+        runner = asyncio.create_task(scheduler.run_until_stopped())
+        await asyncio.sleep(duration)
+        scheduler.stop()
+        await runner
+        sampler.cancel()
+
+    percentiles = statistics.quantiles(lags, n=100)
+    return completed / duration, percentiles[49] * 1000, percentiles[98] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loops", choices=EVENT_LOOP_NAMES, nargs="+", default=list(EVENT_LOOP_NAMES))
+    parser.add_argument("--num_checks", type=int, default=2000, help="Number of checks, each fired every second")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to run the checks with each loop")
+    parser.add_argument("--max_concurrency", type=int, default=100, help="Number of workers of the native scheduler")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve is not None:
+        serve(args.serve)
+        return
+
+    port = _free_port()
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.loops", "--serve", str(port)])  # nosec B603
+
+    try:
+        print(f"{'loop':<8} {'checks':>7} {'checks/s':>9} {'lag p50 (ms)':>13} {'lag p99 (ms)':>13}")
+        for name in args.loops:
+            with asyncio.Runner(loop_factory=event_loop_factory(name)) as runner:
+                checks_per_second, lag_p50, lag_p99 = runner.run(
+                    bench(port, args.num_checks, args.duration, args.max_concurrency)
+                )
+            print(f"{name:<8} {args.num_checks:>7} {checks_per_second:>9.1f} {lag_p50:>13.2f} {lag_p99:>13.2f}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark the scheduler engines (see `fastchecks.scheduling.SCHEDULER_NAMES`) with many no-op scheduled jobs.
+
+For each engine and number of jobs, it measures:
+* add: the time to register all jobs (& the peak memory allocated meanwhile, with tracemalloc).
+* fire all: the time until every job (all due at start) has run once.
+
+Run from the repository's root, e.g.:
+
+    python -m benchmarks.schedulers --sizes 1000 10000 100000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from apscheduler.schedulers.async_ import AsyncScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from fastchecks.scheduling import HeapScheduler
+
+# The distributed scheduler has no in-memory schedule to benchmark (it claims the due checks from the data store)
+ENGINES = ("native", "apscheduler")
+
+# Long enough so that each job fires only once during a benchmark
+INTERVAL_SECONDS = 3600
+
+_fired = 0
+_all_fired = asyncio.Event()
+_num_jobs = 0
+
+
+async def noop_job(key: str) -> None:
+    global _fired
+    _fired += 1
+    if _fired == _num_jobs:
+        _all_fired.set()
+
+
+def _reset(num_jobs: int) -> None:
+    global _fired, _all_fired, _num_jobs
+    _fired = 0
+    _all_fired = asyncio.Event()
+    _num_jobs = num_jobs
+
+
+async def _wait_all_fired(timeout: float) -> float | None:
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(_all_fired.wait(), timeout=timeout)
+        return time.perf_counter() - start
+    except TimeoutError:
+        return None
+
+
+async def bench_native(num_jobs: int, timeout: float, max_concurrency: int) -> tuple[float, int, float | None]:
+    _reset(num_jobs)
+    scheduler = HeapScheduler(noop_job, num_workers=max_concurrency)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(num_jobs):
+        scheduler.add(f"job{i}", f"job{i}", INTERVAL_SECONDS)
+    add_seconds = time.perf_counter() - start
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    runner = asyncio.create_task(scheduler.run_until_stopped())
+    fire_all_seconds = await _wait_all_fired(timeout)
+    scheduler.stop()
+    await runner
+
+    return add_seconds, peak_bytes, fire_all_seconds
+
+
+async def bench_apscheduler(num_jobs: int, timeout: float, max_concurrency: int) -> tuple[float, int, float | None]:
+    _reset(num_jobs)
+
+    async with AsyncScheduler() as scheduler:
+        tracemalloc.start()
+        start = time.perf_counter()
+        for i in range(num_jobs):
+            await scheduler.add_schedule(
+                noop_job, IntervalTrigger(seconds=INTERVAL_SECONDS), id=f"job{i}", args=[f"job{i}"]
+            )
+        add_seconds = time.perf_counter() - start
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        await scheduler.start_in_background()
+        fire_all_seconds = await _wait_all_fired(timeout)
+        await scheduler.stop()
+
+    return add_seconds, peak_bytes, fire_all_seconds
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--engines", choices=ENGINES, nargs="+", default=list(ENGINES))
+    parser.add_argument("--timeout", type=float, default=120, help="Maximum seconds to wait for all jobs to fire once")
+    parser.add_argument("--max_concurrency", type=int, default=100, help="Number of workers of the native scheduler")
+    args = parser.parse_args()
+
+    benches = {"native": bench_native, "apscheduler": bench_apscheduler}
+
+    print(f"{'engine':<12} {'jobs':>8} {'add (s)':>10} {'add peak (MB)':>14} {'fire all (s)':>13}")
+    for num_jobs in args.sizes:
+        for engine in args.engines:
+            add_seconds, peak_bytes, fire_all_seconds = await benches[engine](
+                num_jobs, args.timeout, args.max_concurrency
+            )
+            fire_all = f"{fire_all_seconds:.2f}" if fire_all_seconds is not None else f">{args.timeout:.0f} ({_fired})"
+            print(f"{engine:<12} {num_jobs:>8} {add_seconds:>10.2f} {peak_bytes / 1e6:>14.1f} {fire_all:>13}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,156 @@
+"""
+Benchmark the startup of the runner (`ChecksRunnerContext.run_checks_until_stopped_in_foreground`) with many stored checks.
+
+For each engine and number of checks, it measures:
+* startup: the time from the start of the runner until the first check is fired, i.e. to read & schedule all checks.
+* fire all: the time until every check (all due at start) has been fired once.
+
+The checks are stored in memory, and are not actually run (no requests are made), so that only the runner's startup is measured.
+
+Run from the repository's root, e.g.:
+
+    python -m benchmarks.startup --sizes 1000 10000 50000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+from typing import AsyncIterator
+
+import aiohttp
+
+from fastchecks.log import MAIN_LOGGER
+from fastchecks.runner import ChecksRunnerContext
+from fastchecks.sockets import CheckResultSocket, WebsiteCheckSocket
+from fastchecks.types import CheckResult, WebsiteCheckScheduled
+
+ENGINES = ("native", "apscheduler")
+
+# Long enough so that each check fires only once during a benchmark
+INTERVAL_SECONDS = 3600
+
+
+class InMemoryWebsiteCheckSocket(WebsiteCheckSocket):
+    def __init__(self, checks: list[WebsiteCheckScheduled]) -> None:
+        self.checks = {check.url: check for check in checks}
+
+    def is_closed(self) -> bool:
+        return False
+
+    async def upsert(self, check: WebsiteCheckScheduled) -> int:
+        self.checks[check.url] = check
+        return 1
+
+    async def read_n(self, n: int, after_url: str | None = None) -> AsyncIterator[WebsiteCheckScheduled]:
+        urls = sorted(url for url in self.checks if after_url is None or url > after_url)
+        for url in urls[:n]:
+            yield self.checks[url]
+
+    async def delete(self, url: str) -> int:
+        return 0 if self.checks.pop(url, None) is None else 1
+
+    async def delete_all(self, confirm: bool) -> int:
+        num_checks = len(self.checks)
+        self.checks.clear()
+        return num_checks
+
+    async def close(self) -> None:
+        pass
+
+
+class NullCheckResultSocket(CheckResultSocket):
+    def is_closed(self) -> bool:
+        return False
+
+    async def write(self, result: CheckResult) -> int:
+        return 1
+
+    async def read_last_n(self, n: int) -> AsyncIterator[CheckResult]:
+        for result in []:
+            yield result
+
+    async def close(self) -> None:
+        pass
+
+
+class FiresCountingContext(ChecksRunnerContext):
+    """Count the fired checks instead of running them."""
+
+    def __init__(self, num_checks: int, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.num_checks = num_checks
+        self.fired = 0
+        self.first_fired = asyncio.Event()
+        self.all_fired = asyncio.Event()
+
+    async def scheduled_check_n_write(self, check: WebsiteCheckScheduled) -> CheckResult | None:
+        self.fired += 1
+        self.first_fired.set()
+        if self.fired == self.num_checks:
+            self.all_fired.set()
+        return None
+
+
+async def bench(engine: str, num_checks: int, timeout: float) -> tuple[float | None, float | None]:
+    checks = [
+        WebsiteCheckScheduled(url=f"http://127.0.0.1/check{i}", interval_seconds=INTERVAL_SECONDS)
+        for i in range(num_checks)
+    ]
+
+    async with FiresCountingContext(
+        num_checks,
+        session=aiohttp.ClientSession(),
+        checks=InMemoryWebsiteCheckSocket(checks),
+        results=NullCheckResultSocket(),
+    ) as ctx:
+        start = time.perf_counter()
+        # Keep the runner's summary out of the benchmark's table
+        with contextlib.redirect_stdout(io.StringIO()):
+            runner = asyncio.create_task(
+                ctx.run_checks_until_stopped_in_foreground(
+                    scheduler=engine, phase_spreading=False, live_sync=False, resume_phases=False
+                )
+            )
+
+            startup_seconds = fire_all_seconds = None
+            try:
+                async with asyncio.timeout(timeout):
+                    await ctx.first_fired.wait()
+                    startup_seconds = time.perf_counter() - start
+                    await ctx.all_fired.wait()
+                    fire_all_seconds = time.perf_counter() - start
+            except TimeoutError:
+                pass
+            finally:
+                runner.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await runner
+
+    return startup_seconds, fire_all_seconds
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--engines", choices=ENGINES, nargs="+", default=list(ENGINES))
+    parser.add_argument(
+        "--timeout", type=float, default=300, help="Maximum seconds to wait for all checks to fire once"
+    )
+    args = parser.parse_args()
+
+    # Keep the runner's progress logs out of the benchmark's table
+    MAIN_LOGGER.setLevel("WARNING")
+
+    print(f"{'engine':<12} {'checks':>8} {'startup (s)':>12} {'fire all (s)':>13}")
+    for num_checks in args.sizes:
+        for engine in args.engines:
+            startup_seconds, fire_all_seconds = await bench(engine, num_checks, args.timeout)
+            startup = f"{startup_seconds:.2f}" if startup_seconds is not None else f">{args.timeout:.0f}"
+            fire_all = f"{fire_all_seconds:.2f}" if fire_all_seconds is not None else f">{args.timeout:.0f}"
+            print(f"{engine:<12} {num_checks:>8} {startup:>12} {fire_all:>13}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,19 +1,24 @@
-import re2
+import codecs
+import time
+from typing import AsyncIterator, Iterable, Sequence
+
 import aiohttp
 
 from fastchecks import conf
+from fastchecks.patterns import compiled_regex, compiled_regex_set
+from fastchecks.tracing import RequestPhaseTimer
 from fastchecks.types import CheckResult, WebsiteCheck
 from fastchecks.util import (
     get_utcnow,
-    get_utcnow_time_difference_seconds,
     is_likely_text_based_body,
     is_content_length_less_than,
+    release_or_close_response,
 )
 from fastchecks.log import MAIN_LOGGER as logging
 
 
 async def check_website(
-    session: aiohttp.ClientSession, check: WebsiteCheck, timeout: float | None = None
+    session: aiohttp.ClientSession, check: WebsiteCheck, timeout: float | None = None, trace_phases: bool = False
 ) -> CheckResult:
     """
     Access (GET) website's URL and return monitoring statistics (e.g. return status, response time, etc.).
@@ -22,42 +27,55 @@ async def check_website(
     It's ASSUMED (but not asserted) that the input WebsiteCheck instance is valid.
     Make sure to have validated the inputs before calling this method (e.g. using WebsiteCheck.create_with_validation()).
 
-    Optionally: if check.regex is defined, we check if the website's text body matches the regex.
+    Optionally: if check.regex is defined, we check if the website's text body matches the regex (and the check's extra regexes, if any).
+
+    If `trace_phases`, the result includes the durations of the request's phases (see `CheckPhaseTimes`);
+    the DNS, connect & TTFB phases are only measured if the session traces them (see `request_phases_trace_config`).
     """
     timestamp_start = get_utcnow()
+    # The response time is measured with a monotonic clock (the system's wall clock might jump)
+    time_start = time.perf_counter()
+    timer = RequestPhaseTimer() if trace_phases else None
 
     _timeout = conf.DEFAULT_REQ_TIMEOUT_SECONDS if timeout is None else timeout
 
     # Note: if the input regex is None, theoretically we could do a HEAD request instead of a GET
     # However, often websites do not support HEAD, so we stick to GET
-    response_ftr = session.get(check.url, timeout=_timeout)
+    response_ftr = session.get(check.url, timeout=_timeout, trace_request_ctx=timer)
+    response: aiohttp.ClientResponse | None = None
 
     try:
         response = await response_ftr
 
-        regex_match = (
-            None
+        regexes = check.all_regexes()
+
+        regex_matches: list[str | bool | None] = (
+            [None] * len(regexes)
             if (
                 # Note: when the response is not OK (<400), we do not check the regex
                 not response.ok
-                or check.regex is None
+                or len(regexes) == 0
             )
-            else await search_pattern_whole_text_body(check.regex, response)
+            # All regexes are searched in the same single read of the body
+            else await search_patterns_whole_text_body(regexes, response, timer)
         )
 
         # Get response time after (optionally) fetching the website's content (i.e., if the input regex is not None)
-        response_time = get_utcnow_time_difference_seconds(timestamp_start)
+        response_time = time.perf_counter() - time_start
 
         return CheckResult.response(
             check,
             timestamp_start,
             response_time,
             response_status=response.status,
-            regex_match=regex_match,
+            regex_match=regex_matches[0] if len(regexes) > 0 else None,
+            extra_regex_matches=None if check.extra_regexes is None else regex_matches[1:],
+            phase_times=None if timer is None else timer.phase_times(),
         )
 
     except Exception as e:
-        response_time = get_utcnow_time_difference_seconds(timestamp_start)
+        response_time = time.perf_counter() - time_start
+        phase_times = None if timer is None else timer.phase_times()
 
         match e:
             case TimeoutError():
@@ -66,6 +84,7 @@ async def check_website(
                     timestamp_start,
                     response_time,
                     timeout_error=True,
+                    phase_times=phase_times,
                 )
             case aiohttp.ClientConnectorError():
                 logging.debug(f"{e}")  # nothing major, it can happen
@@ -75,6 +94,7 @@ async def check_website(
                     timestamp_start,
                     response_time,
                     host_error=True,
+                    phase_times=phase_times,
                 )
             case _:
                 # unregistered exception, we log it
@@ -85,41 +105,194 @@ async def check_website(
                     timestamp_start,
                     response_time,
                     other_error=True,
+                    phase_times=phase_times,
                 )
 
     finally:
-        response_ftr.close()
+        if response is None:
+            response_ftr.close()
+        else:
+            # The body is often not (fully) read (e.g. there is no regex, or the regex matched early);
+            # if small enough, we drain it anyway, so that the connection can be reused by the next checks (keep-alive)
+            await release_or_close_response(response, max_drain_bytes=conf.KEEPALIVE_MAX_DRAIN_KB * 1000)
 
 
 async def search_pattern_whole_text_body(regex: str, response: aiohttp.ClientResponse) -> str | bool | None:
     """
-    Search for a regex pattern in the response's content (assumed to be in most cases HTML).
+    Search for a regex pattern in the response's content; see `search_patterns_whole_text_body`.
+    """
+    return (await search_patterns_whole_text_body([regex], response))[0]
+
 
-    WARNING: the whole response's body is read in memory.
+async def search_patterns_whole_text_body(
+    regexes: Sequence[str], response: aiohttp.ClientResponse, timer: RequestPhaseTimer | None = None
+) -> list[str | bool | None]:
+    """
+    Search for several regex patterns in the response's content (assumed to be in most cases HTML), and return the match of each.
 
-    To alleviate this:
+    The body is read only once, streamed in chunks (see `search_patterns_in_chunks`), so that at most about a chunk is held in memory at a time,
+    and the reading stops as soon as all regexes matched.
+
+    Furthermore:
     * we only read the response's body if it's likely to be text based (in particular, not binary) and
-    * the response's Content-Length header is None (note: some websites do not report it) or is less than `__ARBITRARY_TOO_BIG_CONTENT_LENGTH`.
+    * the response's Content-Length header is None (note: some websites do not report it) or is less than `conf.TOO_BIG_CONTENT_LENGTH_KB`.
+    * If Content-Length is None, we stop reading anyway once `conf.TOO_BIG_CONTENT_LENGTH_KB` is exceeded.
     -
-    If, according to the rules above, the response's body is not read, we return None. Thus, the regex does not get tested.
+    If, according to the rules above, the response's body is not (fully) read, the not-yet-matched regexes get None. Thus, they do not get tested.
+
+    If a `timer` is given, the body read and regex times are recorded in it.
 
 
     MAYBE (Alternatives):
-    * If regex search can limited to a line, we could use use response.content.readline() instead of response.text().
     * The text body searched is raw HTML (in most cases), not the HTML's text. If we want to search the text of the HTML (or other text-based format) only, we would need a corresponding parser.
     """
+    max_bytes = conf.TOO_BIG_CONTENT_LENGTH_KB * 1000
+
     if is_likely_text_based_body(response) and is_content_length_less_than(
-        response, length=conf.TOO_BIG_CONTENT_LENGTH_KB, allow_none_content_length=True
+        response, length=max_bytes, allow_none_content_length=True
     ):
-        content = await response.text()
-        match_opt = re2.search(regex, content)
+        time_start = time.perf_counter()
 
-        if match_opt:
-            return match_opt[0]
-        else:
-            return False
+        ret = await search_patterns_in_chunks(
+            regexes,
+            response.content.iter_chunked(conf.REGEX_SEARCH_CHUNK_KB * 1000),
+            # We do not use `response.get_encoding()`, as it may need the whole body to guess the encoding
+            encoding=response.charset or "utf-8",
+            max_bytes=max_bytes,
+            timer=timer,
+        )
+
+        if timer is not None:
+            timer.set_body_read_time(time.perf_counter() - time_start)
+
+        if None in ret:
+            logging.warning(
+                f"The regex could not be checked because the response's body is too big (read more than {max_bytes} bytes without a match), for url: {response.url}"
+            )
+
+        return ret
     else:
         logging.warning(
             f"The regex will not be checked because the response's body might be unsafe to read in memory (too big or not text-based), for url: {response.url}"
         )
-        return None
+        return [None] * len(regexes)
+
+
+async def search_pattern_in_chunks(
+    regex: str,
+    chunks: AsyncIterator[bytes],
+    encoding: str,
+    max_bytes: int,
+    overlap_chars: int | None = None,
+) -> str | bool | None:
+    """
+    Search for a regex pattern in a text that is given in (encoded) chunks; see `search_patterns_in_chunks`.
+    """
+    return (await search_patterns_in_chunks([regex], chunks, encoding, max_bytes, overlap_chars))[0]
+
+
+async def search_patterns_in_chunks(
+    regexes: Sequence[str],
+    chunks: AsyncIterator[bytes],
+    encoding: str,
+    max_bytes: int,
+    overlap_chars: int | None = None,
+    timer: RequestPhaseTimer | None = None,
+) -> list[str | bool | None]:
+    """
+    Search for several regex patterns in a text that is given in (encoded) chunks, and stop reading as soon as all of them matched.
+
+    Return, for each regex (in the same order):
+    * str: the matched string.
+    * False: all the text was read and the regex did not match.
+    * None: the regex did not match before reading more than `max_bytes`, so we stopped reading (i.e. the result is unknown).
+
+    Each chunk is searched together with the last `overlap_chars` (default: `conf.REGEX_SEARCH_OVERLAP_CHARS`) characters of the text before it,
+    so that matches spanning two chunks are found as long as they are not longer than `overlap_chars`
+    (else, the returned matched string might be truncated).
+    The text around the searched window is used as context, so that anchors (e.g. `^`, `$`, or `\\b`) match as they would in the whole text.
+
+    With several regexes, each window is scanned only once with a `re2.Set` of all of them;
+    only the regexes that the set reports as matching are then searched individually, to get their matched strings.
+
+    If a `timer` is given, the time spent searching the regexes (i.e. not reading nor decoding the chunks) is added to it.
+    """
+    _overlap_chars = conf.REGEX_SEARCH_OVERLAP_CHARS if overlap_chars is None else overlap_chars
+
+    patterns = [compiled_regex(regex) for regex in regexes]
+    regex_set = compiled_regex_set(tuple(regexes)) if len(regexes) > 1 else None
+
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    matches: list[str | bool | None] = [None] * len(regexes)
+    # Matches that reach the end of the searched window (they might continue in the next chunk)
+    unfinished_matches: list[str | None] = [None] * len(regexes)
+
+    def candidates(window: str) -> Iterable[int]:
+        """Return the indexes of the regexes that might match the window and are not matched yet."""
+        if regex_set is None:
+            indexes: Iterable[int] = range(len(regexes))
+        else:
+            indexes = regex_set.Match(window) or []
+
+        return (i for i in indexes if matches[i] is None)
+
+    read_bytes = 0
+    # Text kept for the next window: 1 char (only as context) + the overlap chars (searched again) + 1 char (not searched yet)
+    tail = ""
+    tail_is_text_start = True
+
+    async for chunk in chunks:
+        read_bytes += len(chunk)
+        if read_bytes > max_bytes:
+            # If there is an unfinished match, the regex does match; we just don't know how far the matched string goes
+            return [
+                match if match is not None else unfinished_match
+                for match, unfinished_match in zip(matches, unfinished_matches)
+            ]
+
+        window = tail + decoder.decode(chunk)
+
+        # The last char is not searched, but only used as context; it will be searched with the next window
+        endpos = max(len(window) - 1, 0)
+
+        search_start = time.perf_counter() if timer is not None else 0.0
+
+        for i in candidates(window):
+            match_opt = patterns[i].search(window, 0 if tail_is_text_start else 1, endpos)
+
+            if match_opt:
+                # An unfinished match is searched again (and so extended) with the next window, unless it's too long to fit in the overlap
+                if match_opt.end() < endpos or len(match_opt[0]) > _overlap_chars:
+                    matches[i] = match_opt[0]
+                else:
+                    unfinished_matches[i] = match_opt[0]
+
+        if timer is not None:
+            timer.add_regex_time(time.perf_counter() - search_start)
+
+        if None not in matches:
+            return matches
+
+        tail_is_text_start = tail_is_text_start and len(window) <= _overlap_chars + 2
+        tail = window[-(_overlap_chars + 2) :]
+
+    window = tail + decoder.decode(b"", final=True)
+
+    search_start = time.perf_counter() if timer is not None else 0.0
+
+    for i in candidates(window):
+        match_opt = patterns[i].search(window, 0 if tail_is_text_start else 1, len(window))
+        if match_opt:
+            matches[i] = match_opt[0]
+
+    if timer is not None:
+        timer.add_regex_time(time.perf_counter() - search_start)
+
+    return [
+        match if match is not None else (unfinished_match if unfinished_match is not None else False)
+        for match, unfinished_match in zip(matches, unfinished_matches)
+    ]
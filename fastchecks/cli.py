@@ -1,12 +1,23 @@
 import argparse
 from argparse import Namespace as NamedArgs
 import asyncio
+import itertools
 import sys
 from typing import Any, Sequence
 
-from fastchecks import conf, util, vutil, log
+from fastchecks import conf, require, util, vutil, log
+from fastchecks.client import ConnectorSettings
+from fastchecks.dns import DNS_RESOLVER_NAMES
+from fastchecks.importing import IMPORT_FORMATS, import_checks
+from fastchecks.loops import EVENT_LOOP_NAMES, event_loop_factory
+from fastchecks.overrun import OVERRUN_POLICIES
+from fastchecks.rollups import ROLLUP_GRAINS, last_buckets_start, merged_rollups
 from fastchecks.runner import ChecksRunnerContext
+from fastchecks.scheduling import SCHEDULER_NAMES
+from fastchecks.sharding import Shard
+from fastchecks.sockets.postgres import RESULTS_PARTITION_PERIODS
 from fastchecks.types import WebsiteCheck, WebsiteCheckScheduled
+from fastchecks.workers import WorkersSupervisor
 from fastchecks import meta
 
 # ---------------------------------------------------------------------------
@@ -29,6 +40,16 @@ def _regex_kwargs(**kwargs) -> dict[str, Any]:
     }
 
 
+def _extra_regex_kwargs(**kwargs) -> dict[str, Any]:
+    return {
+        "type": vutil.validated_regex,
+        "action": "append",
+        "dest": "extra_regexes",
+        "help": "(Default: none; repeatable) Another regex that the response body must match too (requires '--regex'); all regexes are searched in a single read of the body",
+        **kwargs,
+    }
+
+
 def _interval_kwargs(**kwargs) -> dict[str, Any]:
     return {
         "type": conf.validated_parsed_interval,
@@ -68,6 +89,91 @@ PARSER.add_argument(
     help="(Default: True) auto initialize the PostgreSQL database if the schema is not found",
     default=True,
 )
+PARSER.add_argument(
+    "--results_batch_size",
+    type=vutil.validated_parsed_is_positive_int,
+    help=f"(Default: {conf.RESULTS_BATCH_SIZE}) The number of results to buffer and write together in a single batch (1 means no buffering). The default value can also be overridden by the envar: {conf._RESULTS_BATCH_SIZE_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--results_batch_max_age",
+    type=float,
+    help=f"(Default: {conf.RESULTS_BATCH_MAX_AGE_SECONDS}) The maximum time in _seconds_ a result can stay buffered before its batch is written. The default value can also be overridden by the envar: {conf._RESULTS_BATCH_MAX_AGE_SECONDS_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--results_partition_period",
+    choices=RESULTS_PARTITION_PERIODS,
+    help=f"(Default: {conf.RESULTS_PARTITION_PERIOD}) The time span of each partition of the stored results (by their start time, in UTC); it applies to the partitions created from now on. The default value can also be overridden by the envar: {conf._RESULTS_PARTITION_PERIOD_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--results_retention_days",
+    type=int,
+    help=f"(Default: {conf.RESULTS_RETENTION_DAYS}) The number of days the results are kept, after which they are dropped a whole partition at a time (0 means forever). The default value can also be overridden by the envar: {conf._RESULTS_RETENTION_DAYS_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--rollups_minute_retention_days",
+    type=int,
+    help=f"(Default: {conf.ROLLUPS_MINUTE_RETENTION_DAYS}) The number of days the minute rollups of the results are kept, regardless of the results' retention (0 means forever). The default value can also be overridden by the envar: {conf._ROLLUPS_MINUTE_RETENTION_DAYS_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--rollups_hour_retention_days",
+    type=int,
+    help=f"(Default: {conf.ROLLUPS_HOUR_RETENTION_DAYS}) The number of days the hour rollups of the results are kept, regardless of the results' retention (0 means forever). The default value can also be overridden by the envar: {conf._ROLLUPS_HOUR_RETENTION_DAYS_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--rollups_day_retention_days",
+    type=int,
+    help=f"(Default: {conf.ROLLUPS_DAY_RETENTION_DAYS}) The number of days the day rollups of the results are kept, regardless of the results' retention (0 means forever). The default value can also be overridden by the envar: {conf._ROLLUPS_DAY_RETENTION_DAYS_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--connector_limit",
+    type=int,
+    help=f"(Default: {conf.CONNECTOR_LIMIT}) The maximum number of simultaneous connections of the checks (0 means no limit). The default value can also be overridden by the envar: {conf._CONNECTOR_LIMIT_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--connector_limit_per_host",
+    type=int,
+    help=f"(Default: {conf.CONNECTOR_LIMIT_PER_HOST}) The maximum number of simultaneous connections of the checks to the same host (0 means no limit). The default value can also be overridden by the envar: {conf._CONNECTOR_LIMIT_PER_HOST_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--dns_cache_ttl",
+    type=int,
+    help=f"(Default: {conf.DNS_CACHE_TTL_SECONDS}) The time in _seconds_ the resolved addresses of a host are cached (with the default DNS resolver). The default value can also be overridden by the envar: {conf._DNS_CACHE_TTL_SECONDS_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--keepalive_timeout",
+    type=float,
+    help=f"(Default: {conf.KEEPALIVE_TIMEOUT_SECONDS}) The time in _seconds_ an idle connection is kept open to be reused. The default value can also be overridden by the envar: {conf._KEEPALIVE_TIMEOUT_SECONDS_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--dns_resolver",
+    choices=DNS_RESOLVER_NAMES,
+    help=f"(Default: {conf.DNS_RESOLVER}) The DNS resolver: 'default' (aiohttp's, cached for a fixed time), or 'ttl' (cached as long as the DNS records' TTLs say; requires the package aiodns). The default value can also be overridden by the envar: {conf._DNS_RESOLVER_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--loop",
+    choices=EVENT_LOOP_NAMES,
+    help=f"(Default: {conf.EVENT_LOOP}) The event loop: 'asyncio' (python's default), or 'uvloop' (faster sockets, TLS, and timers; requires the package uvloop, else asyncio's is used). The default value can also be overridden by the envar: {conf._EVENT_LOOP_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--host_max_concurrency",
+    type=int,
+    help=f"(Default: {conf.HOST_MAX_CONCURRENCY}) The maximum number of in-flight checks of the same host (0 means no limit); with 1, they are sent one after another. The default value can also be overridden by the envar: {conf._HOST_MAX_CONCURRENCY_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--host_min_spacing",
+    type=float,
+    help=f"(Default: {conf.HOST_MIN_SPACING_SECONDS}) The minimum time in _seconds_ between the starts of two checks of the same host. The default value can also be overridden by the envar: {conf._HOST_MIN_SPACING_SECONDS_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--adaptive_timeouts",
+    type=vutil.validated_parsed_bool_answer,
+    help=f"(Default: {conf.ADAPTIVE_TIMEOUTS}) Derive each URL's request timeout from its latest response times (at most {conf.DEFAULT_REQ_TIMEOUT_SECONDS}s), instead of using the same timeout for all. The default value can also be overridden by the envar: {conf._ADAPTIVE_TIMEOUTS_ENVAR_NAME}",
+)
+PARSER.add_argument(
+    "--trace_request_phases",
+    type=vutil.validated_parsed_bool_answer,
+    help=f"(Default: {conf.TRACE_REQUEST_PHASES}) Record in each result the durations of the request's phases (DNS, connect, time to first byte, body read, regex search). The default value can also be overridden by the envar: {conf._TRACE_REQUEST_PHASES_ENVAR_NAME}",
+)
 PARSER.add_argument(
     "--log_console_level",
     choices={"CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG", "NOTSET"},
@@ -104,12 +210,15 @@ def _add_upsert_check(subparsers: argparse._SubParsersAction) -> tuple[argparse.
 
     cmd.add_argument("url", **_url_kwargs())
     cmd.add_argument("--regex", **_regex_kwargs())
+    cmd.add_argument("--extra_regex", **_extra_regex_kwargs())
     cmd.add_argument("--interval", **_interval_kwargs())
 
     async def fun(ctx: ChecksRunnerContext, x: NamedArgs):
         ret = await ctx.checks.upsert(
             # The args are already validated, but just in case
-            WebsiteCheckScheduled.with_check(WebsiteCheck.with_validation(x.url, x.regex), interval_seconds=x.interval)
+            WebsiteCheckScheduled.with_check(
+                WebsiteCheck.with_validation(x.url, x.regex, x.extra_regexes), interval_seconds=x.interval
+            )
         )
         print(ret)
 
@@ -124,6 +233,42 @@ _add_upsert_check(SUBPARSERS)
 # -----------------------------------------------------------------------------
 
 
+def _add_import_checks(subparsers: argparse._SubParsersAction) -> tuple[argparse._SubParsersAction, Any]:
+    cmd = subparsers.add_parser(
+        "import_checks",
+        help="Write new checks to the data store, or update existing checks, from a CSV or JSONL file; the invalid rows are reported and skipped",
+    )
+
+    cmd.add_argument(
+        "file",
+        help="The file of checks, one per row (CSV, with a header) or line (JSONL), with the fields: url (required), regex, extra_regexes (in CSV, as a JSON array), interval_seconds",
+    )
+    cmd.add_argument(
+        "--format",
+        choices=IMPORT_FORMATS,
+        help="(Default: the file's extension) The format of the file",
+    )
+    cmd.add_argument(
+        "--batch_size",
+        type=vutil.validated_parsed_is_positive_int,
+        help=f"(Default: {conf.IMPORT_BATCH_SIZE}) The number of checks validated and written together. The default value can also be overridden by the envar: {conf._IMPORT_BATCH_SIZE_ENVAR_NAME}",
+    )
+
+    async def fun(ctx: ChecksRunnerContext, x: NamedArgs):
+        stats = await import_checks(ctx.checks, x.file, x.format, x.batch_size)
+        print(stats)
+
+    cmd.set_defaults(fun=fun)
+
+    return (subparsers, cmd)
+
+
+_add_import_checks(SUBPARSERS)
+
+
+# -----------------------------------------------------------------------------
+
+
 def _add_read_all_checks(subparsers: argparse._SubParsersAction) -> tuple[argparse._SubParsersAction, Any]:
     cmd = subparsers.add_parser("read_all_checks", help="Retrieve and print all checks from the data store")
 
@@ -197,9 +342,10 @@ def _add_check_website_only(subparsers: argparse._SubParsersAction) -> tuple[arg
     )
     cmd.add_argument("url", **_url_kwargs())
     cmd.add_argument("--regex", **_regex_kwargs())
+    cmd.add_argument("--extra_regex", **_extra_regex_kwargs())
 
     async def fun(ctx: ChecksRunnerContext, x: NamedArgs):
-        result = await ctx.check_only(WebsiteCheck.with_validation(x.url, x.regex))
+        result = await ctx.check_only(WebsiteCheck.with_validation(x.url, x.regex, x.extra_regexes))
         print(result)
 
     cmd.set_defaults(fun=fun)
@@ -219,9 +365,10 @@ def _add_check_website(subparsers: argparse._SubParsersAction) -> tuple[argparse
     )
     cmd.add_argument("url", **_url_kwargs())
     cmd.add_argument("--regex", **_regex_kwargs())
+    cmd.add_argument("--extra_regex", **_extra_regex_kwargs())
 
     async def fun(ctx: ChecksRunnerContext, x: NamedArgs):
-        result = await ctx.check_only(WebsiteCheck.with_validation(x.url, x.regex))
+        result = await ctx.check_only(WebsiteCheck.with_validation(x.url, x.regex, x.extra_regexes))
         await ctx.results.write(result)
         print(result)
 
@@ -241,10 +388,15 @@ def _check_all_once(subparsers: argparse._SubParsersAction) -> tuple[argparse._S
         "check_all_once",
         help="Check all websites once and write the results in the data store (without scheduling; you might want to schedule this command with cron)",
     )
+    cmd.add_argument(
+        "--max_concurrency",
+        type=vutil.validated_parsed_is_positive_int,
+        help=f"(Default: {conf.DEFAULT_MAX_CONCURRENT_CHECKS}) The maximum number of checks in flight at the same time; with more than 1, results are printed as they complete. The default value can also be overridden by the envar: {conf._DEFAULT_MAX_CONCURRENT_CHECKS_ENVAR_NAME}",
+    )
 
     async def fun(ctx: ChecksRunnerContext, x: NamedArgs):
         c = 0
-        async for check in ctx.check_all_once_n_write():
+        async for check in ctx.check_all_once_n_write(max_concurrency=x.max_concurrency):
             c += 1
             print(f"{util.str_pad(c)}: {check}")
 
@@ -265,8 +417,81 @@ def _check_all_loop_fg(subparsers: argparse._SubParsersAction) -> tuple[argparse
         help=f"Check all websites in the foreground at the scheduled intervals (or {conf.DEFAULT_CHECK_INTERVAL_SECONDS}s for checks without an interval)",
     )
 
+    cmd.add_argument(
+        "--scheduler",
+        choices=SCHEDULER_NAMES,
+        help=f"(Default: {conf.SCHEDULER}) The scheduler engine: 'native' (scales to many checks), 'apscheduler', or 'distributed' (several runners, e.g. on different nodes, claim the due checks from the shared database). The default value can also be overridden by the envar: {conf._SCHEDULER_ENVAR_NAME}",
+    )
+    cmd.add_argument(
+        "--max_concurrency",
+        type=vutil.validated_parsed_is_positive_int,
+        help=f"(Default: {conf.SCHEDULER_MAX_CONCURRENT_CHECKS}) The maximum number of checks in flight at the same time (only with the native or distributed scheduler). The default value can also be overridden by the envar: {conf._SCHEDULER_MAX_CONCURRENT_CHECKS_ENVAR_NAME}",
+    )
+
+    cmd.add_argument(
+        "--poll_interval",
+        type=float,
+        help=f"(Default: {conf.DISTRIBUTED_POLL_INTERVAL_SECONDS}) How often in _seconds_ to claim the due checks from the database (only with the distributed scheduler). The default value can also be overridden by the envar: {conf._DISTRIBUTED_POLL_INTERVAL_SECONDS_ENVAR_NAME}",
+    )
+
+    cmd.add_argument(
+        "--phase_spreading",
+        type=vutil.validated_parsed_bool_answer,
+        help=f"(Default: {conf.SCHEDULE_PHASE_SPREADING}) Spread the checks evenly across their interval (with a deterministic offset per url), instead of firing them all at once. The default value can also be overridden by the envar: {conf._SCHEDULE_PHASE_SPREADING_ENVAR_NAME}",
+    )
+    cmd.add_argument(
+        "--resume_phases",
+        type=vutil.validated_parsed_bool_answer,
+        help=f"(Default: {conf.RESUME_SCHEDULE_PHASES}) Persist the next due time of each check, so that after a restart each check resumes its phase, instead of all firing anew. The default value can also be overridden by the envar: {conf._RESUME_SCHEDULE_PHASES_ENVAR_NAME}",
+    )
+    cmd.add_argument(
+        "--max_jitter",
+        type=float,
+        help=f"(Default: {conf.SCHEDULE_MAX_JITTER_SECONDS}) The maximum random delay in _seconds_ added to each run of the checks. The default value can also be overridden by the envar: {conf._SCHEDULE_MAX_JITTER_SECONDS_ENVAR_NAME}",
+    )
+
+    cmd.add_argument(
+        "--overrun_policy",
+        choices=OVERRUN_POLICIES,
+        help=f"(Default: {conf.OVERRUN_POLICY}) What to do when a check is fired while its previous run is still in flight: 'skip' it, 'coalesce' it into the run in flight, or 'queue_one' run after it. The default value can also be overridden by the envar: {conf._OVERRUN_POLICY_ENVAR_NAME}",
+    )
+
+    cmd.add_argument(
+        "--live_sync",
+        type=vutil.validated_parsed_bool_answer,
+        help=f"(Default: {conf.LIVE_SYNC_CHECKS}) Sync the running checks with the checks added, updated, or deleted meanwhile (e.g. with another CLI command), without restarting. The default value can also be overridden by the envar: {conf._LIVE_SYNC_CHECKS_ENVAR_NAME}",
+    )
+
+    cmd.add_argument(
+        "--drain_timeout",
+        type=float,
+        help=f"(Default: {conf.SHUTDOWN_DRAIN_TIMEOUT_SECONDS}) When stopped (with SIGINT, e.g. Ctrl+C, or SIGTERM), the maximum _seconds_ to wait for the checks in flight to complete (and their results to be written) before cancelling them; stop again to cancel them right away. The default value can also be overridden by the envar: {conf._SHUTDOWN_DRAIN_TIMEOUT_SECONDS_ENVAR_NAME}",
+    )
+
+    cmd.add_argument(
+        "--workers",
+        type=vutil.validated_parsed_is_positive_int,
+        help=f"(Default: {conf.WORKERS}) The number of worker processes, each running its own shard of the checks (by consistent hashing of their urls); a supervisor restarts the crashed workers. The number of workers can be changed while running with the signals SIGTTIN (+1) and SIGTTOU (-1). The default value can also be overridden by the envar: {conf._WORKERS_ENVAR_NAME}",
+    )
+    cmd.add_argument(
+        "--shard",
+        type=Shard.parse,
+        help="(Default: all checks) Run only the given shard of the checks, written as INDEX/NUM_SHARDS (e.g. 0/4); the workers are given their shard with this option",
+    )
+
     async def fun(ctx: ChecksRunnerContext, x: NamedArgs):
-        await ctx.run_checks_until_stopped_in_foreground()
+        await ctx.run_checks_until_stopped_in_foreground(
+            scheduler=x.scheduler,
+            max_concurrency=x.max_concurrency,
+            phase_spreading=x.phase_spreading,
+            max_jitter_seconds=x.max_jitter,
+            overrun_policy=x.overrun_policy,
+            live_sync=x.live_sync,
+            shard=x.shard,
+            poll_interval_seconds=x.poll_interval,
+            resume_phases=x.resume_phases,
+            drain_timeout_seconds=x.drain_timeout,
+        )
 
     cmd.set_defaults(fun=fun)
 
@@ -305,6 +530,81 @@ def _add_read_last_results(subparsers: argparse._SubParsersAction) -> tuple[argp
 _add_read_last_results(SUBPARSERS)
 
 
+def _add_read_current_status(subparsers: argparse._SubParsersAction) -> tuple[argparse._SubParsersAction, Any]:
+    cmd = subparsers.add_parser(
+        "read_current_status", help="Read the current status (up or down) of each URL, i.e. its latest result"
+    )
+    cmd.add_argument("--down_only", help="Print only the URLs that are down", action="store_true")
+
+    async def fun(ctx: ChecksRunnerContext, x: NamedArgs):
+        c = num_up = num_down = 0
+        async for result in ctx.results.read_current_status():
+            if result.is_success():
+                num_up += 1
+                if x.down_only:
+                    continue
+            else:
+                num_down += 1
+
+            c += 1
+            print(f"{util.str_pad(c)}: {'UP  ' if result.is_success() else 'DOWN'} {result}")
+
+        print(f"(up: {num_up}, down: {num_down})")
+
+    cmd.set_defaults(fun=fun)
+
+    return (subparsers, cmd)
+
+
+_add_read_current_status(SUBPARSERS)
+
+
+def _add_read_rollups(subparsers: argparse._SubParsersAction) -> tuple[argparse._SubParsersAction, Any]:
+    _DEFAULT_GRAIN = "day"
+    _DEFAULT_READ_N_BUCKETS = 7
+
+    cmd = subparsers.add_parser(
+        "read_rollups",
+        help="Read the uptime & latency (e.g. p95) of each URL over the last minutes, hours, or days, from the results' rollups",
+    )
+    cmd.add_argument("--url", **_url_kwargs(help="(Default: all URLs) The URL to read the rollups of"))
+    cmd.add_argument(
+        "--grain",
+        choices=ROLLUP_GRAINS,
+        help=f"(Default: {_DEFAULT_GRAIN}) The time span of each rollup",
+        default=_DEFAULT_GRAIN,
+    )
+    cmd.add_argument(
+        "-n",
+        type=vutil.validated_parsed_is_positive_int,
+        help=f"(Default: {_DEFAULT_READ_N_BUCKETS}) The number of last rollups to read, the current one included (e.g. 7 days)",
+        default=_DEFAULT_READ_N_BUCKETS,
+    )
+    cmd.add_argument(
+        "--per_bucket", help="Print each rollup, instead of one summary of all rollups per URL", action="store_true"
+    )
+
+    async def fun(ctx: ChecksRunnerContext, x: NamedArgs):
+        since = last_buckets_start(x.n, x.grain, util.get_utcnow())
+        rollups = await util.async_itr_to_list(ctx.results.read_rollups(x.grain, since, x.url))
+
+        print(f"(since {since} UTC, per {x.grain})")
+        # The rollups are sorted by url
+        for c, (_, url_rollups) in enumerate(itertools.groupby(rollups, key=lambda rollup: rollup.url), start=1):
+            if x.per_bucket:
+                for rollup in url_rollups:
+                    print(f"{util.str_pad(c)}: {rollup.summary()}")
+            else:
+                print(f"{util.str_pad(c)}: {merged_rollups(url_rollups).summary()}")
+
+    cmd.set_defaults(fun=fun)
+
+    return (subparsers, cmd)
+
+
+_add_read_rollups(SUBPARSERS)
+
+
 # -----------------------------------------------------------------------------
 # ---------------------------------------------------------------------------
 # ---------------------------------------------------------------------------
@@ -312,6 +612,8 @@ _add_read_last_results(SUBPARSERS)
 
 def parse_validate_seq_args(argv: Sequence[str]) -> NamedArgs:
     args = PARSER.parse_args(argv)
+    # Kept to run the same command in other processes (see `WorkersSupervisor`)
+    args.argv = list(argv)
 
     if args.command is None:
         print("(Error) you must specify a command\n")
@@ -338,6 +640,13 @@ def parse_str_args(argv: str) -> NamedArgs:
 # ---------------------------------------------------------------------------
 
 
+_WORKER_FLUSH_TIMEOUT_SECONDS = 10.0
+"""How long a stopped worker is given to flush its results and close, after draining its checks in flight (see `WorkersSupervisor.stop_timeout_seconds`)"""
+
+_READ_ONLY_COMMANDS = ("read_all_checks", "read_last_results", "read_current_status", "read_rollups")
+"""Commands that only read the data store, and so can still read a database with an older schema (e.g. before migrating it)"""
+
+
 async def _run_with_namespace(args: NamedArgs) -> None:
     """Given args must and are ASSUMED to be validated"""
 
@@ -351,9 +660,52 @@ async def _run_with_namespace(args: NamedArgs) -> None:
         log.reset_root_logger(level=args.log_root_level)
 
     async with await ChecksRunnerContext.with_single_datastore_postgres(
-        pg_conninfo=args.pg_conninfo, auto_init=args.pg_auto_init, default_interval_seconds=args.default_interval
+        pg_conninfo=args.pg_conninfo,
+        auto_init=args.pg_auto_init,
+        results_batch_size=args.results_batch_size,
+        results_batch_max_age_seconds=args.results_batch_max_age,
+        results_partition_period=args.results_partition_period,
+        results_retention_days=args.results_retention_days,
+        rollups_retention_days={
+            grain: days
+            for grain in ROLLUP_GRAINS
+            if (days := getattr(args, f"rollups_{grain}_retention_days")) is not None
+        },
+        trace_request_phases=args.trace_request_phases,
+        connector_settings=ConnectorSettings(
+            limit=args.connector_limit,
+            limit_per_host=args.connector_limit_per_host,
+            dns_cache_ttl_seconds=args.dns_cache_ttl,
+            keepalive_timeout_seconds=args.keepalive_timeout,
+            dns_resolver=args.dns_resolver,
+        ),
+        default_interval_seconds=args.default_interval,
+        host_max_concurrency=args.host_max_concurrency,
+        host_min_spacing_seconds=args.host_min_spacing,
+        adaptive_timeouts=args.adaptive_timeouts,
+        read_only=args.command in _READ_ONLY_COMMANDS,
     ) as ctx:
-        await args.fun(ctx, args)
+        if _num_workers(args) == 1:
+            await args.fun(ctx, args)
+            return
+
+    # The context was only needed to initialize the datastore once (before the workers race to do it); each worker creates its own
+    drain_timeout_seconds = conf.SHUTDOWN_DRAIN_TIMEOUT_SECONDS if args.drain_timeout is None else args.drain_timeout
+    await WorkersSupervisor(
+        args.argv,
+        _num_workers(args),
+        # Give the stopped workers time to drain their checks in flight, and then to flush their results
+        stop_timeout_seconds=drain_timeout_seconds + _WORKER_FLUSH_TIMEOUT_SECONDS,
+    ).run_until_stopped()
+
+
+def _num_workers(args: NamedArgs) -> int:
+    if args.command != "check_all_loop_fg":
+        return 1
+
+    num_workers = conf.WORKERS if args.workers is None else args.workers
+    require(num_workers == 1 or args.shard is None, "A shard can only be given to a single worker")
+    return num_workers
 
 
 async def run_str(command: str) -> None:
@@ -373,9 +725,11 @@ async def run_seq(command: Sequence[str]) -> None:
 
 def main() -> None:
     args = parse_sys_args()
+    loop_factory = event_loop_factory(conf.EVENT_LOOP if args.loop is None else args.loop)
 
     try:
-        asyncio.run(_run_with_namespace(args))
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            runner.run(_run_with_namespace(args))
     except KeyboardInterrupt:
         # ignore program-exit-like exceptions in the cli
         pass
@@ -0,0 +1,58 @@
+#
+# HTTP client (aiohttp) used by the checks.
+#
+
+import aiohttp
+from aiohttp.abc import AbstractResolver
+from pydantic import BaseModel, NonNegativeFloat, NonNegativeInt
+
+from fastchecks import conf
+from fastchecks.dns import new_dns_resolver
+
+
+class ConnectorSettings(BaseModel):
+    """
+    Settings of the connection pool (aiohttp's `TCPConnector`) shared by all the checks' requests.
+
+    The values that are None default to the corresponding `conf` values.
+    """
+
+    limit: NonNegativeInt | None = None
+    """Maximum number of simultaneous connections; 0 means no limit (default: `conf.CONNECTOR_LIMIT`)."""
+    limit_per_host: NonNegativeInt | None = None
+    """Maximum number of simultaneous connections per host; 0 means no limit (default: `conf.CONNECTOR_LIMIT_PER_HOST`)."""
+    dns_cache_ttl_seconds: NonNegativeInt | None = None
+    """(default: `conf.DNS_CACHE_TTL_SECONDS`)"""
+    keepalive_timeout_seconds: NonNegativeFloat | None = None
+    """(default: `conf.KEEPALIVE_TIMEOUT_SECONDS`)"""
+    dns_resolver: str | None = None
+    """Name of the DNS resolver, see `dns.DNS_RESOLVER_NAMES` (default: `conf.DNS_RESOLVER`)."""
+
+    def new_dns_resolver(self) -> AbstractResolver | None:
+        """
+        Return a new DNS resolver, or None for aiohttp's default one.
+
+        WARNING: the connector does not close a given resolver; close it after the connector.
+        """
+        return new_dns_resolver(conf.DNS_RESOLVER if self.dns_resolver is None else self.dns_resolver)
+
+    def new_connector(self, resolver: AbstractResolver | None = None) -> aiohttp.TCPConnector:
+        """
+        Return a new connector with these settings; it must be created within a running event loop.
+
+        If a `resolver` is given, it is assumed to cache its results itself, so the connector does not cache them (again).
+        """
+        return aiohttp.TCPConnector(
+            limit=conf.CONNECTOR_LIMIT if self.limit is None else self.limit,
+            limit_per_host=conf.CONNECTOR_LIMIT_PER_HOST if self.limit_per_host is None else self.limit_per_host,
+            use_dns_cache=resolver is None,
+            ttl_dns_cache=(
+                conf.DNS_CACHE_TTL_SECONDS if self.dns_cache_ttl_seconds is None else self.dns_cache_ttl_seconds
+            ),
+            keepalive_timeout=(
+                conf.KEEPALIVE_TIMEOUT_SECONDS
+                if self.keepalive_timeout_seconds is None
+                else self.keepalive_timeout_seconds
+            ),
+            resolver=resolver,
+        )
@@ -1,6 +1,10 @@
 import os
 from typing import Callable, TypeVar
 from fastchecks import vutil
+from fastchecks.dns import DNS_RESOLVER_NAMES
+from fastchecks.loops import EVENT_LOOP_NAMES
+from fastchecks.overrun import OVERRUN_POLICIES
+from fastchecks.scheduling import SCHEDULER_NAMES
 
 _CONVERSION_OUTPUT = TypeVar("_CONVERSION_OUTPUT")
 
@@ -35,6 +39,39 @@ DEFAULT_REQ_TIMEOUT_SECONDS: float = get_typed_envar(
     "FC_DEFAULT_REQ_TIMEOUT_SECONDS", default=10.0, conversion=lambda x: float(x)
 )
 
+_ADAPTIVE_TIMEOUTS_ENVAR_NAME = "FC_ADAPTIVE_TIMEOUTS"
+
+ADAPTIVE_TIMEOUTS: bool = get_typed_envar(
+    _ADAPTIVE_TIMEOUTS_ENVAR_NAME, default=False, conversion=vutil.validated_parsed_bool_answer
+)
+"""
+Whether to derive each URL's request timeout from its historical response times (see `latency.AdaptiveTimeouts`), instead of using DEFAULT_REQ_TIMEOUT_SECONDS for all.
+
+With adaptive timeouts, DEFAULT_REQ_TIMEOUT_SECONDS is the maximum timeout.
+"""
+
+ADAPTIVE_TIMEOUT_PERCENTILE: float = get_typed_envar(
+    "FC_ADAPTIVE_TIMEOUT_PERCENTILE", default=99.0, conversion=lambda x: float(x)
+)
+"""Percentile (0-100) of a URL's latest response times that, multiplied by ADAPTIVE_TIMEOUT_MULTIPLIER, gives its adaptive timeout."""
+
+ADAPTIVE_TIMEOUT_MULTIPLIER: float = get_typed_envar(
+    "FC_ADAPTIVE_TIMEOUT_MULTIPLIER", default=3.0, conversion=lambda x: float(x)
+)
+
+ADAPTIVE_TIMEOUT_MIN_SECONDS: float = get_typed_envar(
+    "FC_ADAPTIVE_TIMEOUT_MIN_SECONDS", default=2.0, conversion=lambda x: float(x)
+)
+"""Minimum adaptive timeout, to not flag as timed out the (usually fast) URLs that are occasionally a bit slow."""
+
+ADAPTIVE_TIMEOUT_WINDOW: int = get_typed_envar("FC_ADAPTIVE_TIMEOUT_WINDOW", default=50, conversion=lambda x: int(x))
+"""Number of the latest response times per URL that are used to derive its adaptive timeout."""
+
+ADAPTIVE_TIMEOUT_SEED_HOURS: float = get_typed_envar(
+    "FC_ADAPTIVE_TIMEOUT_SEED_HOURS", default=24.0, conversion=lambda x: float(x)
+)
+"""Only the stored results of the last hours seed the adaptive timeouts when the checks start running (so that the older results are not read)."""
+
 MIN_INTERVAL_SECONDS: int = get_typed_envar("FC_MIN_INTERVAL_SECONDS", default=5, conversion=lambda x: int(x))
 
 MAX_INTERVAL_SECONDS: int = get_typed_envar("FC_MAX_INTERVAL_SECONDS", default=300, conversion=lambda x: int(x))
@@ -63,6 +100,249 @@ DEFAULT_CHECK_INTERVAL_SECONDS: int = validated_interval(
 )
 
 
+# -----------------------------------------------------------------------------
+
+_DEFAULT_MAX_CONCURRENT_CHECKS_ENVAR_NAME = "FC_DEFAULT_MAX_CONCURRENT_CHECKS"
+
+DEFAULT_MAX_CONCURRENT_CHECKS: int = vutil.validated_is_positive_int(
+    get_typed_envar(_DEFAULT_MAX_CONCURRENT_CHECKS_ENVAR_NAME, default=1, conversion=lambda x: int(x))
+)
+"""
+Default maximum number of checks (each including the write of its result) in flight at the same time when checking all websites once.
+
+The default (1) runs the checks sequentially.
+"""
+
+_SCHEDULER_ENVAR_NAME = "FC_SCHEDULER"
+
+SCHEDULER: str = get_typed_envar(
+    _SCHEDULER_ENVAR_NAME,
+    default="native",
+    conversion=lambda x: vutil.validated_choice(_SCHEDULER_ENVAR_NAME, x, SCHEDULER_NAMES),
+)
+"""
+Scheduler engine that runs the checks until stopped; see `scheduling.SCHEDULER_NAMES`.
+"""
+
+_DISTRIBUTED_POLL_INTERVAL_SECONDS_ENVAR_NAME = "FC_DISTRIBUTED_POLL_INTERVAL_SECONDS"
+
+DISTRIBUTED_POLL_INTERVAL_SECONDS: float = get_typed_envar(
+    _DISTRIBUTED_POLL_INTERVAL_SECONDS_ENVAR_NAME, default=1.0, conversion=lambda x: float(x)
+)
+"""
+With the distributed scheduler, how often to claim the due checks from the data store when none were due; i.e. how late a check can run.
+"""
+
+_SCHEDULER_MAX_CONCURRENT_CHECKS_ENVAR_NAME = "FC_SCHEDULER_MAX_CONCURRENT_CHECKS"
+
+SCHEDULER_MAX_CONCURRENT_CHECKS: int = vutil.validated_is_positive_int(
+    get_typed_envar(_SCHEDULER_MAX_CONCURRENT_CHECKS_ENVAR_NAME, default=100, conversion=lambda x: int(x))
+)
+"""
+Maximum number of scheduled checks (each including the write of its result) in flight at the same time, with the native or distributed scheduler.
+"""
+
+_WORKERS_ENVAR_NAME = "FC_WORKERS"
+
+WORKERS: int = vutil.validated_is_positive_int(
+    get_typed_envar(_WORKERS_ENVAR_NAME, default=1, conversion=lambda x: int(x))
+)
+"""
+Number of worker processes that run the checks until stopped, each its own shard of the checks (see `workers.WorkersSupervisor`).
+
+With 1, the checks run in the main process. Use more to use more CPU cores, e.g. with many thousands of checks per second.
+"""
+
+_SCHEDULE_PHASE_SPREADING_ENVAR_NAME = "FC_SCHEDULE_PHASE_SPREADING"
+
+SCHEDULE_PHASE_SPREADING: bool = get_typed_envar(
+    _SCHEDULE_PHASE_SPREADING_ENVAR_NAME, default=True, conversion=vutil.validated_parsed_bool_answer
+)
+"""
+Whether to delay the first run of each scheduled check by a deterministic offset within its interval (derived from its url),
+so that the checks are spread evenly across their interval, instead of all firing in the same burst.
+"""
+
+_RESUME_SCHEDULE_PHASES_ENVAR_NAME = "FC_RESUME_SCHEDULE_PHASES"
+
+RESUME_SCHEDULE_PHASES: bool = get_typed_envar(
+    _RESUME_SCHEDULE_PHASES_ENVAR_NAME, default=True, conversion=vutil.validated_parsed_bool_answer
+)
+"""
+Whether to persist the next due time of each scheduled check, so that a restarted runner resumes each check's phase
+(instead of firing all checks anew, e.g. in a burst after each deploy).
+"""
+
+_SCHEDULE_STATE_FLUSH_INTERVAL_SECONDS_ENVAR_NAME = "FC_SCHEDULE_STATE_FLUSH_INTERVAL_SECONDS"
+
+SCHEDULE_STATE_FLUSH_INTERVAL_SECONDS: float = get_typed_envar(
+    _SCHEDULE_STATE_FLUSH_INTERVAL_SECONDS_ENVAR_NAME, default=10.0, conversion=lambda x: float(x)
+)
+"""
+How often the next due times of the fired checks are persisted together (they are persisted when stopped too); see `RESUME_SCHEDULE_PHASES`.
+"""
+
+_SCHEDULE_LOAD_BATCH_SIZE_ENVAR_NAME = "FC_SCHEDULE_LOAD_BATCH_SIZE"
+
+SCHEDULE_LOAD_BATCH_SIZE: int = vutil.validated_is_positive_int(
+    get_typed_envar(_SCHEDULE_LOAD_BATCH_SIZE_ENVAR_NAME, default=1000, conversion=lambda x: int(x))
+)
+"""
+Number of checks registered together in the scheduler at startup, as they are read from the data store (the progress is logged per batch).
+"""
+
+_SCHEDULE_MAX_JITTER_SECONDS_ENVAR_NAME = "FC_SCHEDULE_MAX_JITTER_SECONDS"
+
+SCHEDULE_MAX_JITTER_SECONDS: float = get_typed_envar(
+    _SCHEDULE_MAX_JITTER_SECONDS_ENVAR_NAME, default=0.0, conversion=lambda x: float(x)
+)
+"""
+Maximum random delay added to each run of the scheduled checks. The default (0) means no jitter.
+"""
+
+_SHUTDOWN_DRAIN_TIMEOUT_SECONDS_ENVAR_NAME = "FC_SHUTDOWN_DRAIN_TIMEOUT_SECONDS"
+
+SHUTDOWN_DRAIN_TIMEOUT_SECONDS: float = get_typed_envar(
+    _SHUTDOWN_DRAIN_TIMEOUT_SECONDS_ENVAR_NAME, default=20.0, conversion=lambda x: float(x)
+)
+"""
+When the checks run until stopped are stopped (e.g. with SIGTERM on a deploy), how long to wait for the checks in flight to complete
+(and so for their results to be written) before cancelling them.
+"""
+
+_OVERRUN_POLICY_ENVAR_NAME = "FC_OVERRUN_POLICY"
+
+OVERRUN_POLICY: str = get_typed_envar(
+    _OVERRUN_POLICY_ENVAR_NAME,
+    default="skip",
+    conversion=lambda x: vutil.validated_choice(_OVERRUN_POLICY_ENVAR_NAME, x, OVERRUN_POLICIES),
+)
+"""
+What to do when a scheduled check is fired while its previous run is still in flight; see `overrun.OVERRUN_POLICIES`.
+"""
+
+_LIVE_SYNC_CHECKS_ENVAR_NAME = "FC_LIVE_SYNC_CHECKS"
+
+LIVE_SYNC_CHECKS: bool = get_typed_envar(
+    _LIVE_SYNC_CHECKS_ENVAR_NAME, default=True, conversion=vutil.validated_parsed_bool_answer
+)
+"""
+Whether the checks run until stopped are synced with the changes of the stored checks (added, updated, or deleted meanwhile, e.g. with the CLI),
+without restarting; only the affected checks are rescheduled.
+"""
+
+_HOST_MAX_CONCURRENCY_ENVAR_NAME = "FC_HOST_MAX_CONCURRENCY"
+
+HOST_MAX_CONCURRENCY: int = get_typed_envar(_HOST_MAX_CONCURRENCY_ENVAR_NAME, default=0, conversion=lambda x: int(x))
+"""
+Maximum number of checks of the same host that are in flight at the same time; the others wait for their turn.
+
+With 1, the checks of the same host are sent one after another, reusing the same warm connection. The default (0) means no limit.
+"""
+
+_HOST_MIN_SPACING_SECONDS_ENVAR_NAME = "FC_HOST_MIN_SPACING_SECONDS"
+
+HOST_MIN_SPACING_SECONDS: float = get_typed_envar(
+    _HOST_MIN_SPACING_SECONDS_ENVAR_NAME, default=0.0, conversion=lambda x: float(x)
+)
+"""
+Minimum time between the starts of two consecutive checks of the same host. The default (0) means no spacing.
+"""
+
+# -----------------------------------------------------------------------------
+
+_CHECKS_FETCH_SIZE_ENVAR_NAME = "FC_CHECKS_FETCH_SIZE"
+
+CHECKS_FETCH_SIZE: int = vutil.validated_is_positive_int(
+    get_typed_envar(_CHECKS_FETCH_SIZE_ENVAR_NAME, default=1000, conversion=lambda x: int(x))
+)
+"""
+Number of checks fetched together from the data store when reading many (e.g. all) checks; only one page of checks is kept in memory at a time.
+"""
+
+_IMPORT_BATCH_SIZE_ENVAR_NAME = "FC_IMPORT_BATCH_SIZE"
+
+IMPORT_BATCH_SIZE: int = vutil.validated_is_positive_int(
+    get_typed_envar(_IMPORT_BATCH_SIZE_ENVAR_NAME, default=1000, conversion=lambda x: int(x))
+)
+"""
+Number of checks validated and upserted together when importing checks from a file (see `importing.import_checks`).
+"""
+
+_RESULTS_BATCH_SIZE_ENVAR_NAME = "FC_RESULTS_BATCH_SIZE"
+
+RESULTS_BATCH_SIZE: int = vutil.validated_is_positive_int(
+    get_typed_envar(_RESULTS_BATCH_SIZE_ENVAR_NAME, default=1, conversion=lambda x: int(x))
+)
+"""
+Number of check results to buffer in memory before writing them together in a single batch.
+
+The default (1) writes each result immediately, without buffering.
+"""
+
+_RESULTS_BATCH_MAX_AGE_SECONDS_ENVAR_NAME = "FC_RESULTS_BATCH_MAX_AGE_SECONDS"
+
+RESULTS_BATCH_MAX_AGE_SECONDS: float = get_typed_envar(
+    _RESULTS_BATCH_MAX_AGE_SECONDS_ENVAR_NAME, default=2.0, conversion=lambda x: float(x)
+)
+"""
+Maximum time a check result can stay buffered (if RESULTS_BATCH_SIZE > 1) before the batch is written, even if it is not full.
+"""
+
+RESULTS_PARTITION_PERIODS = ("day", "week")
+"""Time spans of the CheckResult's partitions (by the results' start time, in UTC); the weeks start on Monday."""
+
+_RESULTS_PARTITION_PERIOD_ENVAR_NAME = "FC_RESULTS_PARTITION_PERIOD"
+
+RESULTS_PARTITION_PERIOD: str = get_typed_envar(
+    _RESULTS_PARTITION_PERIOD_ENVAR_NAME,
+    default="day",
+    conversion=lambda x: vutil.validated_choice(_RESULTS_PARTITION_PERIOD_ENVAR_NAME, x, RESULTS_PARTITION_PERIODS),
+)
+"""
+Time span of each partition of the stored results, by their start time; see `RESULTS_PARTITION_PERIODS`.
+"""
+
+_RESULTS_RETENTION_DAYS_ENVAR_NAME = "FC_RESULTS_RETENTION_DAYS"
+
+RESULTS_RETENTION_DAYS: int = get_typed_envar(
+    _RESULTS_RETENTION_DAYS_ENVAR_NAME, default=0, conversion=lambda x: int(x)
+)
+"""
+Number of days the check results are kept; the older ones are dropped a whole partition at a time.
+
+The default (0) keeps all results forever.
+"""
+
+_ROLLUPS_MINUTE_RETENTION_DAYS_ENVAR_NAME = "FC_ROLLUPS_MINUTE_RETENTION_DAYS"
+
+ROLLUPS_MINUTE_RETENTION_DAYS: int = get_typed_envar(
+    _ROLLUPS_MINUTE_RETENTION_DAYS_ENVAR_NAME, default=7, conversion=lambda x: int(x)
+)
+"""
+Number of days the minute rollups of the results are kept (0 means forever), regardless of the results' retention.
+"""
+
+_ROLLUPS_HOUR_RETENTION_DAYS_ENVAR_NAME = "FC_ROLLUPS_HOUR_RETENTION_DAYS"
+
+ROLLUPS_HOUR_RETENTION_DAYS: int = get_typed_envar(
+    _ROLLUPS_HOUR_RETENTION_DAYS_ENVAR_NAME, default=90, conversion=lambda x: int(x)
+)
+"""
+Number of days the hour rollups of the results are kept (0 means forever), regardless of the results' retention.
+"""
+
+_ROLLUPS_DAY_RETENTION_DAYS_ENVAR_NAME = "FC_ROLLUPS_DAY_RETENTION_DAYS"
+
+ROLLUPS_DAY_RETENTION_DAYS: int = get_typed_envar(
+    _ROLLUPS_DAY_RETENTION_DAYS_ENVAR_NAME, default=0, conversion=lambda x: int(x)
+)
+"""
+Number of days the day rollups of the results are kept (0 means forever), regardless of the results' retention.
+
+The default (0) keeps them forever: they are 1 row per URL & day.
+"""
+
 # -----------------------------------------------------------------------------
 
 TOO_BIG_CONTENT_LENGTH_KB = get_typed_envar("FC_TOO_BIG_CONTENT_LENGTH_KB", default=100000, conversion=lambda x: int(x))
@@ -70,6 +350,105 @@ TOO_BIG_CONTENT_LENGTH_KB = get_typed_envar("FC_TOO_BIG_CONTENT_LENGTH_KB", defa
 Limit value (in _kilo_ bytes, not kibi bytes) to consider a response's content length as too big to be read in memory.
 
 For reference, the size of https://python.org is, as of 2023-07-06, 49943 bytes.
+
+The limit applies too to the bytes actually read, for responses that don't report their Content-Length.
+"""
+
+REGEX_SEARCH_CHUNK_KB = get_typed_envar("FC_REGEX_SEARCH_CHUNK_KB", default=64, conversion=lambda x: int(x))
+"""
+Size (in kilo bytes) of the chunks in which a response's body is read to search a regex in it.
+
+Only (about) a chunk is held in memory at a time, regardless of the body size.
+"""
+
+REGEX_SEARCH_OVERLAP_CHARS = get_typed_envar("FC_REGEX_SEARCH_OVERLAP_CHARS", default=4096, conversion=lambda x: int(x))
+"""
+Number of characters at the end of a body's chunk that are searched again together with the next chunk, to find regex matches that span two chunks.
+
+Matches longer than this value might not be found.
+"""
+
+KEEPALIVE_MAX_DRAIN_KB = get_typed_envar("FC_KEEPALIVE_MAX_DRAIN_KB", default=256, conversion=lambda x: int(x))
+"""
+Maximum size (in kilo bytes) of a response's unread body that is drained (read & discarded) so that its connection can be reused (keep-alive).
+
+Connections of responses with bigger bodies are closed instead. With 0, only connections without a pending body are reused.
+"""
+
+_CONNECTOR_LIMIT_ENVAR_NAME = "FC_CONNECTOR_LIMIT"
+
+CONNECTOR_LIMIT: int = get_typed_envar(_CONNECTOR_LIMIT_ENVAR_NAME, default=100, conversion=lambda x: int(x))
+"""
+Maximum number of simultaneous connections (to all hosts) of the checks' connection pool; 0 means no limit.
+"""
+
+_CONNECTOR_LIMIT_PER_HOST_ENVAR_NAME = "FC_CONNECTOR_LIMIT_PER_HOST"
+
+CONNECTOR_LIMIT_PER_HOST: int = get_typed_envar(
+    _CONNECTOR_LIMIT_PER_HOST_ENVAR_NAME, default=0, conversion=lambda x: int(x)
+)
+"""
+Maximum number of simultaneous connections to the same host (and port) of the checks' connection pool; 0 means no limit.
+"""
+
+_DNS_CACHE_TTL_SECONDS_ENVAR_NAME = "FC_DNS_CACHE_TTL_SECONDS"
+
+DNS_CACHE_TTL_SECONDS: int = get_typed_envar(_DNS_CACHE_TTL_SECONDS_ENVAR_NAME, default=10, conversion=lambda x: int(x))
+"""
+Time that the connection pool caches the resolved addresses of a host (with the "default" DNS resolver; the "ttl" resolver uses the records' TTLs).
+"""
+
+_KEEPALIVE_TIMEOUT_SECONDS_ENVAR_NAME = "FC_KEEPALIVE_TIMEOUT_SECONDS"
+
+KEEPALIVE_TIMEOUT_SECONDS: float = get_typed_envar(
+    _KEEPALIVE_TIMEOUT_SECONDS_ENVAR_NAME, default=15.0, conversion=lambda x: float(x)
+)
+"""
+Time that an idle connection is kept open to be reused (keep-alive) by the next requests to the same host.
+
+To reuse the connections across the scheduled runs of the same checks, it must be greater than their interval (note: servers might close them earlier anyway).
+"""
+
+_EVENT_LOOP_ENVAR_NAME = "FC_EVENT_LOOP"
+
+EVENT_LOOP: str = get_typed_envar(
+    _EVENT_LOOP_ENVAR_NAME,
+    default="asyncio",
+    conversion=lambda x: vutil.validated_choice(_EVENT_LOOP_ENVAR_NAME, x, EVENT_LOOP_NAMES),
+)
+"""
+Event loop that runs the checks; see `loops.EVENT_LOOP_NAMES`.
+"""
+
+_DNS_RESOLVER_ENVAR_NAME = "FC_DNS_RESOLVER"
+
+DNS_RESOLVER: str = get_typed_envar(
+    _DNS_RESOLVER_ENVAR_NAME,
+    default="default",
+    conversion=lambda x: vutil.validated_choice(_DNS_RESOLVER_ENVAR_NAME, x, DNS_RESOLVER_NAMES),
+)
+"""
+DNS resolver of the checks' connections; see `dns.DNS_RESOLVER_NAMES`.
+"""
+
+# -----------------------------------------------------------------------------
+
+_TRACE_REQUEST_PHASES_ENVAR_NAME = "FC_TRACE_REQUEST_PHASES"
+
+TRACE_REQUEST_PHASES: bool = get_typed_envar(
+    _TRACE_REQUEST_PHASES_ENVAR_NAME, default=False, conversion=vutil.validated_parsed_bool_answer
+)
+"""
+Whether to record, in each check result, the durations of the request's phases (DNS, connect, time to first byte, body read, and regex search).
+
+Disabled by default; when disabled, the requests are not traced at all.
+"""
+
+REGEX_CACHE_SIZE = get_typed_envar("FC_REGEX_CACHE_SIZE", default=1024, conversion=lambda x: int(x))
+"""
+Maximum number of compiled regexes kept in memory to be reused across checks (least recently used are evicted first).
+
+To avoid recompilations, it should be greater than the number of distinct regexes of the scheduled checks.
 """
 
 # -----------------------------------------------------------------------------
@@ -0,0 +1,142 @@
+#
+# DNS resolution for the checks' requests.
+#
+
+import asyncio
+import socket
+import time
+from collections import OrderedDict
+from typing import Any
+
+from aiohttp.abc import AbstractResolver
+
+from fastchecks import require
+
+DNS_RESOLVER_NAMES = ("default", "ttl")
+"""
+Names of the DNS resolvers that can be used by the checks' connections:
+* default: aiohttp's default resolver, whose results are cached by the connection pool for a fixed time.
+* ttl: `TTLCachingResolver`, which caches the results for as long as the DNS records' TTLs say (requires the optional package `aiodns`).
+"""
+
+
+class TTLCachingResolver(AbstractResolver):
+    """
+    Asynchronous DNS resolver (with the package `aiodns`, imported lazily) that caches each resolved host for as long as its records' TTL says.
+
+    The TTL (the minimum of the resolved records) is clamped between `min_ttl_seconds` and `max_ttl_seconds`.
+    Concurrent resolutions of the same host share a single DNS query.
+    At most `max_cached_hosts` are cached: the least recently used are evicted first, and the expired ones when looked up.
+
+    Use it in a connector without its own DNS cache, e.g. `aiohttp.TCPConnector(resolver=resolver, use_dns_cache=False)`.
+    The connector does not close a given resolver: close it after the connector.
+    """
+
+    def __init__(
+        self, min_ttl_seconds: float = 1.0, max_ttl_seconds: float = 3600.0, max_cached_hosts: int = 10_000
+    ) -> None:
+        require(0 <= min_ttl_seconds <= max_ttl_seconds, f"Invalid TTL bounds: {min_ttl_seconds}, {max_ttl_seconds}")
+        require(max_cached_hosts > 0, f"The max number of cached hosts must be positive: {max_cached_hosts}")
+
+        try:
+            import aiodns
+        except ImportError as e:
+            raise ImportError(
+                "The TTL-caching DNS resolver requires the package aiodns (pip install 'fastchecks[dns]')"
+            ) from e
+
+        self._aiodns = aiodns
+        self._resolver = aiodns.DNSResolver()
+        self.min_ttl_seconds = min_ttl_seconds
+        self.max_ttl_seconds = max_ttl_seconds
+        self.max_cached_hosts = max_cached_hosts
+
+        self._cache: OrderedDict[tuple[str, int, int], tuple[float, list[dict[str, Any]]]] = OrderedDict()
+        """(host, port, family) -> (monotonic expiration time, resolved hosts); from the least to the most recently used"""
+        self._in_flight: dict[tuple[str, int, int], asyncio.Future[list[dict[str, Any]]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def resolve(  # type: ignore[override]
+        self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET
+    ) -> list[dict[str, Any]]:
+        key = (host, port, family)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return cached[1]
+            else:
+                del self._cache[key]
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.hits += 1
+            # Shield it, so that a cancelled caller does not cancel the query for the others
+            return await asyncio.shield(in_flight)
+
+        self.misses += 1
+        future = asyncio.ensure_future(self._query(host, port, family))
+        self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        return await asyncio.shield(future)
+
+    async def _query(self, host: str, port: int, family: socket.AddressFamily) -> list[dict[str, Any]]:
+        try:
+            response = await self._resolver.getaddrinfo(host, family=family, port=port, type=socket.SOCK_STREAM)
+        except self._aiodns.error.DNSError as e:
+            raise OSError(None, e.args[1] if len(e.args) > 1 else "DNS lookup failed") from e
+
+        hosts = [
+            dict(
+                hostname=host,
+                host=node.addr[0].decode("ascii"),
+                port=node.addr[1],
+                family=node.family,
+                proto=0,
+                flags=socket.AI_NUMERICHOST | socket.AI_NUMERICSERV,
+            )
+            for node in response.nodes
+        ]
+
+        if len(hosts) == 0:
+            raise OSError(None, "DNS lookup failed")
+
+        ttl = self.clamped_ttl(min(node.ttl for node in response.nodes))
+        self._cache_hosts((host, port, family), time.monotonic() + ttl, hosts)
+
+        return hosts
+
+    def _cache_hosts(self, key: tuple[str, int, int], expiration: float, hosts: list[dict[str, Any]]) -> None:
+        self._cache[key] = (expiration, hosts)
+        self._cache.move_to_end(key)
+
+        while len(self._cache) > self.max_cached_hosts:
+            self._cache.popitem(last=False)
+
+    def clamped_ttl(self, ttl: float) -> float:
+        return min(max(ttl, self.min_ttl_seconds), self.max_ttl_seconds)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    async def close(self) -> None:
+        self.clear()
+
+        # `close` is only available since aiodns 4
+        if hasattr(self._resolver, "close"):
+            await self._resolver.close()
+        else:
+            self._resolver.cancel()
+
+
+def new_dns_resolver(name: str) -> AbstractResolver | None:
+    """
+    Return a new DNS resolver given its name (see `DNS_RESOLVER_NAMES`), or None for aiohttp's default resolver.
+    """
+    require(name in DNS_RESOLVER_NAMES, f"Unknown DNS resolver: {name} (valid: {', '.join(DNS_RESOLVER_NAMES)})")
+
+    return TTLCachingResolver() if name == "ttl" else None
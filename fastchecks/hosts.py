@@ -0,0 +1,97 @@
+#
+# Politeness towards the checked hosts.
+#
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from urllib.parse import urlsplit
+
+from fastchecks import require
+
+
+class _HostState:
+    def __init__(self, max_concurrency: int) -> None:
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        self.spacing_lock = asyncio.Lock()
+        self.next_start = 0.0
+        """Monotonic time from which the next request to the host can start."""
+        self.num_requests = 0
+        """Number of requests holding or waiting for the host's slot."""
+
+
+class HostLimiter:
+    """
+    Limit, per host, the number of in-flight requests and the minimum time between the start of two consecutive requests.
+
+    Checks of different paths of the same host are then sent one after another (with `max_concurrency=1`),
+    which lets them reuse the same warm (keep-alive) connection, instead of opening several parallel connections to the host.
+    Checks of different hosts are not affected by each other.
+
+    A `max_concurrency` of 0 means no concurrency limit, and a `min_spacing_seconds` of 0 means no spacing.
+
+    Note: the state of a host is kept in memory only while it's in use: it's evicted once no request holds or waits for its slot,
+    and its spacing is over; so the hosts of deleted checks are not kept forever.
+    """
+
+    def __init__(self, max_concurrency: int, min_spacing_seconds: float) -> None:
+        require(max_concurrency >= 0, f"The maximum concurrency per host must be non-negative: {max_concurrency}")
+        require(min_spacing_seconds >= 0, f"The minimum spacing per host must be non-negative: {min_spacing_seconds}")
+
+        self.max_concurrency = max_concurrency
+        self.min_spacing_seconds = min_spacing_seconds
+        self._hosts: dict[str, _HostState] = {}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlsplit(url).hostname or ""
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """
+        Wait until a request to the url's host is allowed, and hold the host's slot while in the context.
+        """
+        host = self.host_of(url)
+
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.max_concurrency)
+
+        state.num_requests += 1
+        try:
+            if state.semaphore is None:
+                await self._wait_spacing(state)
+                yield
+            else:
+                async with state.semaphore:
+                    await self._wait_spacing(state)
+                    yield
+        finally:
+            state.num_requests -= 1
+            if state.num_requests == 0:
+                self._evict_when_idle(host, state)
+
+    def _evict_when_idle(self, host: str, state: _HostState) -> None:
+        wait_seconds = state.next_start - time.monotonic()
+        if wait_seconds > 0:
+            # Not before the spacing is over, so that the host's next request is still spaced from the last one
+            asyncio.get_running_loop().call_later(wait_seconds, self._evict_if_idle, host, state)
+        else:
+            self._evict_if_idle(host, state)
+
+    def _evict_if_idle(self, host: str, state: _HostState) -> None:
+        if state.num_requests == 0 and self._hosts.get(host) is state:
+            del self._hosts[host]
+
+    async def _wait_spacing(self, state: _HostState) -> None:
+        if self.min_spacing_seconds == 0:
+            return
+
+        # The lock makes the waiting requests start one by one (in order), each spaced from the previous one
+        async with state.spacing_lock:
+            wait_seconds = state.next_start - time.monotonic()
+            if wait_seconds > 0:
+                await asyncio.sleep(wait_seconds)
+
+            state.next_start = time.monotonic() + self.min_spacing_seconds
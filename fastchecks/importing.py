@@ -0,0 +1,136 @@
+#
+# Import of many checks from CSV or JSONL files.
+#
+
+import csv
+import json
+import os
+from typing import Any, Iterator
+
+from pydantic import BaseModel
+
+from fastchecks import conf, require, vutil
+from fastchecks.log import MAIN_LOGGER as logging
+from fastchecks.sockets import WebsiteCheckSocket
+from fastchecks.types import WebsiteCheck, WebsiteCheckScheduled
+
+IMPORT_FORMATS = ("csv", "jsonl")
+"""
+Formats of the files of checks that can be imported, with one check per row (or line) and the fields:
+url (required), regex, extra_regexes, and interval_seconds.
+* csv: with a header row; the extra regexes are written as a JSON array (e.g. `["a", "b"]`), and the empty values are null.
+* jsonl: one JSON object per line.
+"""
+
+_FIELDS = ("url", "regex", "extra_regexes", "interval_seconds")
+
+
+class ImportStats(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    invalid: int = 0
+
+
+def format_of(path: str) -> str:
+    """Return the format of the file of checks given its extension (see `IMPORT_FORMATS`), or raise ValueError."""
+    ext = os.path.splitext(path)[1].lstrip(".").lower()
+    require(
+        ext in IMPORT_FORMATS, f"Unknown format of the file: {path} (valid extensions: {', '.join(IMPORT_FORMATS)})"
+    )
+    return ext
+
+
+def read_rows(path: str, format: str) -> Iterator[tuple[int, dict[str, Any] | None]]:
+    """
+    Stream the rows of the file of checks, each with its line number, as the raw fields of a check (not validated yet).
+    A row that can't be parsed (e.g. invalid JSON) is yielded as None, to be reported as invalid.
+    """
+    require(format in IMPORT_FORMATS, f"Unknown format: {format} (valid: {', '.join(IMPORT_FORMATS)})")
+
+    with open(path, newline="") as f:
+        if format == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, _parsed_csv_row(row)
+        else:
+            for line_num, line in enumerate(f, start=1):
+                if line.strip():
+                    yield line_num, _parsed_json_row(line)
+
+
+def _parsed_csv_row(row: dict[str, str | None]) -> dict[str, Any] | None:
+    try:
+        return {
+            key: None if not value else json.loads(value) if key == "extra_regexes" else value
+            for key, value in row.items()
+        }
+    except ValueError:
+        return None
+
+
+def _parsed_json_row(line: str) -> dict[str, Any] | None:
+    try:
+        row = json.loads(line)
+    except ValueError:
+        return None
+    return row if isinstance(row, dict) else None
+
+
+def validated_check(row: dict[str, Any] | None) -> WebsiteCheckScheduled:
+    """Return the check of the given raw fields, or raise ValueError if they are invalid (or None, i.e. the row could not be parsed)."""
+    if row is None:
+        raise ValueError("The row could not be parsed")
+    require(row.get("url") is not None, "The url is required")
+    unknown = row.keys() - _FIELDS
+    require(not unknown, f"Unknown fields: {', '.join(sorted(unknown))} (valid: {', '.join(_FIELDS)})")
+
+    extra_regexes = row.get("extra_regexes")
+    require(extra_regexes is None or isinstance(extra_regexes, list), "The extra regexes must be a list")
+    interval_seconds = row.get("interval_seconds")
+
+    return WebsiteCheckScheduled.with_check(
+        WebsiteCheck.with_validation(row["url"], row.get("regex"), extra_regexes),
+        None if interval_seconds is None else int(interval_seconds),
+    )
+
+
+async def import_checks(
+    checks: WebsiteCheckSocket, path: str, format: str | None = None, batch_size: int | None = None
+) -> ImportStats:
+    """
+    Upsert the checks of the file (see `IMPORT_FORMATS`; by default, the format is given by the file's extension) in batches of `batch_size`
+    (default: `conf.IMPORT_BATCH_SIZE`), and return how many were inserted, updated, unchanged, or invalid.
+
+    The file is streamed, i.e. only one batch is in memory at a time. The invalid rows are logged (with their line number) and skipped.
+    Each batch is upserted in its own transaction (see `WebsiteCheckSocket.upsert_many`).
+    """
+    _format = format_of(path) if format is None else format
+    _batch_size = conf.IMPORT_BATCH_SIZE if batch_size is None else vutil.validated_is_positive_int(batch_size)
+
+    stats = ImportStats()
+    batch: list[WebsiteCheckScheduled] = []
+
+    async def flush() -> None:
+        inserted, updated = await checks.upsert_many(batch)
+        stats.inserted += inserted
+        stats.updated += updated
+        stats.unchanged += len({check.url for check in batch}) - inserted - updated
+        batch.clear()
+        logging.info(f"Imported checks so far: {stats}")
+
+    for line_num, row in read_rows(path, _format):
+        try:
+            batch.append(validated_check(row))
+        except (ValueError, TypeError) as e:
+            stats.invalid += 1
+            logging.warning(f"Invalid check at line {line_num} of {path}: {e}")
+            continue
+
+        if len(batch) >= _batch_size:
+            await flush()
+
+    if batch:
+        await flush()
+
+    return stats
@@ -0,0 +1,103 @@
+#
+# Adaptive (per URL) request timeouts, derived from the URLs' historical response times.
+#
+
+from collections import deque
+from typing import AsyncIterator, Iterable
+
+from fastchecks import conf, require
+from fastchecks.types import CheckResult
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """
+    Return the `p`-th percentile (0 <= p <= 100) of the given non-empty, sorted values, with linear interpolation.
+    """
+    k = (len(sorted_values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+class AdaptiveTimeouts:
+    """
+    Estimate a request timeout per URL from a rolling window of its latest response times.
+
+    The timeout of a URL is the `percentile` of its latest `window` response times multiplied by `multiplier`, clamped between `min_seconds` and `max_seconds`.
+    URLs with fewer than `min_samples` response times get `max_seconds`.
+
+    Thus, a dead endpoint of a usually fast URL times out (and frees its concurrency slot) quickly,
+    while usually slow URLs get a longer timeout, so that they are not flagged as timed out.
+    A timed-out check counts as a response time equal to its timeout: if a URL times out repeatedly, its timeout grows (up to `max_seconds`).
+    Checks that failed otherwise (e.g. unreachable host) are not counted, since their response time says nothing about the URL's latency.
+
+    The values that are None default to the corresponding `conf` values.
+    """
+
+    def __init__(
+        self,
+        percentile: float | None = None,
+        multiplier: float | None = None,
+        min_seconds: float | None = None,
+        max_seconds: float | None = None,
+        window: int | None = None,
+        min_samples: int = 5,
+    ) -> None:
+        self.percentile = conf.ADAPTIVE_TIMEOUT_PERCENTILE if percentile is None else percentile
+        self.multiplier = conf.ADAPTIVE_TIMEOUT_MULTIPLIER if multiplier is None else multiplier
+        self.min_seconds = conf.ADAPTIVE_TIMEOUT_MIN_SECONDS if min_seconds is None else min_seconds
+        self.max_seconds = conf.DEFAULT_REQ_TIMEOUT_SECONDS if max_seconds is None else max_seconds
+        self.window = conf.ADAPTIVE_TIMEOUT_WINDOW if window is None else window
+        self.min_samples = min_samples
+
+        require(0 <= self.percentile <= 100, f"The percentile must be between 0 and 100: {self.percentile}")
+        require(self.multiplier > 0, f"The multiplier must be positive: {self.multiplier}")
+        require(
+            0 < self.min_seconds <= self.max_seconds,
+            f"Invalid timeout bounds: {self.min_seconds}, {self.max_seconds}",
+        )
+        require(
+            0 < self.min_samples <= self.window, f"Invalid min samples or window: {self.min_samples}, {self.window}"
+        )
+
+        self._samples: dict[str, deque[float]] = {}
+
+    def timeout(self, url: str) -> float:
+        samples = self._samples.get(url)
+
+        if samples is None or len(samples) < self.min_samples:
+            return self.max_seconds
+        else:
+            estimate = percentile(sorted(samples), self.percentile) * self.multiplier
+            return min(max(estimate, self.min_seconds), self.max_seconds)
+
+    def observe(self, result: CheckResult) -> None:
+        """Add the result's response time to its URL's window, if the result says something about the URL's latency."""
+        if result.response_status is not None or result.timeout_error:
+            samples = self._samples.get(result.check.url)
+            if samples is None:
+                samples = self._samples[result.check.url] = deque(maxlen=self.window)
+
+            samples.append(result.response_time)
+
+    def observe_all(self, results: Iterable[CheckResult]) -> None:
+        for result in results:
+            self.observe(result)
+
+    async def seed(self, results: AsyncIterator[CheckResult]) -> int:
+        """
+        Observe the given (historical) results, assumed to be sorted from most recent to oldest per URL, and return their number.
+        """
+        # Observe them chronologically, so that the window keeps the most recent ones
+        per_url: dict[str, list[CheckResult]] = {}
+        async for result in results:
+            per_url.setdefault(result.check.url, []).append(result)
+
+        for url_results in per_url.values():
+            self.observe_all(reversed(url_results))
+
+        return sum(len(url_results) for url_results in per_url.values())
+
+    def __len__(self) -> int:
+        """Return the number of URLs with some response time."""
+        return len(self._samples)
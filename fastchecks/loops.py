@@ -0,0 +1,37 @@
+#
+# Event loop that runs the checks.
+#
+
+import asyncio
+from typing import Callable
+
+from fastchecks import require
+from fastchecks.log import MAIN_LOGGER as logging
+
+EVENT_LOOP_NAMES = ("asyncio", "uvloop")
+"""
+Names of the event loops that can run the checks:
+* asyncio: python's default event loop.
+* uvloop: a drop-in event loop based on libuv (requires the optional package `uvloop`), with faster sockets, TLS, and timers.
+"""
+
+
+def event_loop_factory(name: str) -> Callable[[], asyncio.AbstractEventLoop]:
+    """
+    Return the factory of new event loops given their name (see `EVENT_LOOP_NAMES`), e.g. to give to `asyncio.Runner`.
+
+    If uvloop is not installed, python's default event loop is used instead (with a warning).
+    """
+    require(name in EVENT_LOOP_NAMES, f"Unknown event loop: {name} (valid: {', '.join(EVENT_LOOP_NAMES)})")
+
+    if name == "uvloop":
+        try:
+            import uvloop
+
+            return uvloop.new_event_loop
+        except ImportError:
+            logging.warning(
+                "The uvloop event loop requires the package uvloop (pip install 'fastchecks[uvloop]'); using asyncio's"
+            )
+
+    return asyncio.new_event_loop
@@ -0,0 +1,94 @@
+#
+# Overrun protection of the scheduled checks: at most one run per check is in flight.
+#
+
+import asyncio
+from collections import Counter
+from typing import Awaitable, Callable, Generic, TypeVar
+
+from fastchecks import require
+from fastchecks.log import MAIN_LOGGER as logging
+
+OVERRUN_POLICIES = ("skip", "coalesce", "queue_one")
+"""
+What to do when a check is fired while its previous run is still in flight (e.g. its host is slower than its interval):
+* skip: drop the new fire.
+* coalesce: the new fire joins the run in flight, and gets its result (no new request is made).
+* queue_one: run once more right after the run in flight; further fires meanwhile are dropped.
+"""
+
+_T = TypeVar("_T")
+
+
+class OverrunGuard(Generic[_T]):
+    """
+    Make sure that at most one run per key (e.g. a check's url) is in flight, handling the overruns according to the `policy` (see `OVERRUN_POLICIES`).
+
+    The fires that did not make a run of their own (i.e. they were dropped or coalesced) are counted per key in `skipped`
+    (see also `newly_skipped`, to report them periodically).
+    """
+
+    def __init__(self, policy: str) -> None:
+        require(policy in OVERRUN_POLICIES, f"Unknown overrun policy: {policy} (valid: {', '.join(OVERRUN_POLICIES)})")
+
+        self.policy = policy
+        self.skipped: Counter[str] = Counter()
+        self._reported_skipped: Counter[str] = Counter()
+        self._in_flight: dict[str, asyncio.Future[_T]] = {}
+        self._queued: set[str] = set()
+
+    def is_in_flight(self, key: str) -> bool:
+        return key in self._in_flight
+
+    def newly_skipped(self) -> Counter[str]:
+        """Return the fires skipped since the previous call (or since created), counted per key."""
+        newly_skipped = self.skipped - self._reported_skipped
+        self._reported_skipped = self.skipped.copy()
+        return newly_skipped
+
+    async def run(self, key: str, fun: Callable[[], Awaitable[_T]]) -> _T | None:
+        """
+        Run `fun` unless a run for the same key is in flight; in that case, apply the policy.
+
+        Return the run's result, or None if the fire was dropped.
+        """
+        in_flight = self._in_flight.get(key)
+
+        if in_flight is None:
+            return await self._run_now(key, fun)
+
+        if self.policy == "queue_one" and key not in self._queued:
+            self._queued.add(key)
+            try:
+                await asyncio.wait([in_flight])
+            finally:
+                self._queued.discard(key)
+            return await self.run(key, fun)
+
+        self.skipped[key] += 1
+        logging.debug(f"Overrun ({self.policy}): the previous run is still in flight for: {key}")
+
+        if self.policy == "coalesce":
+            # Shield it, so that a cancelled joiner does not cancel the run for the others
+            return await asyncio.shield(in_flight)
+        else:
+            return None
+
+    async def _run_now(self, key: str, fun: Callable[[], Awaitable[_T]]) -> _T:
+        future: asyncio.Future[_T] = asyncio.get_running_loop().create_future()
+        # Mark the exception (if any) as retrieved, since there might be no joiners to retrieve it
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[key] = future
+
+        try:
+            result = await fun()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+            raise
+        finally:
+            del self._in_flight[key]
@@ -0,0 +1,48 @@
+import functools
+
+import re2
+
+from fastchecks import conf
+
+# Regex patterns (google-re2) shared across checks
+
+
+@functools.lru_cache(maxsize=conf.REGEX_CACHE_SIZE)
+def compiled_regex(regex: str) -> re2._Regexp:
+    """
+    Return the compiled regex, reusing it from a bounded LRU cache (of size `conf.REGEX_CACHE_SIZE`) if it was compiled before.
+
+    Thus, with the same regexes checked over and over, they are only compiled again when they change (or get evicted from the cache).
+    The regex is ASSUMED to be valid (see `vutil.validate_regex`); otherwise, re2 raises an error.
+    """
+    return re2.compile(regex)
+
+
+@functools.lru_cache(maxsize=conf.REGEX_CACHE_SIZE)
+def compiled_regex_set(regexes: tuple[str, ...]) -> re2.Set:
+    """
+    Return the compiled set of the given regexes, to find which of them match a text with a single scan of it (with `re2.Set.Match`).
+
+    The indexes returned by `Match` are the positions of the matching regexes in the given tuple.
+    Like `compiled_regex`, compiled sets are reused from a bounded LRU cache.
+    """
+    regex_set = re2.Set.SearchSet()
+    for regex in regexes:
+        regex_set.Add(regex)
+    regex_set.Compile()
+
+    return regex_set
+
+
+def compiled_regex_cache_info() -> functools._CacheInfo:
+    """
+    Return the statistics of the compiled regex cache (hits, misses, maxsize, currsize).
+    """
+    return compiled_regex.cache_info()
+
+
+def compiled_regex_set_cache_info() -> functools._CacheInfo:
+    """
+    Return the statistics of the compiled regex set cache (hits, misses, maxsize, currsize).
+    """
+    return compiled_regex_set.cache_info()
@@ -0,0 +1,219 @@
+#
+# Per-URL rollups of the check results (uptime & latency) at minute, hour, and day grain, with mergeable latency sketches.
+#
+
+import datetime
+import itertools
+import math
+from typing import Iterable
+
+from pydantic import BaseModel
+
+from fastchecks import require
+from fastchecks.types import CheckResult
+
+ROLLUP_GRAINS = ("minute", "hour", "day")
+"""Time spans of the rollups' buckets (by the results' start time, in UTC)."""
+
+# The latency sketch is a histogram of the response times in logarithmic buckets: bucket 0 holds the times up to SKETCH_MIN_SECONDS,
+# and bucket i > 0 those in (SKETCH_MIN_SECONDS * SKETCH_GAMMA**(i-1), SKETCH_MIN_SECONDS * SKETCH_GAMMA**i], up to ~97s (the last bucket holds the slower ones too).
+# Thus, the quantiles are estimated within a relative error of (SKETCH_GAMMA - 1) / (SKETCH_GAMMA + 1), i.e. ~9%,
+# and the sketches of different buckets (or URLs) are merged exactly by adding them up.
+# Note: these values must be the same as in the database's `latency_sketch__bucket` (see `up.sql`).
+
+SKETCH_MIN_SECONDS = 0.001
+
+SKETCH_GAMMA = 1.2
+
+SKETCH_NUM_BUCKETS = 64
+
+
+def sketch_bucket_of(response_time: float) -> int:
+    """Return the index of the sketch's bucket of the given response time (in seconds)."""
+    i = math.ceil(math.log(max(response_time, SKETCH_MIN_SECONDS) / SKETCH_MIN_SECONDS) / math.log(SKETCH_GAMMA))
+    return min(max(i, 0), SKETCH_NUM_BUCKETS - 1)
+
+
+def new_sketch(response_times: Iterable[float]) -> list[int]:
+    sketch = [0] * SKETCH_NUM_BUCKETS
+    for response_time in response_times:
+        sketch[sketch_bucket_of(response_time)] += 1
+    return sketch
+
+
+def merged_sketches(sketches: Iterable[list[int]]) -> list[int]:
+    return [sum(counts) for counts in zip(*sketches, strict=True)] or [0] * SKETCH_NUM_BUCKETS
+
+
+def sketch_quantile(sketch: list[int], q: float) -> float | None:
+    """
+    Return the estimated `q`-quantile (0 <= q <= 1) of the response times in the sketch, or None if it's empty.
+    """
+    require(0 <= q <= 1, f"The quantile must be between 0 and 1: {q}")
+
+    total = sum(sketch)
+    if total == 0:
+        return None
+
+    rank = q * (total - 1)
+    cumulative = 0
+    for i, count in enumerate(sketch):
+        cumulative += count
+        if cumulative > rank:
+            break
+
+    # The value of the bucket with the least relative error to any value in it
+    return SKETCH_MIN_SECONDS if i == 0 else 2 * SKETCH_MIN_SECONDS * SKETCH_GAMMA**i / (SKETCH_GAMMA + 1)
+
+
+_GRAIN_SPANS = {
+    "minute": datetime.timedelta(minutes=1),
+    "hour": datetime.timedelta(hours=1),
+    "day": datetime.timedelta(days=1),
+}
+
+
+def bucket_start_of(timestamp: datetime.datetime, grain: str) -> datetime.datetime:
+    require(grain in ROLLUP_GRAINS, f"Unknown rollup grain: {grain} (valid: {', '.join(ROLLUP_GRAINS)})")
+
+    timestamp = timestamp.replace(second=0, microsecond=0)
+    if grain in ("hour", "day"):
+        timestamp = timestamp.replace(minute=0)
+    if grain == "day":
+        timestamp = timestamp.replace(hour=0)
+
+    return timestamp
+
+
+def last_buckets_start(n: int, grain: str, now: datetime.datetime) -> datetime.datetime:
+    """Return the start of the first of the last `n` buckets of `grain` at `now`, the current bucket included; e.g. 6 days before today for the last 7 days."""
+    require(n > 0, f"The number of buckets must be positive: {n}")
+    return bucket_start_of(now, grain) - (n - 1) * _GRAIN_SPANS[grain]
+
+
+class CheckResultRollup(BaseModel):
+    """
+    The aggregated results of a URL in a bucket of time (of `grain`, started at `bucket_start`), or in several merged buckets (see `merged_rollups`).
+
+    The response times (latency) are only of the results with a response, since the failed requests' times say nothing about the URL's latency.
+    """
+
+    url: str
+    grain: str
+    bucket_start: datetime.datetime
+    #
+    num_checks: int
+    num_successes: int
+    """As in `CheckResult.is_success`"""
+    num_timeout_errors: int
+    num_host_errors: int
+    num_other_errors: int
+    num_responses: int
+    num_response_errors: int
+    """Responses with a non-OK status (>= 400)"""
+    #
+    response_time_sum: float
+    response_time_min: float | None
+    response_time_max: float | None
+    response_time_sketch: list[int] | None
+    """See `sketch_quantile`; None if there were no responses."""
+
+    def uptime(self) -> float | None:
+        """Return the ratio of successful checks, or None if there were no checks."""
+        return None if self.num_checks == 0 else self.num_successes / self.num_checks
+
+    def response_time_mean(self) -> float | None:
+        return None if self.num_responses == 0 else self.response_time_sum / self.num_responses
+
+    def response_time_quantile(self, q: float) -> float | None:
+        """Return the estimated `q`-quantile (0 <= q <= 1) of the response times, or None if there were no responses."""
+        if self.response_time_sketch is None or self.response_time_min is None or self.response_time_max is None:
+            return None
+
+        estimate = sketch_quantile(self.response_time_sketch, q)
+        return None if estimate is None else min(max(estimate, self.response_time_min), self.response_time_max)
+
+    def summary(self) -> str:
+        def ms(seconds: float | None) -> str:
+            return "-" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+        uptime = self.uptime()
+        return (
+            f"{self.url} (since {self.bucket_start}): checks={self.num_checks}, "
+            f"uptime={'-' if uptime is None else f'{uptime:.2%}'}, "
+            f"errors(timeout/host/other/response)={self.num_timeout_errors}/{self.num_host_errors}/{self.num_other_errors}/{self.num_response_errors}, "
+            f"latency(min/mean/p50/p95/p99/max)={ms(self.response_time_min)}/{ms(self.response_time_mean())}/"
+            f"{ms(self.response_time_quantile(0.5))}/{ms(self.response_time_quantile(0.95))}/{ms(self.response_time_quantile(0.99))}/"
+            f"{ms(self.response_time_max)}"
+        )
+
+
+def merged_rollups(rollups: Iterable[CheckResultRollup]) -> CheckResultRollup:
+    """
+    Merge the given (non-empty) rollups of the same URL, e.g. the day rollups of the last week, into one; it starts at the earliest bucket.
+    """
+    rollups = list(rollups)
+    require(len(rollups) > 0, "There must be some rollups to merge")
+    require(len({rollup.url for rollup in rollups}) == 1, "The rollups to merge must be of the same URL")
+
+    sketches = [rollup.response_time_sketch for rollup in rollups if rollup.response_time_sketch is not None]
+    mins = [rollup.response_time_min for rollup in rollups if rollup.response_time_min is not None]
+    maxs = [rollup.response_time_max for rollup in rollups if rollup.response_time_max is not None]
+
+    return CheckResultRollup(
+        url=rollups[0].url,
+        grain=rollups[0].grain,
+        bucket_start=min(rollup.bucket_start for rollup in rollups),
+        #
+        num_checks=sum(rollup.num_checks for rollup in rollups),
+        num_successes=sum(rollup.num_successes for rollup in rollups),
+        num_timeout_errors=sum(rollup.num_timeout_errors for rollup in rollups),
+        num_host_errors=sum(rollup.num_host_errors for rollup in rollups),
+        num_other_errors=sum(rollup.num_other_errors for rollup in rollups),
+        num_responses=sum(rollup.num_responses for rollup in rollups),
+        num_response_errors=sum(rollup.num_response_errors for rollup in rollups),
+        #
+        response_time_sum=sum(rollup.response_time_sum for rollup in rollups),
+        response_time_min=min(mins, default=None),
+        response_time_max=max(maxs, default=None),
+        response_time_sketch=merged_sketches(sketches) if sketches else None,
+    )
+
+
+def rollups_of_results(results: Iterable[CheckResult], grain: str) -> list[CheckResultRollup]:
+    """
+    Roll up the given results into buckets of `grain`; the rollups are sorted by url and bucket start.
+    """
+
+    def key(result: CheckResult) -> tuple[str, datetime.datetime]:
+        return (result.check.url, bucket_start_of(result.timestamp_start, grain))
+
+    rollups = []
+
+    for (url, bucket_start), group in itertools.groupby(sorted(results, key=key), key=key):
+        bucket = list(group)
+        responses = [result for result in bucket if result.response_status is not None]
+        response_times = [result.response_time for result in responses]
+
+        rollups.append(
+            CheckResultRollup(
+                url=url,
+                grain=grain,
+                bucket_start=bucket_start,
+                #
+                num_checks=len(bucket),
+                num_successes=sum(result.is_success() for result in bucket),
+                num_timeout_errors=sum(result.timeout_error for result in bucket),
+                num_host_errors=sum(result.host_error for result in bucket),
+                num_other_errors=sum(result.other_error for result in bucket),
+                num_responses=len(responses),
+                num_response_errors=sum(not result.is_response_ok() for result in responses),
+                #
+                response_time_sum=sum(response_times),
+                response_time_min=min(response_times, default=None),
+                response_time_max=max(response_times, default=None),
+                response_time_sketch=new_sketch(response_times) if responses else None,
+            )
+        )
+
+    return rollups
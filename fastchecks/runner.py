@@ -1,25 +1,60 @@
 import asyncio
+import contextlib
+import datetime
 from fastchecks.log import MAIN_LOGGER as logging
+import signal
 import sys
-from typing import AsyncIterator
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, Mapping
 
 import aiohttp
+from aiohttp.abc import AbstractResolver
+from apscheduler import ConflictPolicy, Task
+from apscheduler.marshalling import callable_to_ref
 from apscheduler.schedulers.async_ import AsyncScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
 from fastchecks import conf, require, util, vutil
 from fastchecks.check import check_website
+from fastchecks.client import ConnectorSettings
+from fastchecks.dns import TTLCachingResolver
+from fastchecks.hosts import HostLimiter
+from fastchecks.latency import AdaptiveTimeouts
+from fastchecks.overrun import OverrunGuard
+from fastchecks.scheduling import SCHEDULER_NAMES, HeapScheduler, fire_rate_histogram, phase_offset_seconds
+from fastchecks.sharding import Shard
+from fastchecks.patterns import compiled_regex_cache_info
 from fastchecks.sockets import CheckResultSocket, WebsiteCheckSocket
+from fastchecks.sockets.buffered import BufferedCheckResultSocket
 from fastchecks.sockets.postgres import (
     CheckResultSocketPostgres,
     WebsiteCheckSocketPostgres,
+    SCHEMA_VERSION,
     common_single_pg_datastore_is_ready,
     common_single_pg_datastore_init,
+    common_single_pg_datastore_schema_version,
 )
-from fastchecks.types import CheckResult, WebsiteCheck, WebsiteCheckScheduled
+from fastchecks.tracing import ConnectionReuseStats, request_phases_trace_config
+from fastchecks.types import CheckResult, WebsiteCheck, WebsiteCheckChange, WebsiteCheckScheduled
 
 # -----------------------------------------------------------------------------
 
+_RESULTS_MAINTENANCE_INTERVAL_SECONDS = 3600.0
+"""How often the results' storage is maintained while the checks run until stopped (see `CheckResultSocket.maintain`)"""
+
+_LIVE_SYNC_MIN_RETRY_SECONDS = 1.0
+"""How long to wait before listening again to the changes of the checks, if they stopped (e.g. the data store restarted); doubled on each failed retry"""
+
+_LIVE_SYNC_MAX_RETRY_SECONDS = 60.0
+
+_CLAIM_MIN_RETRY_SECONDS = 1.0
+"""How long the distributed scheduler waits before claiming the due checks again, if the claim failed (e.g. the data store restarted); doubled on each failed retry"""
+
+_CLAIM_MAX_RETRY_SECONDS = 60.0
+
+_OVERRUNS_REPORT_INTERVAL_SECONDS = 60.0
+"""How often the scheduled checks skipped meanwhile (see `OverrunGuard.skipped`) are logged while the checks run until stopped"""
+
 
 class ChecksRunnerContext:
     """
@@ -34,6 +69,12 @@ class ChecksRunnerContext:
         checks: WebsiteCheckSocket,
         results: CheckResultSocket,
         default_interval_seconds: int | None = None,
+        connection_reuse_stats: ConnectionReuseStats | None = None,
+        trace_request_phases: bool | None = None,
+        dns_resolver: AbstractResolver | None = None,
+        host_max_concurrency: int | None = None,
+        host_min_spacing_seconds: float | None = None,
+        adaptive_timeouts: bool | None = None,
     ) -> None:
         require(not session.closed, "Session must be open")
         require(not checks.is_closed(), "Checks socket must be open")
@@ -48,25 +89,125 @@ class ChecksRunnerContext:
             else conf.validated_interval(default_interval_seconds)
         )
         """Default interval for website checks that don't specify it"""
+        self.connection_reuse_stats = connection_reuse_stats
+        """If given, it must be traced by the session (see `ConnectionReuseStats.trace_config`)"""
+        self.trace_request_phases = conf.TRACE_REQUEST_PHASES if trace_request_phases is None else trace_request_phases
+        """If True, the session should trace the request phases too (see `request_phases_trace_config`)"""
+        self._dns_resolver = dns_resolver
+        """If given, it must be the resolver of the session's connector; it's closed together with the context (the connector does not close it)"""
+
+        _host_max_concurrency = conf.HOST_MAX_CONCURRENCY if host_max_concurrency is None else host_max_concurrency
+        _host_min_spacing_seconds = (
+            conf.HOST_MIN_SPACING_SECONDS if host_min_spacing_seconds is None else host_min_spacing_seconds
+        )
+        self.host_limiter = (
+            HostLimiter(_host_max_concurrency, _host_min_spacing_seconds)
+            if _host_max_concurrency > 0 or _host_min_spacing_seconds > 0
+            else None
+        )
+        """Politeness limits per host of the checks (None if there are no limits)"""
+
+        _adaptive_timeouts = conf.ADAPTIVE_TIMEOUTS if adaptive_timeouts is None else adaptive_timeouts
+        self.adaptive_timeouts = AdaptiveTimeouts() if _adaptive_timeouts else None
+        """Per-URL timeouts derived from the URLs' response times (None to use the default timeout for all); see `seed_adaptive_timeouts`"""
+        self._adaptive_timeouts_seeded = False
+
+        self.overrun_guard: OverrunGuard[CheckResult] = OverrunGuard(conf.OVERRUN_POLICY)
+        """At most one scheduled run per check is in flight; see `scheduled_check_n_write`"""
+
+        self.shard: Shard | None = None
+        """If given, only the checks owned by this shard are run until stopped (the others are left to other processes)"""
+
+        self._next_due_times: dict[str, datetime.datetime] | None = None
+        """If not None, the next due times of the scheduled checks that were fired and not yet persisted; see `_resume_schedule_phases`"""
+
+        self._stopping: asyncio.Event | None = None
+        """Set when the checks run until stopped should stop (None if they are not running); see `stop`"""
+        self._in_flight: set[asyncio.Future[CheckResult]] = set()
+        """The scheduled checks (each including the write of its result) in flight, to drain them when stopping"""
 
     # -----------------------------------------------------------------------------
 
     @classmethod
     async def with_single_datastore_postgres(
-        cls, pg_conninfo: str, auto_init: bool, timeout_init_sec: float = 10, **kwargs
+        cls,
+        pg_conninfo: str,
+        auto_init: bool,
+        timeout_init_sec: float = 10,
+        results_batch_size: int | None = None,
+        results_batch_max_age_seconds: float | None = None,
+        results_partition_period: str | None = None,
+        results_retention_days: int | None = None,
+        rollups_retention_days: Mapping[str, int] | None = None,
+        trace_request_phases: bool | None = None,
+        connector_settings: ConnectorSettings | None = None,
+        read_only: bool = False,
+        **kwargs,
     ) -> "ChecksRunnerContext":
+        """
+        Create a context whose checks & results are stored in the same postgres database.
+
+        If `results_batch_size` (default: `conf.RESULTS_BATCH_SIZE`) is greater than 1, the results are buffered and written in batches
+        (see `BufferedCheckResultSocket`), flushed at the latest every `results_batch_max_age_seconds` (default: `conf.RESULTS_BATCH_MAX_AGE_SECONDS`).
+
+        The results are stored in partitions of `results_partition_period` (default: `conf.RESULTS_PARTITION_PERIOD`),
+        and dropped after `results_retention_days` (default: `conf.RESULTS_RETENTION_DAYS`; 0 means never).
+        Their rollups are deleted after `rollups_retention_days` per grain (default: `conf.ROLLUPS_*_RETENTION_DAYS`; 0 means never).
+
+        If `trace_request_phases` (default: `conf.TRACE_REQUEST_PHASES`), the results include the durations of the request's phases.
+
+        All the checks' requests share the same connection pool, configured with `connector_settings` (default: from `conf`).
+
+        A database created with an older schema is refused (the process exits), unless the context is `read_only` (e.g. to read the checks
+        before migrating them; see the README's Upgrading section): then, it's only warned about, and the results' storage is not maintained.
+        """
         vutil.validated_pg_conninfo(pg_conninfo)
 
+        _results_batch_size = conf.RESULTS_BATCH_SIZE if results_batch_size is None else results_batch_size
+        _results_batch_max_age_seconds = (
+            conf.RESULTS_BATCH_MAX_AGE_SECONDS
+            if results_batch_max_age_seconds is None
+            else results_batch_max_age_seconds
+        )
+
+        results: CheckResultSocket = CheckResultSocketPostgres(
+            pg_conninfo,
+            partition_period=results_partition_period,
+            retention_days=results_retention_days,
+            rollups_retention_days=rollups_retention_days,
+        )
+        if _results_batch_size > 1:
+            results = BufferedCheckResultSocket(
+                results, max_size=_results_batch_size, max_age_seconds=_results_batch_max_age_seconds
+            )
+
+        _trace_request_phases = conf.TRACE_REQUEST_PHASES if trace_request_phases is None else trace_request_phases
+
+        connection_reuse_stats = ConnectionReuseStats()
+        trace_configs = [connection_reuse_stats.trace_config()]
+        if _trace_request_phases:
+            trace_configs.append(request_phases_trace_config())
+
+        _connector_settings = ConnectorSettings() if connector_settings is None else connector_settings
+        dns_resolver = _connector_settings.new_dns_resolver()
+
+        checks = WebsiteCheckSocketPostgres(pg_conninfo)
+
         ctx = cls(
-            session=aiohttp.ClientSession(),
-            checks=WebsiteCheckSocketPostgres(pg_conninfo),
-            results=CheckResultSocketPostgres(pg_conninfo),
+            session=aiohttp.ClientSession(
+                connector=_connector_settings.new_connector(dns_resolver), trace_configs=trace_configs
+            ),
+            checks=checks,
+            results=results,
+            connection_reuse_stats=connection_reuse_stats,
+            trace_request_phases=_trace_request_phases,
+            dns_resolver=dns_resolver,
             **kwargs,
         )
 
         try:
             # For instance, we use the socket's pool to check if the single common datastore is ready
-            is_ready = await common_single_pg_datastore_is_ready(ctx.checks._pool, timeout=timeout_init_sec)
+            is_ready = await common_single_pg_datastore_is_ready(checks._pool, timeout=timeout_init_sec)
             logging.debug(f"Postgres datastore is ready: {is_ready}")
 
             if not is_ready:
@@ -78,9 +219,11 @@ class ChecksRunnerContext:
                 inited = False
 
                 async with asyncio.timeout(delay=timeout_init_sec):
-                    inited = await common_single_pg_datastore_init(ctx.checks._pool, timeout=timeout_init_sec)
+                    inited = await common_single_pg_datastore_init(checks._pool, timeout=timeout_init_sec)
 
                 require(inited, "The postgres database could not be initialized")
+
+            schema_version = await common_single_pg_datastore_schema_version(checks._pool, timeout=timeout_init_sec)
         except:
             logging.critical(
                 f"Could not initialize the postgres database after {timeout_init_sec}s -- does the DB exist or do you have enough permissions?",
@@ -89,6 +232,23 @@ class ChecksRunnerContext:
             await ctx.close()
             sys.exit(2)
 
+        if schema_version != SCHEMA_VERSION:
+            # E.g. the results' table cannot be partitioned in place
+            message = (
+                f"The postgres database was created with an older schema (version {schema_version}; current: {SCHEMA_VERSION}), "
+                "which cannot be upgraded in place: export the checks, recreate the database, and import them (see the README's Upgrading section)"
+            )
+            if read_only:
+                logging.warning(message)
+                return ctx
+
+            logging.critical(message)
+            await ctx.close()
+            sys.exit(2)
+
+        if not read_only:
+            await ctx.maintain_results()
+
         return ctx
 
     # -----------------------------------------------------------------------------
@@ -97,21 +257,109 @@ class ChecksRunnerContext:
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
-        await asyncio.gather(self._aiohttp_session.close(), self.checks.close(), self.results.close())
+        try:
+            # Write any buffered results before closing anything, so that no results are lost on shutdown
+            await self.results.flush()
+        finally:
+            await asyncio.gather(self._aiohttp_session.close(), self.checks.close(), self.results.close())
+
+            if self._dns_resolver is not None:
+                await self._dns_resolver.close()
+
+        logging.debug(f"Compiled regex cache: {compiled_regex_cache_info()}")
+
+        if isinstance(self._dns_resolver, TTLCachingResolver):
+            logging.debug(f"DNS resolver cache: hits={self._dns_resolver.hits}, misses={self._dns_resolver.misses}")
+
+        if self.connection_reuse_stats is not None:
+            logging.info(self.connection_reuse_stats)
+            logging.debug(f"Connection reuse ratio per host: {self.connection_reuse_stats.reuse_ratios()}")
 
     async def close(self) -> None:
         await self.__aexit__(None, None, None)
 
     # -----------------------------------------------------------------------------
 
+    async def maintain_results(self) -> None:
+        """Maintain the results' storage (see `CheckResultSocket.maintain`), logging (not raising) any error."""
+        try:
+            await self.results.maintain()
+        except Exception as e:
+            # Not critical right away: e.g. with Postgres, the results out of the created partitions are kept in the default one
+            logging.error(f"Could not maintain the results' storage: {e}")
+
+    async def _maintain_results_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(_RESULTS_MAINTENANCE_INTERVAL_SECONDS)
+            await self.maintain_results()
+
+    def log_overruns(self) -> None:
+        """Log the scheduled checks skipped since the previous call, because their previous run was still in flight (if any)."""
+        skipped = self.overrun_guard.newly_skipped()
+
+        if skipped:
+            logging.warning(
+                f"Skipped scheduled checks because their previous run was still in flight ({self.overrun_guard.policy}): "
+                f"{skipped.total()} since the last report, the most per url: {dict(skipped.most_common(10))}"
+            )
+
+    async def _log_overruns_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(_OVERRUNS_REPORT_INTERVAL_SECONDS)
+            self.log_overruns()
+
+    # -----------------------------------------------------------------------------
+
     def get_interval_seconds(self, check: WebsiteCheckScheduled) -> int:
         return self.default_interval_seconds if check.interval_seconds is None else check.interval_seconds
 
+    def get_timeout_seconds(self, check: WebsiteCheck) -> float | None:
+        """Return the check's request timeout, or None for the default one."""
+        return None if self.adaptive_timeouts is None else self.adaptive_timeouts.timeout(check.url)
+
+    async def seed_adaptive_timeouts(self) -> int:
+        """
+        If adaptive timeouts are enabled and not yet seeded, seed them with the latest stored results of each URL
+        of the last `conf.ADAPTIVE_TIMEOUT_SEED_HOURS`, and return the number of used results.
+
+        It's called when the checks start running until stopped. Any error is logged (not raised): the URLs without seeded results get the default timeout.
+        """
+        if self.adaptive_timeouts is None or self._adaptive_timeouts_seeded:
+            return 0
+
+        since = util.get_utcnow() - datetime.timedelta(hours=conf.ADAPTIVE_TIMEOUT_SEED_HOURS)
+
+        try:
+            count = await self.adaptive_timeouts.seed(
+                self.results.read_last_n_per_url(self.adaptive_timeouts.window, since)
+            )
+        except Exception as e:
+            logging.error(f"Could not seed the adaptive timeouts with the stored results: {e}")
+            return 0
+
+        self._adaptive_timeouts_seeded = True
+        logging.debug(f"Adaptive timeouts seeded with {count} results of {len(self.adaptive_timeouts)} urls")
+        return count
+
     # -----------------------------------------------------------------------------
 
     async def check_only(self, check: WebsiteCheck) -> CheckResult:
-        """Check website without saving into results data storage."""
-        ret = await check_website(self._aiohttp_session, check)
+        """
+        Check website without saving into results data storage.
+
+        If there are politeness limits per host, wait until the check's host allows it (the waiting is not part of the response time).
+        """
+        timeout = self.get_timeout_seconds(check)
+
+        if self.host_limiter is None:
+            ret = await check_website(self._aiohttp_session, check, timeout, trace_phases=self.trace_request_phases)
+        else:
+            async with self.host_limiter.slot(check.url):
+                ret = await check_website(self._aiohttp_session, check, timeout, trace_phases=self.trace_request_phases)
+
+        if self.adaptive_timeouts is not None:
+            self.adaptive_timeouts.observe(ret)
+
         logging.info(ret)
         return ret
 
@@ -121,52 +369,615 @@ class ChecksRunnerContext:
         await self.results.write(ret)
         return ret
 
-    async def check_all_once_n_write(self) -> AsyncIterator[CheckResult]:
-        async for check in self.checks.read_n(util.PRACTICAL_MAX_INT):
-            result = await self.check_only(check)
-            await self.results.write(result)
-            yield result
+    async def scheduled_check_n_write(self, check: WebsiteCheckScheduled) -> CheckResult | None:
+        """
+        Check website and save into results data storage, as fired by a scheduler.
+
+        If the check's previous run is still in flight, the overrun policy applies (see `OverrunGuard`);
+        return None if the run was skipped.
+        """
+        if self._next_due_times is not None:
+            self._next_due_times[check.url] = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
+                seconds=self.get_interval_seconds(check)
+            )
+
+        return await self.overrun_guard.run(check.url, lambda: self._run_in_flight(self.check_n_write(check)))
+
+    async def _run_in_flight(self, coro: Coroutine[Any, Any, CheckResult]) -> CheckResult:
+        """
+        Run the coroutine to completion even if the caller is cancelled (e.g. the scheduler is stopped), so that it can be drained when stopping.
+        """
+        run = asyncio.ensure_future(coro)
+        self._in_flight.add(run)
+        run.add_done_callback(self._in_flight.discard)
+        return await asyncio.shield(run)
+
+    async def check_all_once_n_write(self, max_concurrency: int | None = None) -> AsyncIterator[CheckResult]:
+        """
+        Check all websites once, save their results, and yield each result as soon as it's saved.
+
+        At most `max_concurrency` checks (each including the write of its result) are in flight at the same time.
+        If None, the default `conf.DEFAULT_MAX_CONCURRENT_CHECKS` is used.
+        * With 1, the checks run sequentially, and the results are yielded in the same order as the checks are read.
+        * With more, the network I/O of some checks overlaps with the writing of others, and the results are yielded as they complete.
+        """
+        _max_concurrency = (
+            conf.DEFAULT_MAX_CONCURRENT_CHECKS
+            if max_concurrency is None
+            else vutil.validated_is_positive_int(max_concurrency)
+        )
+
+        pending: set[asyncio.Task[CheckResult]] = set()
+
+        try:
+            async for check in self.checks.read_n(util.PRACTICAL_MAX_INT):
+                if len(pending) >= _max_concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+
+                pending.add(asyncio.create_task(self.check_n_write(check)))
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+
+        finally:
+            # Only non-empty if we exited early (e.g. an exception or the consumer stopped iterating)
+            for task in pending:
+                task.cancel()
 
     # -----------------------------------------------------------------------------
 
-    async def _add_check_to_scheduler(self, scheduler: AsyncScheduler, check: WebsiteCheckScheduled) -> AsyncScheduler:
-        fun = self.check_n_write
+    def get_first_fire_delay_seconds(
+        self, check: WebsiteCheckScheduled, phase_spreading: bool, next_due_at: datetime.datetime | None = None
+    ) -> float:
+        """
+        Return the delay of the check's first run: until its (persisted) next due time if given, or else its phase offset if `phase_spreading`.
+
+        If the next due time already passed (e.g. the runner was stopped for a while), the check is delayed until its next run in the same phase,
+        instead of running right away (together with all the other overdue checks).
+        """
+        interval_seconds = self.get_interval_seconds(check)
+
+        if next_due_at is not None:
+            return (next_due_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds() % interval_seconds
+        else:
+            return phase_offset_seconds(check.url, interval_seconds) if phase_spreading else 0.0
+
+    async def _register_check_task(self, scheduler: AsyncScheduler) -> str:
+        """
+        Register the task that runs the scheduled checks, and return its id.
+
+        Adding the schedules by the task id (instead of by the function) spares re-registering the task for each check.
+        """
+        fun = self.scheduled_check_n_write
+        task_id = callable_to_ref(fun)
+        await scheduler.data_store.add_task(Task(id=task_id, func=fun))
+        return task_id
 
+    async def _add_check_to_scheduler(
+        self,
+        scheduler: AsyncScheduler,
+        check: WebsiteCheckScheduled,
+        first_fire_delay_seconds: float = 0.0,
+        max_jitter_seconds: float = 0.0,
+        task_id: str | None = None,
+    ) -> AsyncScheduler:
         # Note: we can later retrieve scheduled checks by their url (with `AsyncScheduler.get_schedule``)
         # MAYBE (2023-07-09; future idea): tag the check with the url's domain, so later we can filter on them
         await scheduler.add_schedule(
-            fun, trigger=IntervalTrigger(seconds=self.get_interval_seconds(check)), id=check.url, args=[check]
+            self.scheduled_check_n_write if task_id is None else task_id,
+            trigger=IntervalTrigger(
+                seconds=self.get_interval_seconds(check),
+                start_time=datetime.datetime.now(datetime.timezone.utc)
+                + datetime.timedelta(seconds=first_fire_delay_seconds),
+            ),
+            id=check.url,
+            args=[check],
+            max_jitter=max_jitter_seconds or None,
+            # If the check was already scheduled (e.g. it was updated), replace its schedule
+            conflict_policy=ConflictPolicy.replace,
         )
 
         return scheduler
 
-    async def _add_checks_to_scheduler(
-        self, scheduler: AsyncScheduler, checks: AsyncIterator[WebsiteCheckScheduled]
-    ) -> AsyncScheduler:
-        async for check in checks:
-            await self._add_check_to_scheduler(scheduler, check)
-
-        return scheduler
-
-    async def run_checks_until_stopped_in_foreground(self) -> None:
+    async def run_checks_until_stopped_in_foreground(
+        self,
+        scheduler: str | None = None,
+        max_concurrency: int | None = None,
+        phase_spreading: bool | None = None,
+        max_jitter_seconds: float | None = None,
+        overrun_policy: str | None = None,
+        live_sync: bool | None = None,
+        shard: Shard | None = None,
+        poll_interval_seconds: float | None = None,
+        resume_phases: bool | None = None,
+        drain_timeout_seconds: float | None = None,
+    ) -> None:
         """
         Run all saved checks until stopped (e.g. with Ctrl+C) in the foreground.
         The interval for each check is taken from the check itself, or the default interval if not specified.
 
-        If there are no checks yet, an error is raised.
+        The checks are run by the given `scheduler` engine (default: `conf.SCHEDULER`; see `scheduling.SCHEDULER_NAMES`).
+        With the native or distributed scheduler, at most `max_concurrency` (default: `conf.SCHEDULER_MAX_CONCURRENT_CHECKS`) checks run at the same time.
+
+        With the distributed scheduler, the due checks are claimed from the data store every `poll_interval_seconds` (default: `conf.DISTRIBUTED_POLL_INTERVAL_SECONDS`),
+        or as soon as there are free slots if more checks were due; thus, several runners (e.g. on different nodes) share the checks,
+        and the checks claimed by a runner that died are run by the others in their next interval.
+        The phase spreading, the jitter, the live sync, and the shard do not apply: the claims already spread the checks, and pick up their changes.
+        If a claim fails (e.g. the data store restarted), it's retried with backoff, while the claimed checks keep running.
+
+        If `phase_spreading` (default: `conf.SCHEDULE_PHASE_SPREADING`), the checks are spread across their interval (see `scheduling.phase_offset_seconds`);
+        and each run is delayed by a random jitter of up to `max_jitter_seconds` (default: `conf.SCHEDULE_MAX_JITTER_SECONDS`).
+        The resulting fire rate (checks per second) is reported at startup.
+
+        If `resume_phases` (default: `conf.RESUME_SCHEDULE_PHASES`), the next due time of each check is persisted in the data store,
+        so that a restarted runner resumes each check's phase (see `get_first_fire_delay_seconds`), instead of firing all checks anew.
+
+        If a check is fired while its previous run is still in flight, the `overrun_policy` (default: `conf.OVERRUN_POLICY`) applies;
+        see `overrun.OVERRUN_POLICIES`.
+
+        If `live_sync` (default: `conf.LIVE_SYNC_CHECKS`), the checks added, updated, or deleted meanwhile (e.g. with the CLI)
+        are added, rescheduled, or removed without restarting (see `WebsiteCheckSocket.listen_changes`).
+
+        If a `shard` is given, only the checks it owns are run, so that several processes can run all checks together (see `workers.WorkersSupervisor`).
+
+        If there are no checks yet, an error is raised (unless sharded or distributed, since other shards or runners might have them).
+
+        If adaptive timeouts are enabled, they are first seeded with the recent stored results (see `seed_adaptive_timeouts`).
+
+        Meanwhile, the results' storage is maintained every hour (e.g. to create the upcoming partitions and drop the expired ones),
+        and the checks skipped because of overruns are logged every minute (and in total when stopped).
+
+        The checks run until `stop` is called, which is done on SIGINT (e.g. Ctrl+C) or SIGTERM (e.g. by a process manager on a deploy):
+        no new checks are fired, the checks in flight are drained for up to `drain_timeout_seconds` (default: `conf.SHUTDOWN_DRAIN_TIMEOUT_SECONDS`),
+        and then the pending state is persisted; the pending results are flushed when the context is closed.
         """
-        try:
-            async with AsyncScheduler() as scheduler:
-                default_interval_msg = f" -- with default interval: {self.default_interval_seconds}s"
+        _scheduler = conf.SCHEDULER if scheduler is None else scheduler
+        require(_scheduler in SCHEDULER_NAMES, f"Unknown scheduler: {_scheduler} (valid: {', '.join(SCHEDULER_NAMES)})")
+        _max_concurrency = (
+            conf.SCHEDULER_MAX_CONCURRENT_CHECKS
+            if max_concurrency is None
+            else vutil.validated_is_positive_int(max_concurrency)
+        )
+        _phase_spreading = conf.SCHEDULE_PHASE_SPREADING if phase_spreading is None else phase_spreading
+        _max_jitter_seconds = conf.SCHEDULE_MAX_JITTER_SECONDS if max_jitter_seconds is None else max_jitter_seconds
+        if overrun_policy is not None:
+            self.overrun_guard = OverrunGuard(overrun_policy)
+        _live_sync = conf.LIVE_SYNC_CHECKS if live_sync is None else live_sync
+        _resume_phases = conf.RESUME_SCHEDULE_PHASES if resume_phases is None else resume_phases
+        _drain_timeout_seconds = (
+            conf.SHUTDOWN_DRAIN_TIMEOUT_SECONDS if drain_timeout_seconds is None else drain_timeout_seconds
+        )
+        self._next_due_times = None
+        self.shard = shard
 
-                async for check in await self.checks.read_all():
-                    await self._add_check_to_scheduler(scheduler, check)
-                    print(f"Adding check to scheduler: {check}{'' if check.interval_seconds else default_interval_msg}")
+        await self.seed_adaptive_timeouts()
 
-                require(len(await scheduler.get_schedules()) != 0, "No checks to run. Add some checks first.")
+        engine: Coroutine[Any, Any, None]
+        if _scheduler == "native":
+            engine = self._run_checks_with_native_scheduler(
+                _max_concurrency, _phase_spreading, _max_jitter_seconds, _live_sync, _resume_phases
+            )
+        elif _scheduler == "distributed":
+            engine = self._run_checks_with_distributed_scheduler(
+                _max_concurrency,
+                conf.DISTRIBUTED_POLL_INTERVAL_SECONDS if poll_interval_seconds is None else poll_interval_seconds,
+            )
+        else:
+            engine = self._run_checks_with_apscheduler(
+                _phase_spreading, _max_jitter_seconds, _live_sync, _resume_phases
+            )
 
-                print("\nRunning until stopped...\n")
-                await scheduler.run_until_stopped()
+        try:
+            await self._run_until_stopped_gracefully(engine, _drain_timeout_seconds)
 
         except (KeyboardInterrupt, SystemExit):
             pass
+
+        finally:
+            if self.overrun_guard.skipped:
+                logging.warning(
+                    f"Skipped scheduled checks because their previous run was still in flight ({self.overrun_guard.policy}): "
+                    f"{self.overrun_guard.skipped.total()} in total, per url: {dict(self.overrun_guard.skipped.most_common())}"
+                )
+
+    def _print_fire_rate(self, schedules: list[tuple[float, float]]) -> None:
+        if not schedules:
+            return
+
+        horizon_seconds = max(int(interval_seconds) for _, interval_seconds in schedules)
+        histogram = fire_rate_histogram(schedules, horizon_seconds)
+
+        print(
+            f"\nFire rate (checks per second) over the first {horizon_seconds}s: "
+            f"min={min(histogram)}, mean={sum(histogram) / horizon_seconds:.2f}, max={max(histogram)}"
+        )
+        logging.debug(f"Fire rate histogram (checks per second): {histogram}")
+
+    def stop(self) -> None:
+        """
+        Stop the checks run until stopped (see `run_checks_until_stopped_in_foreground`): no new checks are fired, and the checks in flight are drained.
+
+        If called again while draining (e.g. a second Ctrl+C), the checks in flight are cancelled right away (and their results are lost).
+        """
+        if self._stopping is None:
+            return
+
+        if not self._stopping.is_set():
+            logging.info(
+                "Stopping: no new checks are fired, and the checks in flight are drained (stop again to cancel them)"
+            )
+            self._stopping.set()
+        else:
+            logging.warning(f"Stopping right away: cancelling {len(self._in_flight)} checks in flight")
+            for run in self._in_flight:
+                run.cancel()
+
+    async def _run_until_stopped_gracefully(
+        self, engine: Coroutine[Any, Any, None], drain_timeout_seconds: float
+    ) -> None:
+        """
+        Run the scheduler engine until `stop` is called (or until the engine returns), then stop the engine and drain the checks in flight.
+        """
+        self._stopping = asyncio.Event()
+        engine_task = asyncio.create_task(engine)
+        stopping = asyncio.create_task(self._stopping.wait())
+        maintainer = asyncio.create_task(self._maintain_results_periodically())
+        overruns_logger = asyncio.create_task(self._log_overruns_periodically())
+        signals = self._add_stop_signal_handlers()
+
+        try:
+            await asyncio.wait([engine_task, stopping], return_when=asyncio.FIRST_COMPLETED)
+            # The checks in flight are not cancelled with the engine (see `_run_in_flight`)
+            await util.cancel_and_wait(engine_task)
+            await self._drain_in_flight_checks(drain_timeout_seconds)
+
+        finally:
+            self._remove_stop_signal_handlers(signals)
+            self._stopping = None
+            stopping.cancel()
+            await util.cancel_and_wait(maintainer)
+            await util.cancel_and_wait(overruns_logger)
+            # Only non-empty if we were cancelled (e.g. by a timeout): the checks in flight are not drained
+            for run in self._in_flight:
+                run.cancel()
+            # Wait for the engine to persist its state
+            await util.cancel_and_wait(engine_task)
+
+    async def _drain_in_flight_checks(self, drain_timeout_seconds: float) -> None:
+        if not self._in_flight:
+            return
+
+        logging.info(f"Draining {len(self._in_flight)} checks in flight (for up to {drain_timeout_seconds}s)")
+        in_flight = set(self._in_flight)
+
+        _, pending = await asyncio.wait(in_flight, timeout=drain_timeout_seconds)
+        for run in pending:
+            run.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+        num_cancelled = sum(run.cancelled() for run in in_flight)
+        if num_cancelled:
+            logging.warning(f"Cancelled {num_cancelled} checks in flight while stopping; their results are lost")
+        else:
+            logging.info(f"Drained all {len(in_flight)} checks in flight")
+
+    def _add_stop_signal_handlers(self) -> list[signal.Signals]:
+        loop = asyncio.get_running_loop()
+        signals = []
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+                signals.append(sig)
+            except (NotImplementedError, RuntimeError, ValueError) as e:
+                # E.g. on Windows, or if not running in the main thread: then, the checks in flight are cancelled on stop
+                logging.debug(f"Could not handle the signal {sig.name} to stop gracefully: {e}")
+
+        return signals
+
+    def _remove_stop_signal_handlers(self, signals: list[signal.Signals]) -> None:
+        loop = asyncio.get_running_loop()
+        for sig in signals:
+            loop.remove_signal_handler(sig)
+
+    async def _read_all_scheduled_checks(self) -> AsyncIterator[WebsiteCheckScheduled]:
+        """Read all checks to run until stopped, i.e. those owned by the shard, if any."""
+        async for check in await self.checks.read_all():
+            if self.shard is None or self.shard.owns(check.url):
+                yield check
+
+    async def _schedule_all_checks(
+        self,
+        schedule_batch: Callable[[list[tuple[WebsiteCheckScheduled, float]]], Awaitable[None]],
+        phase_spreading: bool,
+        next_due_times: dict[str, datetime.datetime],
+    ) -> dict[str, WebsiteCheckScheduled]:
+        """
+        Schedule all checks to run until stopped, and return them by url.
+
+        The checks are streamed from the socket and handed to `schedule_batch` (with their first fire delays) in batches of `conf.SCHEDULE_LOAD_BATCH_SIZE`,
+        so that the scheduler can register each batch at once. The progress is logged per batch, and summarized at the end.
+        """
+        start = time.perf_counter()
+        scheduled: dict[str, WebsiteCheckScheduled] = {}
+        schedules: list[tuple[float, float]] = []
+        num_default_interval = 0
+        batch: list[tuple[WebsiteCheckScheduled, float]] = []
+
+        async def flush() -> None:
+            await schedule_batch(batch.copy())
+            batch.clear()
+            logging.info(f"Scheduled {len(scheduled)} checks so far ({time.perf_counter() - start:.2f}s)")
+
+        async for check in self._read_all_scheduled_checks():
+            first_fire_delay_seconds = self.get_first_fire_delay_seconds(
+                check, phase_spreading, next_due_times.get(check.url)
+            )
+            batch.append((check, first_fire_delay_seconds))
+            schedules.append((first_fire_delay_seconds, self.get_interval_seconds(check)))
+            scheduled[check.url] = check
+            if not check.interval_seconds:
+                num_default_interval += 1
+            logging.debug(f"Scheduling check: {check}")
+
+            if len(batch) >= conf.SCHEDULE_LOAD_BATCH_SIZE:
+                await flush()
+
+        if batch:
+            await flush()
+
+        self._require_some_scheduled_checks(len(scheduled))
+        print(
+            f"Scheduled {len(scheduled)} checks ({num_default_interval} with the default interval: {self.default_interval_seconds}s) "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+        self._print_fire_rate(schedules)
+
+        return scheduled
+
+    def _require_some_scheduled_checks(self, num_checks: int) -> None:
+        if self.shard is None:
+            require(num_checks != 0, "No checks to run. Add some checks first.")
+        elif num_checks == 0:
+            logging.warning(f"No checks to run in shard {self.shard} yet")
+
+    async def _resume_schedule_phases(
+        self, stack: contextlib.AsyncExitStack, resume_phases: bool
+    ) -> dict[str, datetime.datetime]:
+        """
+        If `resume_phases`, return the persisted next due times of the checks (by url),
+        and persist the new ones from now on (buffered, every `conf.SCHEDULE_STATE_FLUSH_INTERVAL_SECONDS`, and when the stack is closed).
+        """
+        if not resume_phases:
+            return {}
+
+        next_due_times = await self.checks.read_next_due_times()
+        logging.debug(f"Resuming the schedule phases of {len(next_due_times)} checks")
+
+        self._next_due_times = {}
+        flusher = asyncio.create_task(self._flush_next_due_times_periodically())
+        stack.push_async_callback(self._flush_next_due_times)
+        stack.push_async_callback(util.cancel_and_wait, flusher)
+
+        return next_due_times
+
+    async def _flush_next_due_times_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(conf.SCHEDULE_STATE_FLUSH_INTERVAL_SECONDS)
+            await self._flush_next_due_times()
+
+    async def _flush_next_due_times(self) -> None:
+        if not self._next_due_times:
+            return
+
+        next_due_times, self._next_due_times = self._next_due_times, {}
+        try:
+            await self.checks.write_next_due_times(next_due_times)
+        except Exception as e:
+            # Not critical: at worst, a restarted runner does not resume the phases of these checks
+            logging.error(f"Could not persist the next due times of {len(next_due_times)} checks: {e}")
+
+    async def _listen_check_changes(
+        self, stack: contextlib.AsyncExitStack, live_sync: bool
+    ) -> AsyncIterator[WebsiteCheckChange] | None:
+        """Start listening to the changes of the stored checks (until the stack is closed), if live sync is enabled and supported."""
+        if not live_sync:
+            return None
+
+        try:
+            return await stack.enter_async_context(self.checks.listen_changes())
+        except NotImplementedError as e:
+            logging.warning(f"The checks will not be synced until restarted: {e}")
+            return None
+
+    async def _sync_check_changes(
+        self,
+        changes: AsyncIterator[WebsiteCheckChange],
+        scheduled: dict[str, WebsiteCheckScheduled],
+        schedule: Callable[[WebsiteCheckScheduled], Awaitable[None]],
+        unschedule: Callable[[str], Awaitable[None]],
+    ) -> None:
+        """
+        Apply the changes of the stored checks to the `scheduled` checks (by url), until cancelled.
+
+        Only the affected checks are (re)scheduled or unscheduled; a check that did not actually change is left as is (e.g. keeping its next run).
+
+        If the changes stop (e.g. the data store restarted, or dropped the listening connection), they are listened to again,
+        retrying with exponential backoff; then, all checks are reconciled, since the changes made meanwhile are lost.
+        """
+
+        async def apply(url: str, check: WebsiteCheckScheduled | None) -> None:
+            if check is None:
+                if scheduled.pop(url, None) is not None:
+                    await unschedule(url)
+                    logging.info(f"Live sync: removed check: {url}")
+            elif scheduled.get(url) != check:
+                scheduled[url] = check
+                await schedule(check)
+                logging.info(f"Live sync: scheduled check: {check}")
+
+        async def reconcile() -> None:
+            current = {check.url: check async for check in self._read_all_scheduled_checks()}
+            for url in scheduled.keys() - current.keys():
+                await apply(url, None)
+            for url, check in current.items():
+                await apply(url, check)
+
+        async def apply_all(changes: AsyncIterator[WebsiteCheckChange]) -> None:
+            async for change in changes:
+                if change.url is not None:
+                    if self.shard is None or self.shard.owns(change.url):
+                        await apply(change.url, change.check)
+                else:
+                    await reconcile()
+
+            raise ConnectionError("No more changes")
+
+        try:
+            await apply_all(changes)
+        except Exception as e:
+            logging.error(
+                f"Live sync: the changes of the checks stopped (retrying in {_LIVE_SYNC_MIN_RETRY_SECONDS}s): {e}"
+            )
+
+        retry_seconds = _LIVE_SYNC_MIN_RETRY_SECONDS
+
+        while True:
+            await asyncio.sleep(retry_seconds)
+            retry_seconds = min(2 * retry_seconds, _LIVE_SYNC_MAX_RETRY_SECONDS)
+
+            try:
+                async with self.checks.listen_changes() as changes:
+                    # Listen before reconciling, so that no change made meanwhile is missed
+                    await reconcile()
+                    logging.info("Live sync: listening again to the changes of the checks (all checks reconciled)")
+                    retry_seconds = _LIVE_SYNC_MIN_RETRY_SECONDS
+
+                    await apply_all(changes)
+            except Exception as e:
+                logging.error(f"Live sync: the changes of the checks stopped (retrying in {retry_seconds}s): {e}")
+
+    async def _run_checks_with_native_scheduler(
+        self,
+        max_concurrency: int,
+        phase_spreading: bool,
+        max_jitter_seconds: float,
+        live_sync: bool,
+        resume_phases: bool,
+    ) -> None:
+        scheduler = HeapScheduler(
+            self.scheduled_check_n_write, num_workers=max_concurrency, max_jitter_seconds=max_jitter_seconds
+        )
+
+        async def schedule(check: WebsiteCheckScheduled, first_fire_delay_seconds: float | None = None) -> None:
+            if first_fire_delay_seconds is None:
+                first_fire_delay_seconds = self.get_first_fire_delay_seconds(check, phase_spreading)
+            scheduler.add(check.url, check, self.get_interval_seconds(check), first_fire_delay_seconds)
+
+        async def schedule_batch(batch: list[tuple[WebsiteCheckScheduled, float]]) -> None:
+            scheduler.add_many(
+                (check.url, check, self.get_interval_seconds(check), first_fire_delay_seconds)
+                for check, first_fire_delay_seconds in batch
+            )
+
+        async def unschedule(url: str) -> None:
+            scheduler.remove(url)
+
+        async with contextlib.AsyncExitStack() as stack:
+            # Listen before reading the checks, so that no change made meanwhile is missed
+            changes = await self._listen_check_changes(stack, live_sync)
+            next_due_times = await self._resume_schedule_phases(stack, resume_phases)
+            scheduled = await self._schedule_all_checks(schedule_batch, phase_spreading, next_due_times)
+
+            if changes is not None:
+                sync = asyncio.create_task(self._sync_check_changes(changes, scheduled, schedule, unschedule))
+                stack.push_async_callback(util.cancel_and_wait, sync)
+
+            print("\nRunning until stopped...\n")
+            await scheduler.run_until_stopped()
+
+    async def _run_checks_with_apscheduler(
+        self, phase_spreading: bool, max_jitter_seconds: float, live_sync: bool, resume_phases: bool
+    ) -> None:
+        async with AsyncScheduler() as scheduler, contextlib.AsyncExitStack() as stack:
+            task_id = await self._register_check_task(scheduler)
+
+            async def schedule(check: WebsiteCheckScheduled, first_fire_delay_seconds: float | None = None) -> None:
+                if first_fire_delay_seconds is None:
+                    first_fire_delay_seconds = self.get_first_fire_delay_seconds(check, phase_spreading)
+                await self._add_check_to_scheduler(
+                    scheduler, check, first_fire_delay_seconds, max_jitter_seconds, task_id
+                )
+
+            async def schedule_batch(batch: list[tuple[WebsiteCheckScheduled, float]]) -> None:
+                # The data store's calls are concurrent (each in a worker thread)
+                await asyncio.gather(
+                    *(schedule(check, first_fire_delay_seconds) for check, first_fire_delay_seconds in batch)
+                )
+
+            async def unschedule(url: str) -> None:
+                await scheduler.remove_schedule(url)
+
+            # Listen before reading the checks, so that no change made meanwhile is missed
+            changes = await self._listen_check_changes(stack, live_sync)
+            next_due_times = await self._resume_schedule_phases(stack, resume_phases)
+            scheduled = await self._schedule_all_checks(schedule_batch, phase_spreading, next_due_times)
+
+            if changes is not None:
+                sync = asyncio.create_task(self._sync_check_changes(changes, scheduled, schedule, unschedule))
+                stack.push_async_callback(util.cancel_and_wait, sync)
+
+            print("\nRunning until stopped...\n")
+            await scheduler.run_until_stopped()
+
+    async def _run_checks_with_distributed_scheduler(self, max_concurrency: int, poll_interval_seconds: float) -> None:
+        require(poll_interval_seconds > 0, f"The poll interval must be positive: {poll_interval_seconds}")
+
+        running: set[asyncio.Task[CheckResult | None]] = set()
+
+        def on_done(task: asyncio.Task[CheckResult | None]) -> None:
+            running.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                logging.error(f"Scheduled check failed: {task.exception()}", exc_info=task.exception())
+
+        print("\nRunning until stopped, claiming the due checks from the data store...\n")
+
+        retry_seconds = _CLAIM_MIN_RETRY_SECONDS
+
+        try:
+            while True:
+                free_slots = max_concurrency - len(running)
+
+                if free_slots == 0:
+                    await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                try:
+                    claimed = await self.checks.claim_due(free_slots, self.default_interval_seconds)
+                except Exception as e:
+                    # Keep running the claimed checks meanwhile; the other runners keep claiming theirs
+                    logging.error(f"Could not claim the due checks (retrying in {retry_seconds}s): {e}")
+                    await asyncio.sleep(retry_seconds)
+                    retry_seconds = min(2 * retry_seconds, _CLAIM_MAX_RETRY_SECONDS)
+                    continue
+
+                retry_seconds = _CLAIM_MIN_RETRY_SECONDS
+                logging.debug(f"Claimed {len(claimed)} due checks")
+
+                for check in claimed:
+                    task = asyncio.create_task(self.scheduled_check_n_write(check))
+                    running.add(task)
+                    task.add_done_callback(on_done)
+
+                if len(claimed) < free_slots:
+                    # No more checks are due now
+                    await asyncio.sleep(poll_interval_seconds)
+
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
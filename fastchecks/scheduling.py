@@ -0,0 +1,217 @@
+#
+# Native scheduler of the checks: a min-heap of the next fire times, driving a pool of workers.
+#
+
+import asyncio
+import hashlib
+import heapq
+import random
+from typing import Any, Awaitable, Callable, Generic, Iterable, TypeVar
+
+from fastchecks import require
+from fastchecks.log import MAIN_LOGGER as logging
+
+SCHEDULER_NAMES = ("native", "apscheduler", "distributed")
+"""
+Names of the scheduler engines that can run the checks until stopped:
+* native: `HeapScheduler`; it scales to many (e.g. 100k) checks.
+* apscheduler: one APScheduler schedule per check.
+* distributed: the due checks are claimed from the data store (see `WebsiteCheckSocket.claim_due`), so that several runners (e.g. on different nodes) share the checks.
+"""
+
+_T = TypeVar("_T")
+
+
+def phase_offset_seconds(key: str, interval_seconds: float) -> float:
+    """
+    Return a deterministic offset in [0, interval_seconds) for the given key (e.g. a check's url), evenly spread across keys.
+
+    Delaying the first run of each check by its offset spreads the checks with the same interval across it, instead of all firing in the same burst.
+    The offset is stable across processes and restarts (unlike python's `hash`, which is randomized per process).
+    """
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest) / 2**64 * interval_seconds
+
+
+def fire_rate_histogram(schedules: Iterable[tuple[float, float]], horizon_seconds: int) -> list[int]:
+    """
+    Given the (first fire delay, interval) of each schedule, return the number of fires in each second of the next `horizon_seconds`.
+    """
+    histogram = [0] * horizon_seconds
+
+    for first_fire_delay_seconds, interval_seconds in schedules:
+        fire_time = first_fire_delay_seconds
+        while fire_time < horizon_seconds:
+            histogram[int(fire_time)] += 1
+            fire_time += interval_seconds
+
+    return histogram
+
+
+class _Job(Generic[_T]):
+    __slots__ = ("key", "arg", "interval_seconds", "next_fire_time", "removed", "queued")
+
+    def __init__(self, key: str, arg: _T, interval_seconds: float, next_fire_time: float) -> None:
+        self.key = key
+        self.arg = arg
+        self.interval_seconds = interval_seconds
+        self.next_fire_time = next_fire_time
+        self.removed = False
+        self.queued = False
+        """Whether the job is waiting in the queue for a worker; if so, its next fires are coalesced into it."""
+
+
+class HeapScheduler(Generic[_T]):
+    """
+    Run `fun(arg)` for each added job every `interval_seconds`, until stopped.
+
+    The jobs are kept in a min-heap ordered by their next fire time (with the event loop's monotonic clock):
+    adding, removing, or rescheduling a job is O(log n), and the memory per job is constant.
+    A single dispatcher pops the due jobs and hands them to a pool of `num_workers` workers,
+    which bounds the number of jobs that run at the same time.
+
+    If a job is due while its previous fire is still waiting for a worker (e.g. all workers are busy), the new fire is coalesced into the waiting one,
+    so that the queue holds at most one fire per job; and if a job is late for more than its interval (e.g. the computer slept), its missed runs are coalesced into one.
+    A job can thus be queued while its previous fire is running: the overlap is up to `fun` (see `overrun.OverrunGuard`).
+    Exceptions raised by the jobs are logged, and do not stop the scheduler.
+
+    Each run can be delayed by a random jitter of up to `max_jitter_seconds`; the jitter does not accumulate, i.e. the jobs keep their intervals on average.
+    """
+
+    def __init__(self, fun: Callable[[_T], Awaitable[Any]], num_workers: int, max_jitter_seconds: float = 0.0) -> None:
+        require(num_workers > 0, f"The number of workers must be positive: {num_workers}")
+        require(max_jitter_seconds >= 0, f"The max jitter must be non-negative: {max_jitter_seconds}")
+
+        self.fun = fun
+        self.num_workers = num_workers
+        self.max_jitter_seconds = max_jitter_seconds
+
+        self._jobs: dict[str, _Job[_T]] = {}
+        self._heap: list[tuple[float, int, _Job[_T]]] = []
+        self._seq = 0
+        """Tie-breaker of the heap entries with the same fire time (the jobs themselves are not comparable)."""
+        self._queue: asyncio.Queue[_Job[_T]] = asyncio.Queue()
+        self._wakeup = asyncio.Event()
+        self._stopped = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._jobs
+
+    def _now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def _entry(self, job: _Job[_T]) -> tuple[float, int, _Job[_T]]:
+        self._seq += 1
+        # Not a cryptographic use: just to spread the load
+        jitter = 0.0 if self.max_jitter_seconds == 0 else random.uniform(0, self.max_jitter_seconds)  # nosec B311
+        return (job.next_fire_time + jitter, self._seq, job)
+
+    def _push(self, job: _Job[_T]) -> None:
+        heapq.heappush(self._heap, self._entry(job))
+
+        if self._heap[0][2] is job:
+            # The dispatcher might be sleeping until a later time
+            self._wakeup.set()
+
+    def _new_job(self, key: str, arg: _T, interval_seconds: float, first_fire_time: float) -> _Job[_T]:
+        require(interval_seconds > 0, f"The interval must be positive: {interval_seconds}")
+
+        self.remove(key)
+
+        job = _Job(key, arg, interval_seconds, first_fire_time)
+        self._jobs[key] = job
+        return job
+
+    def add(self, key: str, arg: _T, interval_seconds: float, first_fire_delay_seconds: float = 0.0) -> None:
+        """
+        Add (or replace) the job with the given key, to first run after `first_fire_delay_seconds` and then every `interval_seconds`.
+        """
+        self._push(self._new_job(key, arg, interval_seconds, self._now() + first_fire_delay_seconds))
+
+    def add_many(self, jobs: Iterable[tuple[str, _T, float, float]]) -> None:
+        """
+        Add (or replace) many jobs at once, each given as in `add`: (key, arg, interval_seconds, first_fire_delay_seconds).
+
+        The heap is rebuilt once, in O(n) for n jobs, instead of pushing each job in O(log n).
+        """
+        now = self._now()
+        for key, arg, interval_seconds, first_fire_delay_seconds in jobs:
+            self._heap.append(self._entry(self._new_job(key, arg, interval_seconds, now + first_fire_delay_seconds)))
+
+        heapq.heapify(self._heap)
+        self._wakeup.set()
+
+    def remove(self, key: str) -> bool:
+        """
+        Remove the job with the given key, and return whether it existed.
+
+        The job's heap entry is only marked as removed (and discarded when popped), so removing is O(1).
+        """
+        job = self._jobs.pop(key, None)
+        if job is None:
+            return False
+
+        job.removed = True
+        return True
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+
+    async def run_until_stopped(self) -> None:
+        """
+        Run the jobs until `stop` is called (or the task is cancelled); the jobs still running are then cancelled.
+        """
+        self._stopped.clear()
+        workers = [asyncio.create_task(self._work()) for _ in range(self.num_workers)]
+
+        try:
+            await self._dispatch()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _dispatch(self) -> None:
+        while not self._stopped.is_set():
+            # Discard the removed jobs
+            while self._heap and self._heap[0][2].removed:
+                heapq.heappop(self._heap)
+
+            now = self._now()
+
+            if not self._heap or self._heap[0][0] > now:
+                delay = None if not self._heap else self._heap[0][0] - now
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except TimeoutError:
+                    pass
+                continue
+
+            _, _, job = heapq.heappop(self._heap)
+            if not job.queued:
+                job.queued = True
+                self._queue.put_nowait(job)
+
+            # The next fire time is based on the scheduled one (not on the jittered one), so that the jitter does not accumulate
+            job.next_fire_time += job.interval_seconds
+            if job.next_fire_time <= now:
+                # Coalesce the missed runs
+                job.next_fire_time = now + job.interval_seconds
+            self._push(job)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job.queued = False
+            try:
+                if not job.removed:
+                    await self.fun(job.arg)
+            except Exception as e:
+                logging.error(f"Scheduled job {job.key} failed: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,73 @@
+#
+# Sharding of the checks (by their urls) across processes, with consistent hashing.
+#
+
+import bisect
+import hashlib
+
+from fastchecks import require
+
+
+def _hash(key: str) -> int:
+    # Stable across processes and restarts (unlike python's `hash`, which is randomized per process)
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest())
+
+
+class HashRing:
+    """
+    Consistent hashing of keys (e.g. the checks' urls) into `num_shards` shards.
+
+    Each shard is placed on a ring at `virtual_nodes` pseudo-random points, and a key belongs to the shard of the first point after the key's hash.
+    Thus, the keys are spread evenly across the shards, and when the number of shards changes from n to n+1,
+    only ~1/(n+1) of the keys move (all to the new shard), instead of almost all of them as with `hash(key) % n`.
+    """
+
+    def __init__(self, num_shards: int, virtual_nodes: int = 100) -> None:
+        require(num_shards > 0, f"The number of shards must be positive: {num_shards}")
+        require(virtual_nodes > 0, f"The number of virtual nodes must be positive: {virtual_nodes}")
+
+        self.num_shards = num_shards
+        self.virtual_nodes = virtual_nodes
+
+        points = sorted(
+            (_hash(f"{shard}:{node}"), shard) for shard in range(num_shards) for node in range(virtual_nodes)
+        )
+        self._point_hashes = [point_hash for point_hash, _ in points]
+        self._point_shards = [shard for _, shard in points]
+
+    def shard_of(self, key: str) -> int:
+        i = bisect.bisect(self._point_hashes, _hash(key))
+        # Wrap around the ring
+        return self._point_shards[i % len(self._point_shards)]
+
+
+class Shard:
+    """
+    The `index`-th (0-based) of `num_shards` shards of the checks; it owns the checks whose urls are hashed to it (see `HashRing`).
+    """
+
+    def __init__(self, index: int, num_shards: int) -> None:
+        require(0 <= index < num_shards, f"The shard index must be between 0 and {num_shards - 1}: {index}")
+
+        self.index = index
+        self.ring = HashRing(num_shards)
+
+    @property
+    def num_shards(self) -> int:
+        return self.ring.num_shards
+
+    def owns(self, url: str) -> bool:
+        return self.ring.shard_of(url) == self.index
+
+    @classmethod
+    def parse(cls, x: str) -> "Shard":
+        """Parse a shard written as `INDEX/NUM_SHARDS`, e.g. `0/4`."""
+        index, sep, num_shards = x.partition("/")
+        require(sep == "/", f"The shard must be written as INDEX/NUM_SHARDS, e.g. 0/4: {x}")
+        return cls(int(index), int(num_shards))
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.num_shards}"
+
+    def __repr__(self) -> str:
+        return f"Shard({self.index}, {self.num_shards})"
@@ -1,8 +1,12 @@
+import datetime
 from abc import ABC, abstractmethod
-from typing import AsyncIterator
+from collections import Counter
+from contextlib import aclosing, asynccontextmanager
+from typing import AsyncIterator, Mapping, Sequence
 from pydantic.types import PositiveInt
 
-from fastchecks.types import WebsiteCheckScheduled, CheckResult
+from fastchecks.rollups import CheckResultRollup, bucket_start_of, rollups_of_results
+from fastchecks.types import WebsiteCheckChange, WebsiteCheckScheduled, CheckResult
 from fastchecks.util import PRACTICAL_MAX_INT
 
 
@@ -43,19 +47,95 @@ class WebsiteCheckSocket(DataStoreSocket):
         """
         ...
 
+    async def upsert_many(self, checks: Sequence[WebsiteCheckScheduled]) -> tuple[int, int]:
+        """
+        Upsert all checks (see `upsert`), and return the numbers of (inserted, updated) checks; the checks that did not change are left untouched.
+        If the same url is given several times, the last check wins.
+
+        This default implementation upserts each check in turn; sockets should override it if their underlying storage can upsert them in bulk.
+        """
+        inserted = updated = 0
+
+        for check in {check.url: check for check in checks}.values():
+            existing = await self.read(check.url)
+            if existing != check:
+                await self.upsert(check)
+                if existing is None:
+                    inserted += 1
+                else:
+                    updated += 1
+
+        return inserted, updated
+
     @abstractmethod
-    async def read_n(self, n: PositiveInt) -> AsyncIterator[WebsiteCheckScheduled]:
+    async def read_n(self, n: PositiveInt, after_url: str | None = None) -> AsyncIterator[WebsiteCheckScheduled]:
+        """
+        Read (stream) up to `n` checks ordered by url, starting after `after_url` if given (e.g. the last url read before, to resume).
+        """
         ...
 
     async def read_all(self) -> AsyncIterator[WebsiteCheckScheduled]:
         """
-        Read all checks from the socket's underlying storage.
+        Read (stream) all checks from the socket's underlying storage, ordered by url.
 
         This is a sugar method that calls `read_n` with a practically infinite large number.
-        Careful: Use this method only if the underlying storage can handle reading all checks (e.g., there not many written checks, which it's common).
         """
         return self.read_n(PRACTICAL_MAX_INT)
 
+    async def read(self, url: str) -> WebsiteCheckScheduled | None:
+        """
+        Read the check of the given url, or None if there is none.
+
+        This default implementation reads all checks; sockets should override it if their underlying storage can select it directly.
+        """
+        # Closed explicitly, since we might stop reading early
+        async with aclosing(await self.read_all()) as checks:  # type: ignore[type-var]
+            async for check in checks:
+                if check.url == url:
+                    return check
+        return None
+
+    async def claim_due(self, n: PositiveInt, default_interval_seconds: int) -> list[WebsiteCheckScheduled]:
+        """
+        Claim up to `n` checks that are due, and move each one interval ahead (`default_interval_seconds` if the check has none).
+
+        The claims are atomic: several runners (e.g. on different nodes) sharing the same underlying storage never claim the same due check,
+        and a claimed check is due again after its interval, even if its claimer died before running it.
+
+        Sockets whose underlying storage supports such claims should override this method; by default, NotImplementedError is raised.
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot claim the due checks")
+
+    async def read_next_due_times(self) -> dict[str, datetime.datetime]:
+        """
+        Read the persisted next due times (timezone-aware) of the checks, by url; the checks without one are left out.
+
+        Sockets that can persist them should override this method together with `write_next_due_times`; by default, none are persisted.
+        """
+        return {}
+
+    async def write_next_due_times(self, next_due_times: Mapping[str, datetime.datetime]) -> int:
+        """
+        Persist the given next due times (timezone-aware) of the checks, by url, and return the number of updated checks.
+
+        By default, they are not persisted (and 0 is returned).
+        """
+        return 0
+
+    @asynccontextmanager
+    async def listen_changes(self) -> AsyncIterator[AsyncIterator[WebsiteCheckChange]]:
+        """
+        Listen to the changes of the stored checks (e.g. made by other processes) while in the context,
+        which yields an async iterator of the changes, in the order they were made.
+
+        The changes made since entering the context are not missed, even if they are iterated later;
+        so enter the context _before_ reading the checks that the changes should be applied to.
+
+        Sockets whose underlying storage can notify its changes should override this method; by default, NotImplementedError is raised.
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot listen to the changes of the checks")
+        yield  # unreachable; it makes this method an async generator, as the context manager requires
+
     @abstractmethod
     async def delete(self, url: str) -> int:
         """Return number of deleted checks, 0 (no actual deletion) or 1 (did delete)"""
@@ -86,10 +166,86 @@ class CheckResultSocket(ABC):
     async def write(self, result: CheckResult) -> int:
         ...
 
+    async def write_many(self, results: Sequence[CheckResult]) -> int:
+        """
+        Write multiple results and return the number of written results.
+
+        Sockets should override this method if their underlying storage supports a more efficient bulk write.
+        """
+        c = 0
+        for result in results:
+            c += await self.write(result)
+        return c
+
+    async def flush(self) -> int:
+        """
+        Write any results that the socket may have buffered, and return the number of written results.
+
+        Unbuffered sockets (the default) have nothing to flush.
+        """
+        return 0
+
+    async def maintain(self) -> None:
+        """
+        Maintain the underlying storage of the results, e.g. prepare the storage of the upcoming results, and drop the expired ones.
+
+        It's called when the context is created, and periodically while the checks run until stopped. By default, there is nothing to maintain.
+        """
+
     @abstractmethod
     async def read_last_n(self, n: PositiveInt) -> AsyncIterator[CheckResult]:
         ...
 
+    async def read_last_n_per_url(
+        self, n: PositiveInt, since: datetime.datetime | None = None
+    ) -> AsyncIterator[CheckResult]:
+        """
+        Read the last `n` results of each URL, only of those started after `since` (in UTC) if given;
+        the results of the same URL are sorted from most recent to oldest.
+
+        This default implementation reads all results (until `since`); sockets should override it if their underlying storage can select them directly.
+        """
+        counts: Counter[str] = Counter()
+
+        async for result in self.read_last_n(PRACTICAL_MAX_INT):
+            if since is not None and result.timestamp_start <= since:
+                break
+            if counts[result.check.url] < n:
+                counts[result.check.url] += 1
+                yield result
+
+    async def read_current_status(self) -> AsyncIterator[CheckResult]:
+        """
+        Read the latest result of each URL (i.e. its current status), sorted by url.
+
+        This default implementation reads the last result per URL (see `read_last_n_per_url`), and sorts them in memory;
+        sockets should override it if their underlying storage keeps the latest results apart.
+        """
+        results = [result async for result in self.read_last_n_per_url(1)]
+        results.sort(key=lambda result: result.check.url)
+
+        for result in results:
+            yield result
+
+    async def read_rollups(
+        self, grain: str, since: datetime.datetime, url: str | None = None
+    ) -> AsyncIterator[CheckResultRollup]:
+        """
+        Read the rollups of `grain` (see `rollups.ROLLUP_GRAINS`) from the bucket that contains `since` (in UTC) on, of the given `url` (or of all URLs);
+        the rollups are sorted by url and bucket start.
+
+        This default implementation rolls up all results; sockets should override it if their underlying storage maintains the rollups.
+        """
+        first_bucket_start = bucket_start_of(since, grain)
+        results = [
+            result
+            async for result in self.read_last_n(PRACTICAL_MAX_INT)  # type: ignore[attr-defined]
+            if (url is None or result.check.url == url) and result.timestamp_start >= first_bucket_start
+        ]
+
+        for rollup in rollups_of_results(results, grain):
+            yield rollup
+
     @abstractmethod
     async def close(self) -> None:
         ...
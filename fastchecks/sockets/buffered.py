@@ -0,0 +1,146 @@
+import asyncio
+import datetime
+from typing import AsyncIterator, Sequence
+
+from pydantic import PositiveInt
+
+from fastchecks import require
+from fastchecks.log import MAIN_LOGGER as logging
+from fastchecks.rollups import CheckResultRollup
+from fastchecks.sockets import CheckResultSocket
+from fastchecks.types import CheckResult
+
+
+class BufferedCheckResultSocket(CheckResultSocket):
+    """
+    Wrap another CheckResultSocket to buffer the written results in memory and write them in batches (with `write_many`).
+
+    The buffer is flushed when:
+    * it holds `max_size` results, or
+    * its oldest result has been waiting for `max_age_seconds`, or
+    * explicitly with `flush`, and before reading (so that reads see all written results) or closing the socket.
+
+    If a batch write fails, its results are put back into the buffer, and the flush is retried every `max_age_seconds`
+    until it succeeds (meanwhile, the buffer is not flushed by size). The failures of the flushes triggered by writes
+    are logged, not raised, since they are not the fault of the writer; explicit flushes (also before reading or closing) do raise them.
+    WARNING: buffered results are lost if the process is killed without closing the socket (e.g. with SIGKILL).
+    """
+
+    def __init__(self, socket: CheckResultSocket, max_size: int, max_age_seconds: float) -> None:
+        require(max_size > 0, f"The buffer max size must be positive: {max_size}")
+        require(max_age_seconds > 0, f"The buffer max age must be positive: {max_age_seconds}")
+
+        self._socket = socket
+        self.max_size = max_size
+        self.max_age_seconds = max_age_seconds
+
+        self._buffer: list[CheckResult] = []
+        self._flush_lock = asyncio.Lock()
+        self._age_flusher: asyncio.Task | None = None
+        """Task that flushes the buffer when its oldest result gets too old; only set while it's waiting."""
+        self._last_flush_failed = False
+
+    def is_closed(self) -> bool:
+        return self._socket.is_closed()
+
+    def __len__(self) -> int:
+        """Return the number of buffered (not yet written) results."""
+        return len(self._buffer)
+
+    async def write(self, result: CheckResult) -> int:
+        """
+        Buffer the result, and return the number of actually written results (0 unless the buffer got flushed).
+        """
+        self._buffer.append(result)
+        return await self._flush_if_full_or_wait()
+
+    async def write_many(self, results: Sequence[CheckResult]) -> int:
+        self._buffer.extend(results)
+        return await self._flush_if_full_or_wait()
+
+    async def _flush_if_full_or_wait(self) -> int:
+        if len(self._buffer) >= self.max_size and not self._last_flush_failed:
+            try:
+                return await self.flush()
+            except Exception as e:
+                logging.error(
+                    f"Could not flush buffered results (they will be retried in {self.max_age_seconds}s): {e}"
+                )
+
+        if self._age_flusher is None and len(self._buffer) > 0:
+            self._age_flusher = asyncio.create_task(self._flush_after_max_age())
+
+        return 0
+
+    async def _flush_after_max_age(self) -> None:
+        await asyncio.sleep(self.max_age_seconds)
+        # From now on, this task must not be cancelled by `flush`: it might be the one writing
+        self._age_flusher = None
+
+        try:
+            await self.flush()
+        except Exception as e:
+            logging.error(f"Could not flush buffered results (they will be retried in {self.max_age_seconds}s): {e}")
+            # Re-arm, unless another flush (or write) did meanwhile
+            if self._age_flusher is None and len(self._buffer) > 0:
+                self._age_flusher = asyncio.create_task(self._flush_after_max_age())
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if self._age_flusher is not None:
+                self._age_flusher.cancel()
+                self._age_flusher = None
+
+            batch, self._buffer = self._buffer, []
+
+            if len(batch) == 0:
+                return 0
+
+            try:
+                written = await self._socket.write_many(batch)
+            except BaseException as e:
+                # Keep the original order: the failed batch goes before any result written meanwhile
+                self._buffer[:0] = batch
+                # Not if cancelled, e.g. the writer was stopped
+                self._last_flush_failed = isinstance(e, Exception)
+                raise
+
+            self._last_flush_failed = False
+            return written
+
+    async def maintain(self) -> None:
+        await self._socket.maintain()
+
+    async def read_last_n(self, n: PositiveInt) -> AsyncIterator[CheckResult]:
+        await self.flush()
+
+        async for result in self._socket.read_last_n(n):
+            yield result
+
+    async def read_last_n_per_url(
+        self, n: PositiveInt, since: datetime.datetime | None = None
+    ) -> AsyncIterator[CheckResult]:
+        await self.flush()
+
+        async for result in self._socket.read_last_n_per_url(n, since):
+            yield result
+
+    async def read_current_status(self) -> AsyncIterator[CheckResult]:
+        await self.flush()
+
+        async for result in self._socket.read_current_status():
+            yield result
+
+    async def read_rollups(
+        self, grain: str, since: datetime.datetime, url: str | None = None
+    ) -> AsyncIterator[CheckResultRollup]:
+        await self.flush()
+
+        async for rollup in self._socket.read_rollups(grain, since, url):
+            yield rollup
+
+    async def close(self) -> None:
+        try:
+            await self.flush()
+        finally:
+            await self._socket.close()
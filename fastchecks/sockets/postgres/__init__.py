@@ -1,15 +1,20 @@
+import datetime
 from fastchecks.log import MAIN_LOGGER as logging
+from contextlib import asynccontextmanager
 from importlib import resources
-from typing import AsyncIterator
+from typing import AsyncIterator, Mapping, Sequence
 
-from psycopg import sql
-from psycopg.rows import namedtuple_row
+from psycopg import AsyncConnection, sql
+from psycopg.rows import dict_row, namedtuple_row
 from psycopg_pool import AsyncConnectionPool
 from pydantic import PositiveInt
 
+from fastchecks import conf, require, vutil
+from fastchecks.conf import RESULTS_PARTITION_PERIODS
+from fastchecks.rollups import ROLLUP_GRAINS, CheckResultRollup
 from fastchecks.sockets import CheckResultSocket, WebsiteCheckSocket
 from fastchecks.sockets.postgres import schema
-from fastchecks.types import CheckResult, WebsiteCheck, WebsiteCheckScheduled
+from fastchecks.types import CheckPhaseTimes, CheckResult, WebsiteCheck, WebsiteCheckChange, WebsiteCheckScheduled
 
 
 async def common_single_pg_datastore_is_ready(pool: AsyncConnectionPool, timeout: float) -> bool:
@@ -31,6 +36,27 @@ async def common_single_pg_datastore_is_ready(pool: AsyncConnectionPool, timeout
         return cur.rowcount == 1
 
 
+SCHEMA_VERSION = 1
+"""
+Version of the schema created by `up.sql`; it must be increased with each change of the schema.
+
+The databases created before the schema was versioned (i.e. without the SchemaVersion table) have version 0.
+"""
+
+
+async def common_single_pg_datastore_schema_version(pool: AsyncConnectionPool, timeout: float) -> int:
+    """Return the version of the schema of the (initialized) database; see `SCHEMA_VERSION`."""
+    async with pool.connection(timeout=timeout) as aconn:
+        cur = await aconn.execute("SELECT to_regclass('schemaversion') IS NOT NULL;")
+        [(is_versioned,)] = await cur.fetchall()
+        if not is_versioned:
+            return 0
+
+        cur = await aconn.execute("SELECT max(version) FROM SchemaVersion;")
+        [(version,)] = await cur.fetchall()
+        return 0 if version is None else version
+
+
 async def common_single_pg_datastore_init(pool: AsyncConnectionPool, timeout: float) -> bool:
     # WARNING: Assumed to not be initialized
     async with pool.connection(timeout=timeout) as aconn:
@@ -39,9 +65,24 @@ async def common_single_pg_datastore_init(pool: AsyncConnectionPool, timeout: fl
         return True
 
 
+WEBSITE_CHECK_CHANGES_CHANNEL = "websitecheck_changes"
+"""Channel notified by the WebsiteCheck's triggers (see `up.sql`)"""
+
+
+def _row_to_website_check(row) -> WebsiteCheckScheduled:
+    # without validation, because we trust the database -- its value were validated before
+    # (no extra regexes in the databases created before them, which are still read before migrating them)
+    return WebsiteCheckScheduled.with_check(
+        WebsiteCheck.without_validation(row.url, row.regex, getattr(row, "extra_regexes", None)), row.interval_seconds
+    )
+
+
 class WebsiteCheckSocketPostgres(WebsiteCheckSocket):
-    def __init__(self, conninfo: str) -> None:
+    def __init__(self, conninfo: str, fetch_size: int | None = None) -> None:
+        self._conninfo = conninfo
         self._pool = AsyncConnectionPool(conninfo)
+        self.fetch_size = conf.CHECKS_FETCH_SIZE if fetch_size is None else vutil.validated_is_positive_int(fetch_size)
+        """Number of checks fetched per query when reading many checks; see `read_n`"""
 
     def is_closed(self) -> bool:
         return self._pool.closed
@@ -51,33 +92,186 @@ class WebsiteCheckSocketPostgres(WebsiteCheckSocket):
             cur = await aconn.execute(
                 """
             INSERT INTO WebsiteCheck
-            (url, regex, interval_seconds)
-            VALUES (%s, %s, %s)
+            (url, regex, extra_regexes, interval_seconds)
+            VALUES (%s, %s, %s, %s)
             ON CONFLICT (url) DO UPDATE
                 SET regex = EXCLUDED.regex,
+                    extra_regexes = EXCLUDED.extra_regexes,
                     interval_seconds = EXCLUDED.interval_seconds;
             """,
-                (check.url, check.regex, check.interval_seconds),
+                (check.url, check.regex, check.extra_regexes, check.interval_seconds),
             )
             return cur.rowcount
 
-    async def read_n(self, n: PositiveInt) -> AsyncIterator[WebsiteCheckScheduled]:
+    async def upsert_many(self, checks: Sequence[WebsiteCheckScheduled]) -> tuple[int, int]:
+        """
+        Upsert all checks in a single transaction: they are copied (with COPY) into a temporary table, and then merged with a single INSERT ... ON CONFLICT.
+        """
+        by_url = {check.url: check for check in checks}
+
         async with self._pool.connection() as aconn:
-            # We format the safe query in 2 steps (also below) to avoid false positives from bandit (B608:hardcoded_sql_expressions)
-            # We follow psycopg recommendations for how to escape composed SQL queries: https://www.psycopg.org/psycopg3/docs/advanced/typing.html#checking-literal-strings-in-queries
-            query_raw = """
-                SELECT * FROM WebsiteCheck
-                LIMIT {};"""
-            query_safe = query_raw.format(n)
+            async with aconn.transaction():
+                # Like WebsiteCheck, so that the rows are validated by the same domains
+                await aconn.execute(
+                    """
+            CREATE TEMPORARY TABLE WebsiteCheckImport (LIKE WebsiteCheck) ON COMMIT DROP;"""
+                )
 
-            acur = await aconn.execute(sql.SQL(query_safe))
+                async with aconn.cursor() as acur:
+                    async with acur.copy(
+                        "COPY WebsiteCheckImport (url, regex, extra_regexes, interval_seconds) FROM STDIN"
+                    ) as copy:
+                        for check in by_url.values():
+                            await copy.write_row((check.url, check.regex, check.extra_regexes, check.interval_seconds))
+
+                    # The unchanged checks are not updated (and so, not notified as changed);
+                    # `xmax = 0` tells the inserted rows apart from the updated ones
+                    await acur.execute(
+                        """
+            INSERT INTO WebsiteCheck
+            (url, regex, extra_regexes, interval_seconds)
+            SELECT url, regex, extra_regexes, interval_seconds FROM WebsiteCheckImport
+            ON CONFLICT (url) DO UPDATE
+                SET regex = EXCLUDED.regex,
+                    extra_regexes = EXCLUDED.extra_regexes,
+                    interval_seconds = EXCLUDED.interval_seconds
+                WHERE (WebsiteCheck.regex, WebsiteCheck.extra_regexes, WebsiteCheck.interval_seconds)
+                    IS DISTINCT FROM (EXCLUDED.regex, EXCLUDED.extra_regexes, EXCLUDED.interval_seconds)
+            RETURNING xmax = 0;"""
+                    )
+                    merged = await acur.fetchall()
+
+        inserted = sum(1 for (is_inserted,) in merged if is_inserted)
+        return inserted, len(merged) - inserted
+
+    async def read_n(self, n: PositiveInt, after_url: str | None = None) -> AsyncIterator[WebsiteCheckScheduled]:
+        """
+        The checks are read in pages of `fetch_size`, with keyset pagination on the url (the primary key): each page is a quick index scan
+        that starts after the last url of the previous page. Thus, the memory stays flat however many checks there are,
+        and no connection (nor transaction) is held while the checks are consumed.
+        """
+        remaining = n
+
+        while remaining > 0:
+            limit = min(remaining, self.fetch_size)
+
+            async with self._pool.connection() as aconn:
+                if after_url is None:
+                    acur = await aconn.execute(
+                        """
+                    SELECT * FROM WebsiteCheck
+                    ORDER BY url
+                    LIMIT %s;""",
+                        (limit,),
+                    )
+                else:
+                    acur = await aconn.execute(
+                        """
+                    SELECT * FROM WebsiteCheck
+                    WHERE url > %s
+                    ORDER BY url
+                    LIMIT %s;""",
+                        (after_url, limit),
+                    )
+
+                acur.row_factory = namedtuple_row
+                page = [_row_to_website_check(row) for row in await acur.fetchall()]
+
+            for check in page:
+                yield check
+
+            if len(page) < limit:
+                return
+
+            remaining -= len(page)
+            after_url = page[-1].url
+
+    async def read(self, url: str) -> WebsiteCheckScheduled | None:
+        async with self._pool.connection() as aconn:
+            acur = await aconn.execute(
+                """
+            SELECT * FROM WebsiteCheck
+            WHERE url = %s;""",
+                (url,),
+            )
 
             acur.row_factory = namedtuple_row
-            async for row in acur:
-                # without validation, because we trust the database -- its value were validated before
-                yield WebsiteCheckScheduled.with_check(
-                    WebsiteCheck.without_validation(row.url, row.regex), row.interval_seconds
-                )
+            row = await acur.fetchone()
+            return None if row is None else _row_to_website_check(row)
+
+    async def claim_due(self, n: PositiveInt, default_interval_seconds: int) -> list[WebsiteCheckScheduled]:
+        """
+        Claim the due checks with `FOR UPDATE SKIP LOCKED`, so that concurrent claimers skip (instead of wait for) the checks being claimed by others.
+
+        A claimed check is next due one interval after it was due (keeping its cadence), or one interval from now if it missed whole intervals.
+        All times are the database's, so the claimers' clocks need not be in sync.
+        """
+        async with self._pool.connection() as aconn:
+            acur = await aconn.execute(
+                """
+            WITH due AS (
+                SELECT url, make_interval(secs => COALESCE(interval_seconds, %s)) AS interval
+                FROM WebsiteCheck
+                WHERE next_due_at IS NULL OR next_due_at <= now()
+                ORDER BY next_due_at NULLS FIRST
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE WebsiteCheck AS c
+            SET next_due_at = CASE
+                    WHEN c.next_due_at IS NULL OR c.next_due_at <= now() - due.interval THEN now() + due.interval
+                    ELSE c.next_due_at + due.interval
+                END
+            FROM due
+            WHERE c.url = due.url
+            RETURNING c.url, c.regex, c.extra_regexes, c.interval_seconds;""",
+                (default_interval_seconds, n),
+            )
+
+            acur.row_factory = namedtuple_row
+            return [_row_to_website_check(row) async for row in acur]
+
+    async def read_next_due_times(self) -> dict[str, datetime.datetime]:
+        async with self._pool.connection() as aconn:
+            acur = await aconn.execute(
+                """
+            SELECT url, next_due_at FROM WebsiteCheck
+            WHERE next_due_at IS NOT NULL;"""
+            )
+
+            return {url: next_due_at async for url, next_due_at in acur}
+
+    async def write_next_due_times(self, next_due_times: Mapping[str, datetime.datetime]) -> int:
+        """
+        Update all given next due times in a single statement.
+        """
+        async with self._pool.connection() as aconn:
+            cur = await aconn.execute(
+                """
+            UPDATE WebsiteCheck AS c
+            SET next_due_at = v.next_due_at
+            FROM unnest(%s::text[], %s::timestamptz[]) AS v(url, next_due_at)
+            WHERE c.url = v.url;""",
+                (list(next_due_times.keys()), list(next_due_times.values())),
+            )
+            return cur.rowcount
+
+    @asynccontextmanager
+    async def listen_changes(self) -> AsyncIterator[AsyncIterator[WebsiteCheckChange]]:
+        """
+        Listen to the notifications of the WebsiteCheck's triggers, with a dedicated connection (outside of the pool) held while in the context.
+        """
+        aconn = await AsyncConnection.connect(self._conninfo, autocommit=True)
+        try:
+            await aconn.execute(sql.SQL("LISTEN {};").format(sql.Identifier(WEBSITE_CHECK_CHANGES_CHANNEL)))
+            yield self._changes(aconn)
+        finally:
+            await aconn.close()
+
+    async def _changes(self, aconn: AsyncConnection) -> AsyncIterator[WebsiteCheckChange]:
+        async for notify in aconn.notifies():
+            url = notify.payload or None
+            yield WebsiteCheckChange(url=url, check=None if url is None else await self.read(url))
 
     async def delete(self, url: str) -> int:
         async with self._pool.connection() as aconn:
@@ -105,8 +299,126 @@ class WebsiteCheckSocketPostgres(WebsiteCheckSocket):
         return await self._pool.close()
 
 
+_CHECK_RESULT_WRITE_COLUMNS = (
+    "url",
+    "regex",
+    "extra_regexes",
+    "timestamp_start",
+    "response_time",
+    "timeout_error",
+    "host_error",
+    "other_error",
+    "response_status",
+    "regex_match",
+    "extra_regex_matches",
+    "dns_time",
+    "connect_time",
+    "ttfb_time",
+    "body_read_time",
+    "regex_time",
+)
+
+_CHECK_RESULT_WRITE_COLUMNS_SQL = sql.SQL(", ").join(map(sql.Identifier, _CHECK_RESULT_WRITE_COLUMNS))
+
+_CHECK_RESULT_INSERT_QUERY = sql.SQL("INSERT INTO CheckResult ({}) VALUES ({});").format(
+    _CHECK_RESULT_WRITE_COLUMNS_SQL, sql.SQL(", ").join(sql.Placeholder() * len(_CHECK_RESULT_WRITE_COLUMNS))
+)
+
+_CHECK_RESULT_COPY_QUERY = sql.SQL("COPY CheckResult ({}) FROM STDIN").format(_CHECK_RESULT_WRITE_COLUMNS_SQL)
+
+
+def _check_result_to_row(result: CheckResult) -> tuple:
+    """Return the result's values to write, in the same order as `_CHECK_RESULT_WRITE_COLUMNS`."""
+    phase_times = CheckPhaseTimes() if result.phase_times is None else result.phase_times
+
+    return (
+        result.check.url,
+        result.check.regex,
+        result.check.extra_regexes,
+        #
+        result.timestamp_start,
+        result.response_time,
+        #
+        result.timeout_error,
+        result.host_error,
+        result.other_error,
+        #
+        result.response_status,
+        result.regex_match_to_bool_or_none(),
+        result.extra_regex_matches_to_bool_or_none(),
+        #
+        phase_times.dns,
+        phase_times.connect,
+        phase_times.ttfb,
+        phase_times.body_read,
+        phase_times.regex,
+    )
+
+
+def _row_to_phase_times(row) -> CheckPhaseTimes | None:
+    phase_times = CheckPhaseTimes(
+        dns=row.dns_time,
+        connect=row.connect_time,
+        ttfb=row.ttfb_time,
+        body_read=row.body_read_time,
+        regex=row.regex_time,
+    )
+
+    # If no phase was recorded, the phases were not traced
+    return None if phase_times == CheckPhaseTimes() else phase_times
+
+
+def _row_to_check_result(row) -> CheckResult:
+    return CheckResult(
+        check=WebsiteCheck.without_validation(row.url, row.regex, row.extra_regexes),
+        #
+        timestamp_start=row.timestamp_start,
+        response_time=row.response_time,
+        #
+        timeout_error=row.timeout_error,
+        host_error=row.host_error,
+        other_error=row.other_error,
+        #
+        response_status=row.response_status,
+        regex_match=row.regex_match,
+        extra_regex_matches=row.extra_regex_matches,
+        phase_times=_row_to_phase_times(row),
+    )
+
+
+RESULTS_PARTITIONS_AHEAD = 2
+"""Number of partitions created ahead of the current one, so that a late maintenance does not leave the new results without a partition."""
+
+
 class CheckResultSocketPostgres(CheckResultSocket):
-    def __init__(self, conninfo: str) -> None:
+    def __init__(
+        self,
+        conninfo: str,
+        partition_period: str | None = None,
+        retention_days: int | None = None,
+        rollups_retention_days: Mapping[str, int] | None = None,
+    ) -> None:
+        self.partition_period = conf.RESULTS_PARTITION_PERIOD if partition_period is None else partition_period
+        """Time span of the partitions created from now on; see `RESULTS_PARTITION_PERIODS`"""
+        self.retention_days = conf.RESULTS_RETENTION_DAYS if retention_days is None else retention_days
+        """Number of days the results are kept (0 means forever)"""
+        self.rollups_retention_days = {
+            "minute": conf.ROLLUPS_MINUTE_RETENTION_DAYS,
+            "hour": conf.ROLLUPS_HOUR_RETENTION_DAYS,
+            "day": conf.ROLLUPS_DAY_RETENTION_DAYS,
+            **(rollups_retention_days or {}),
+        }
+        """Number of days the rollups of each grain are kept (0 means forever)"""
+
+        require(
+            self.partition_period in RESULTS_PARTITION_PERIODS,
+            f"Unknown results partition period: {self.partition_period} (valid: {', '.join(RESULTS_PARTITION_PERIODS)})",
+        )
+        require(self.retention_days >= 0, f"The results retention (days) must be non-negative: {self.retention_days}")
+        for grain, days in self.rollups_retention_days.items():
+            require(grain in ROLLUP_GRAINS, f"Unknown rollup grain: {grain} (valid: {', '.join(ROLLUP_GRAINS)})")
+            require(days >= 0, f"The {grain} rollups retention (days) must be non-negative: {days}")
+
         self._pool = AsyncConnectionPool(conninfo)
 
     def is_closed(self) -> bool:
@@ -114,28 +426,87 @@ class CheckResultSocketPostgres(CheckResultSocket):
 
     async def write(self, result: CheckResult) -> int:
         async with self._pool.connection() as aconn:
-            cur = await aconn.execute(
-                """
-            INSERT INTO CheckResult
-            (url, regex, timestamp_start, response_time, timeout_error, host_error, other_error, response_status, regex_match)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s);""",
-                (
-                    result.check.url,
-                    result.check.regex,
-                    #
-                    result.timestamp_start,
-                    result.response_time,
-                    #
-                    result.timeout_error,
-                    result.host_error,
-                    result.other_error,
-                    #
-                    result.response_status,
-                    result.regex_match_to_bool_or_none(),
-                ),
-            )
+            cur = await aconn.execute(_CHECK_RESULT_INSERT_QUERY, _check_result_to_row(result))
             return cur.rowcount
 
+    async def write_many(self, results: Sequence[CheckResult]) -> int:
+        """
+        Write all results with COPY, i.e. in a single round-trip & transaction.
+        """
+        async with self._pool.connection() as aconn:
+            async with aconn.cursor() as acur:
+                async with acur.copy(_CHECK_RESULT_COPY_QUERY) as copy:
+                    for result in results:
+                        await copy.write_row(_check_result_to_row(result))
+
+                return len(results)
+
+    async def create_partitions(self, num_ahead: int = RESULTS_PARTITIONS_AHEAD) -> int:
+        """
+        Create the partitions of the results from the current one to `num_ahead` ahead, if not created yet; return the number of created partitions.
+        """
+        async with self._pool.connection() as aconn:
+            acur = await aconn.execute(
+                "SELECT checkresult__create_partitions(%s, %s);", (self.partition_period, num_ahead)
+            )
+            [(num_created,)] = await acur.fetchall()
+            return num_created
+
+    async def drop_expired_partitions(self) -> int:
+        """
+        Drop the partitions whose results are all older than the retention (if any), and return the number of dropped partitions.
+
+        Dropping a partition is O(1), unlike deleting its results row by row (which leaves the table bloated until vacuumed).
+        """
+        if self.retention_days == 0:
+            return 0
+
+        async with self._pool.connection() as aconn:
+            acur = await aconn.execute(
+                "SELECT checkresult__drop_partitions(make_interval(days => %s));", (self.retention_days,)
+            )
+            [(num_dropped,)] = await acur.fetchall()
+            return num_dropped
+
+    async def delete_expired_rollups(self) -> int:
+        """
+        Delete the rollups of each grain whose bucket ended before the grain's retention (if any), and return the number of deleted rollups.
+
+        The rollups are not dropped together with the results' partitions, since they are meant to outlive them (e.g. the day rollups).
+        """
+        num_deleted = 0
+
+        async with self._pool.connection() as aconn:
+            for grain, days in self.rollups_retention_days.items():
+                if days == 0:
+                    continue
+
+                acur = await aconn.execute(
+                    """
+                    DELETE FROM CheckResultRollup
+                    WHERE grain = %(grain)s
+                      AND bucket_start <= (now() AT TIME ZONE 'UTC') - make_interval(days => %(days)s) - ('1 ' || %(grain)s)::INTERVAL;""",
+                    {"grain": grain, "days": days},
+                )
+                num_deleted += acur.rowcount
+
+        return num_deleted
+
+    async def maintain(self) -> None:
+        num_created = await self.create_partitions()
+        num_dropped = await self.drop_expired_partitions()
+        num_deleted_rollups = await self.delete_expired_rollups()
+
+        if num_created or num_dropped:
+            logging.info(
+                f"Maintained the results' partitions: created {num_created} ({self.partition_period}), "
+                f"dropped {num_dropped} (retention: {self.retention_days} days)"
+            )
+        if num_deleted_rollups:
+            logging.info(
+                f"Deleted {num_deleted_rollups} expired rollups (retention per grain, in days: {self.rollups_retention_days})"
+            )
+
     async def read_last_n(self, n: PositiveInt) -> AsyncIterator[CheckResult]:
         async with self._pool.connection() as aconn:
             query_raw = """
@@ -148,19 +519,88 @@ class CheckResultSocketPostgres(CheckResultSocket):
 
             acur.row_factory = namedtuple_row
             async for row in acur:
-                yield CheckResult(
-                    check=WebsiteCheck.without_validation(row.url, row.regex),
-                    #
-                    timestamp_start=row.timestamp_start,
-                    response_time=row.response_time,
-                    #
-                    timeout_error=row.timeout_error,
-                    host_error=row.host_error,
-                    other_error=row.other_error,
-                    #
-                    response_status=row.response_status,
-                    regex_match=row.regex_match,
-                )
+                yield _row_to_check_result(row)
+
+    async def read_last_n_per_url(
+        self, n: PositiveInt, since: datetime.datetime | None = None
+    ) -> AsyncIterator[CheckResult]:
+        """
+        With `since`, only the partitions of the results started after it are read.
+        """
+        if n == 1:
+            # The same, without ranking all results
+            async for result in self.read_current_status():
+                if since is None or result.timestamp_start > since:
+                    yield result
+            return
+
+        async with self._pool.connection() as aconn:
+            query = sql.SQL(
+                """
+                SELECT * FROM (
+                    SELECT *, ROW_NUMBER() OVER (PARTITION BY url ORDER BY timestamp_start DESC) AS url_row_number
+                    FROM CheckResult
+                    WHERE {}
+                ) AS ranked
+                WHERE url_row_number <= {}
+                ORDER BY url, timestamp_start DESC;"""
+            ).format(
+                sql.SQL("TRUE") if since is None else sql.SQL("timestamp_start > {}").format(sql.Literal(since)),
+                sql.Literal(n),
+            )
+
+            acur = await aconn.execute(query)
+
+            acur.row_factory = namedtuple_row
+            async for row in acur:
+                yield _row_to_check_result(row)
+
+    async def read_current_status(self) -> AsyncIterator[CheckResult]:
+        """
+        The latest results are kept apart (in LatestCheckResult) by the database together with each write of results (see the CheckResult's triggers in `up.sql`),
+        so only one row per URL is read, however many results there are.
+        """
+        async with self._pool.connection() as aconn:
+            acur = await aconn.execute(
+                """
+            SELECT * FROM LatestCheckResult
+            ORDER BY url;"""
+            )
+
+            acur.row_factory = namedtuple_row
+            async for row in acur:
+                yield _row_to_check_result(row)
+
+    async def read_rollups(
+        self, grain: str, since: datetime.datetime, url: str | None = None
+    ) -> AsyncIterator[CheckResultRollup]:
+        """
+        The rollups are maintained by the database together with each write of results (see the CheckResult's triggers in `up.sql`),
+        so only the rollups' rows are read, e.g. 7 rows per URL for the day rollups of a week.
+        """
+        require(grain in ROLLUP_GRAINS, f"Unknown rollup grain: {grain} (valid: {', '.join(ROLLUP_GRAINS)})")
+
+        async with self._pool.connection() as aconn:
+            async with aconn.cursor(row_factory=dict_row) as acur:
+                if url is None:
+                    await acur.execute(
+                        """
+                    SELECT * FROM CheckResultRollup
+                    WHERE grain = %(grain)s AND bucket_start >= date_trunc(%(grain)s, %(since)s::timestamp)
+                    ORDER BY url, bucket_start;""",
+                        {"grain": grain, "since": since},
+                    )
+                else:
+                    await acur.execute(
+                        """
+                    SELECT * FROM CheckResultRollup
+                    WHERE url = %(url)s AND grain = %(grain)s AND bucket_start >= date_trunc(%(grain)s, %(since)s::timestamp)
+                    ORDER BY bucket_start;""",
+                        {"url": url, "grain": grain, "since": since},
+                    )
+
+                async for row in acur:
+                    yield CheckResultRollup(**row)
 
     async def close(self) -> None:
         return await self._pool.close()
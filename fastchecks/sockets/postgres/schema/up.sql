@@ -9,24 +9,74 @@ CREATE domain my_pyregex AS VARCHAR(2048);
 CREATE TABLE
   -- WebsiteCheck (Scheduled)
   WebsiteCheck (
-    -- We decisively not allow duplicate URLs. If we wanted to allow multiple regex's per URL, we could use an ARRAY of regex's.
+    -- We decisively not allow duplicate URLs. Multiple regex's per URL are allowed with the ARRAY of extra regex's.
     url my_url PRIMARY KEY,
     regex my_pyregex,
+    -- More regex's that the body must match too (searched in the same single read of the body); only allowed together with regex.
+    -- Note: the elements are of the same type as my_pyregex; we do not use an array of the domain since psycopg doesn't recognize it by default.
+    extra_regexes VARCHAR(2048)[] CHECK (extra_regexes IS NULL OR regex IS NOT NULL),
     -- Note: the maximum positive value for smallint is 32767 (seconds), meaning a maximum of ~9 hours. We expect to use intervals of a max a few minutes.
-    interval_seconds SMALLINT
+    interval_seconds SMALLINT,
+    -- When the check is next due (NULL means due now, or unknown).
+    -- With the distributed scheduler, it's managed with the database's clock only: claiming a due check moves it one interval ahead,
+    -- so the claim doubles as a lease: if the claiming node dies, the check is due again within one interval.
+    -- With the other schedulers, it's persisted periodically, so that a restarted runner resumes the check's phase.
+    next_due_at TIMESTAMPTZ
   );
 
 
+CREATE INDEX websitecheck__next_due_at__idx ON WebsiteCheck USING btree (next_due_at NULLS FIRST);
+
+
+-- Notify the listeners (e.g. a running scheduler) of each changed check, so that they sync it without re-reading all checks.
+-- The payload is only the changed url (the listeners read the check anew), since the payloads are limited to 8000 bytes.
+-- Note: the notifications are sent when the transaction commits, and duplicates within the same transaction are sent once.
+CREATE FUNCTION websitecheck__notify_change() RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'TRUNCATE' THEN
+    -- An empty payload means that all checks changed
+    PERFORM pg_notify('websitecheck_changes', '');
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM pg_notify('websitecheck_changes', OLD.url);
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM pg_notify('websitecheck_changes', NEW.url);
+  END IF;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Note: the updates of only next_due_at (i.e. the schedulers' state) are not changes of the checks themselves
+CREATE TRIGGER websitecheck__notify_change__row
+AFTER INSERT OR UPDATE OF url, regex, extra_regexes, interval_seconds OR DELETE ON WebsiteCheck
+FOR EACH ROW EXECUTE FUNCTION websitecheck__notify_change();
+
+
+CREATE TRIGGER websitecheck__notify_change__truncate
+AFTER TRUNCATE ON WebsiteCheck
+FOR EACH STATEMENT EXECUTE FUNCTION websitecheck__notify_change();
+
+
 -- It's tempting to use the timestamp as the primary key, but the probability of collisions is not zero.
 -- MAYBE (future idea) If we needed to often select by website's domain, we could create a separate column for it.
 -- Note: we don't cross-reference the WebsiteCheck with a key, because a result may be stored even if the website is no longer being checked (or was never stored).
+-- The results are partitioned by their start time (daily or weekly; see the partitions' functions below), so that the queries of the recent results
+-- only scan the recent partitions, and the expired results are dropped whole partitions at a time, instead of deleted (and vacuumed) row by row.
 CREATE TABLE
   CheckResult (
-    id serial PRIMARY KEY,
+    -- Note: the primary key of a partitioned table must include the partition key
+    id serial,
     --
     --
     url my_url NOT NULL,
     regex my_pyregex,
+    extra_regexes VARCHAR(2048)[],
     --
     --
     timestamp_start TIMESTAMP NOT NULL,
@@ -40,8 +90,27 @@ CREATE TABLE
     response_status SMALLINT,
     -- We do not store the regex match (if any); we only store if it's found or not.
     -- Several reasons: 1) save on space; 2) we likely don't need to know the match; 3) we don't want to store possibly sensitive data or even extraneous data.
-    regex_match BOOLEAN
-  );
+    regex_match BOOLEAN,
+    -- Same as regex_match, for each of the extra regex's (in the same order)
+    extra_regex_matches BOOLEAN[],
+    --
+    -- Durations (seconds) of the request's phases; only if they were traced, and NULL if the phase did not happen.
+    -- Note: connect_time includes the TLS handshake (if any), as they cannot be told apart with aiohttp's tracing.
+    dns_time REAL,
+    connect_time REAL,
+    ttfb_time REAL,
+    body_read_time REAL,
+    regex_time REAL,
+    --
+    PRIMARY KEY (id, timestamp_start)
+  )
+PARTITION BY
+  RANGE (timestamp_start);
+
+
+-- Catches the results out of the created partitions (e.g. if the partitions were not maintained in time), so that no result is lost.
+-- It should stay (almost) empty: a partition cannot be created for a range that has results in the default partition.
+CREATE TABLE CheckResult_default PARTITION OF CheckResult DEFAULT;
 
 
 -- Note: we don't set up a foreign key on the url. We might have check results for websites that were never stored or are no longer being checked.
@@ -50,3 +119,274 @@ CREATE INDEX result__url__idx ON CheckResult USING hash (url);
 
 -- Create index on timestamp_start, descending, since we will often want to select the most recent results.
 CREATE INDEX result__timestamp_start__desc__idx ON CheckResult USING btree (timestamp_start DESC);
+
+
+-- The latest result of each URL (by timestamp_start), with the same columns as CheckResult (except the id); so the current status of all URLs
+-- is read from one row per URL, however many results there are. It's upserted together with each write of results (see the trigger below).
+-- Note: a URL's latest result is kept when the URL is no longer checked (as in CheckResult), until it expires (see `checkresult__drop_partitions`).
+CREATE TABLE
+  LatestCheckResult (
+    url my_url PRIMARY KEY,
+    regex my_pyregex,
+    extra_regexes VARCHAR(2048)[],
+    --
+    timestamp_start TIMESTAMP NOT NULL,
+    response_time REAL NOT NULL,
+    --
+    timeout_error BOOLEAN NOT NULL,
+    host_error BOOLEAN NOT NULL,
+    other_error BOOLEAN NOT NULL,
+    --
+    response_status SMALLINT,
+    regex_match BOOLEAN,
+    extra_regex_matches BOOLEAN[],
+    --
+    dns_time REAL,
+    connect_time REAL,
+    ttfb_time REAL,
+    body_read_time REAL,
+    regex_time REAL
+  );
+
+
+-- Upsert the latest of each statement's new results (e.g. a whole batch written with COPY) per URL, unless an even later result is already stored.
+CREATE FUNCTION latestcheckresult__upsert_results() RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO LatestCheckResult AS l
+  SELECT DISTINCT ON (n.url)
+    n.url, n.regex, n.extra_regexes,
+    n.timestamp_start, n.response_time,
+    n.timeout_error, n.host_error, n.other_error,
+    n.response_status, n.regex_match, n.extra_regex_matches,
+    n.dns_time, n.connect_time, n.ttfb_time, n.body_read_time, n.regex_time
+  FROM
+    new_results n
+  -- Sorted by url too, so that concurrent writers do not deadlock
+  ORDER BY n.url, n.timestamp_start DESC
+  ON CONFLICT (url) DO UPDATE
+    SET regex = EXCLUDED.regex,
+        extra_regexes = EXCLUDED.extra_regexes,
+        timestamp_start = EXCLUDED.timestamp_start,
+        response_time = EXCLUDED.response_time,
+        timeout_error = EXCLUDED.timeout_error,
+        host_error = EXCLUDED.host_error,
+        other_error = EXCLUDED.other_error,
+        response_status = EXCLUDED.response_status,
+        regex_match = EXCLUDED.regex_match,
+        extra_regex_matches = EXCLUDED.extra_regex_matches,
+        dns_time = EXCLUDED.dns_time,
+        connect_time = EXCLUDED.connect_time,
+        ttfb_time = EXCLUDED.ttfb_time,
+        body_read_time = EXCLUDED.body_read_time,
+        regex_time = EXCLUDED.regex_time
+    WHERE EXCLUDED.timestamp_start >= l.timestamp_start;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE TRIGGER latestcheckresult__upsert_results__statement
+AFTER INSERT ON CheckResult
+REFERENCING NEW TABLE AS new_results
+FOR EACH STATEMENT EXECUTE FUNCTION latestcheckresult__upsert_results();
+
+
+-- Per-URL rollups of the results in buckets of time (by timestamp_start, in UTC) of each grain: 'minute', 'hour', and 'day'.
+-- They are updated together with each write of results (see the trigger below), so that the uptime & latency over any period
+-- are read from a few rows (e.g. 7 day rollups for a week) instead of scanning all the period's results.
+-- Note: the rollups are kept when the results' partitions are dropped; they expire after their own retention per grain (see `CheckResultSocketPostgres.delete_expired_rollups`).
+CREATE TABLE
+  CheckResultRollup (
+    url my_url NOT NULL,
+    grain VARCHAR(6) NOT NULL CHECK (grain IN ('minute', 'hour', 'day')),
+    bucket_start TIMESTAMP NOT NULL,
+    --
+    num_checks INTEGER NOT NULL,
+    -- As in the python's CheckResult.is_success
+    num_successes INTEGER NOT NULL,
+    num_timeout_errors INTEGER NOT NULL,
+    num_host_errors INTEGER NOT NULL,
+    num_other_errors INTEGER NOT NULL,
+    num_responses INTEGER NOT NULL,
+    -- Responses with a non-OK status (>= 400)
+    num_response_errors INTEGER NOT NULL,
+    --
+    -- The response times are only of the results with a response (the failed requests' times say nothing about the latency); NULL if none.
+    response_time_sum DOUBLE PRECISION NOT NULL,
+    response_time_min REAL,
+    response_time_max REAL,
+    -- Histogram of the response times, to estimate their quantiles (see `latency_sketch__bucket`)
+    response_time_sketch INTEGER[],
+    --
+    PRIMARY KEY (url, grain, bucket_start)
+  );
+
+
+-- For the rollups of all URLs (e.g. a fleet-wide dashboard)
+CREATE INDEX rollup__grain__bucket_start__idx ON CheckResultRollup USING btree (grain, bucket_start);
+
+
+-- Index of the latency sketch's bucket of the given response time (seconds): 0 for the times up to 1ms, and i > 0 for the times in (1ms * 1.2^(i-1), 1ms * 1.2^i],
+-- up to the last one (63, i.e. ~97s), which holds the slower ones too.
+-- Note: the values must be the same as in python's `fastchecks.rollups`.
+CREATE FUNCTION latency_sketch__bucket(response_time REAL) RETURNS INTEGER AS $$
+  SELECT LEAST(GREATEST(ceil(ln(GREATEST(response_time, 0.001) / 0.001) / ln(1.2)), 0), 63)::INTEGER;
+$$ LANGUAGE sql IMMUTABLE;
+
+
+CREATE FUNCTION latency_sketch__add(sketch INTEGER[], response_time REAL) RETURNS INTEGER[] AS $$
+DECLARE
+  i INTEGER := latency_sketch__bucket(response_time) + 1;
+BEGIN
+  IF sketch IS NULL THEN
+    sketch := array_fill(0, ARRAY[64]);
+  END IF;
+
+  sketch[i] := sketch[i] + 1;
+  RETURN sketch;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+
+-- Sketch of the aggregated response times; NULL if there are none
+CREATE AGGREGATE latency_sketch__agg(REAL) (SFUNC = latency_sketch__add, STYPE = INTEGER[]);
+
+
+-- Merge two sketches by adding them up; a NULL sketch is empty
+CREATE FUNCTION latency_sketch__merge(a INTEGER[], b INTEGER[]) RETURNS INTEGER[] AS $$
+  SELECT CASE
+    WHEN a IS NULL THEN b
+    WHEN b IS NULL THEN a
+    ELSE (SELECT array_agg(x + y ORDER BY i) FROM unnest(a, b) WITH ORDINALITY AS u(x, y, i))
+  END;
+$$ LANGUAGE sql IMMUTABLE;
+
+
+-- Add each statement's new results (e.g. a whole batch written with COPY) to the rollups of each grain, with a single upsert.
+CREATE FUNCTION checkresultrollup__add_results() RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO CheckResultRollup AS r
+  SELECT
+    n.url,
+    g.grain,
+    date_trunc(g.grain, n.timestamp_start),
+    count(*),
+    count(*) FILTER (
+      WHERE n.response_status < 400
+        AND (n.regex IS NULL OR (n.regex_match AND (n.extra_regexes IS NULL OR COALESCE(true = ALL(n.extra_regex_matches), false))))
+    ),
+    count(*) FILTER (WHERE n.timeout_error),
+    count(*) FILTER (WHERE n.host_error),
+    count(*) FILTER (WHERE n.other_error),
+    count(*) FILTER (WHERE n.response_status IS NOT NULL),
+    count(*) FILTER (WHERE n.response_status >= 400),
+    COALESCE(sum(n.response_time) FILTER (WHERE n.response_status IS NOT NULL), 0),
+    min(n.response_time) FILTER (WHERE n.response_status IS NOT NULL),
+    max(n.response_time) FILTER (WHERE n.response_status IS NOT NULL),
+    latency_sketch__agg(n.response_time) FILTER (WHERE n.response_status IS NOT NULL)
+  FROM
+    new_results n
+    CROSS JOIN unnest(ARRAY['minute', 'hour', 'day']) AS g(grain)
+  GROUP BY 1, 2, 3
+  -- In the same order as the primary key, so that concurrent writers do not deadlock
+  ORDER BY 1, 2, 3
+  ON CONFLICT (url, grain, bucket_start) DO UPDATE
+    SET num_checks = r.num_checks + EXCLUDED.num_checks,
+        num_successes = r.num_successes + EXCLUDED.num_successes,
+        num_timeout_errors = r.num_timeout_errors + EXCLUDED.num_timeout_errors,
+        num_host_errors = r.num_host_errors + EXCLUDED.num_host_errors,
+        num_other_errors = r.num_other_errors + EXCLUDED.num_other_errors,
+        num_responses = r.num_responses + EXCLUDED.num_responses,
+        num_response_errors = r.num_response_errors + EXCLUDED.num_response_errors,
+        response_time_sum = r.response_time_sum + EXCLUDED.response_time_sum,
+        response_time_min = LEAST(r.response_time_min, EXCLUDED.response_time_min),
+        response_time_max = GREATEST(r.response_time_max, EXCLUDED.response_time_max),
+        response_time_sketch = latency_sketch__merge(r.response_time_sketch, EXCLUDED.response_time_sketch);
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE TRIGGER checkresultrollup__add_results__statement
+AFTER INSERT ON CheckResult
+REFERENCING NEW TABLE AS new_results
+FOR EACH STATEMENT EXECUTE FUNCTION checkresultrollup__add_results();
+
+
+-- Create the partitions of CheckResult of each `period` ('day' or 'week', in UTC) from the current one to `num_ahead` periods ahead, if not created yet;
+-- return the number of created partitions. Each partition is named after its start date, e.g. checkresult_p20230925.
+-- A partition that cannot be created (because it overlaps others, e.g. after changing the period, or because the default partition has results in its range) is skipped with a warning.
+CREATE FUNCTION checkresult__create_partitions(period TEXT, num_ahead INTEGER) RETURNS INTEGER AS $$
+DECLARE
+  period_interval INTERVAL := ('1 ' || period)::INTERVAL;
+  start_at TIMESTAMP := date_trunc(period, now() AT TIME ZONE 'UTC');
+  partition_name TEXT;
+  num_created INTEGER := 0;
+BEGIN
+  -- Serialize the maintenance of concurrent runners (e.g. the workers)
+  PERFORM pg_advisory_xact_lock(hashtext('checkresult__partitions'));
+
+  FOR i IN 0..num_ahead LOOP
+    partition_name := 'checkresult_p' || to_char(start_at, 'YYYYMMDD');
+
+    IF to_regclass(partition_name) IS NULL THEN
+      BEGIN
+        EXECUTE format(
+          'CREATE TABLE %I PARTITION OF CheckResult FOR VALUES FROM (%L) TO (%L)',
+          partition_name, start_at, start_at + period_interval
+        );
+        num_created := num_created + 1;
+      EXCEPTION WHEN invalid_object_definition OR check_violation THEN
+        RAISE WARNING 'Could not create the partition %: %', partition_name, SQLERRM;
+      END;
+    END IF;
+
+    start_at := start_at + period_interval;
+  END LOOP;
+
+  RETURN num_created;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Drop the partitions of CheckResult whose results all started before `retention` ago (in UTC), and delete such results from the default partition
+-- (and from LatestCheckResult, i.e. of the URLs that were not checked since); return the number of dropped partitions.
+CREATE FUNCTION checkresult__drop_partitions(retention INTERVAL) RETURNS INTEGER AS $$
+DECLARE
+  expired_before TIMESTAMP := (now() AT TIME ZONE 'UTC') - retention;
+  p RECORD;
+  num_dropped INTEGER := 0;
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('checkresult__partitions'));
+
+  FOR p IN
+    SELECT
+      c.oid::regclass AS name,
+      -- e.g. FOR VALUES FROM ('2023-09-25 00:00:00') TO ('2023-09-26 00:00:00'); NULL for the default partition
+      substring(pg_get_expr(c.relpartbound, c.oid) FROM 'TO \(''([^'']+)''\)')::TIMESTAMP AS end_at
+    FROM
+      pg_inherits i
+      JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE
+      i.inhparent = 'checkresult'::regclass
+  LOOP
+    IF p.end_at <= expired_before THEN
+      EXECUTE format('DROP TABLE %s', p.name);
+      num_dropped := num_dropped + 1;
+    END IF;
+  END LOOP;
+
+  DELETE FROM CheckResult_default WHERE timestamp_start < expired_before;
+  DELETE FROM LatestCheckResult WHERE timestamp_start < expired_before;
+
+  RETURN num_dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- The version of this schema (see `SCHEMA_VERSION` in python), to detect the databases created with an older one
+CREATE TABLE SchemaVersion (version INTEGER NOT NULL);
+
+INSERT INTO SchemaVersion (version) VALUES (1);
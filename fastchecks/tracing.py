@@ -0,0 +1,176 @@
+#
+# Tracing of the HTTP requests done by the checks, with aiohttp's client tracing: https://docs.aiohttp.org/en/stable/client_advanced.html#client-tracing
+#
+
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import aiohttp
+
+from fastchecks.types import CheckPhaseTimes
+
+
+class ConnectionReuseStats:
+    """
+    Count, per host, the connections that were newly created or reused (keep-alive) from the session's connection pool for the requests.
+
+    Use it by adding its `trace_config()` to the session, e.g. `aiohttp.ClientSession(trace_configs=[stats.trace_config()])`.
+    """
+
+    def __init__(self) -> None:
+        self.created: Counter[str] = Counter()
+        self.reused: Counter[str] = Counter()
+
+    def hosts(self) -> set[str]:
+        return set(self.created) | set(self.reused)
+
+    def reuse_ratio(self, host: str | None = None) -> float | None:
+        """
+        Return the ratio of reused connections (among all connections) for the given host, or for all hosts if None.
+        Return None if no connection has been made (for that host) yet.
+        """
+        if host is None:
+            reused = self.reused.total()
+            created = self.created.total()
+        else:
+            reused = self.reused[host]
+            created = self.created[host]
+
+        total = reused + created
+        return None if total == 0 else reused / total
+
+    def reuse_ratios(self) -> dict[str, float | None]:
+        """Return the reuse ratio of each host."""
+        return {host: self.reuse_ratio(host) for host in sorted(self.hosts())}
+
+    def __str__(self) -> str:
+        return f"ConnectionReuseStats(reused={self.reused.total()}, created={self.created.total()}, reuse_ratio={self.reuse_ratio()})"
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        async def on_request_start(
+            session: aiohttp.ClientSession, ctx: SimpleNamespace, params: aiohttp.TraceRequestStartParams
+        ) -> None:
+            # Sent for each request, also for redirects; the connection signals don't tell the host, so we keep it
+            ctx.host = params.url.host or ""
+
+        async def on_connection_create_end(
+            session: aiohttp.ClientSession, ctx: SimpleNamespace, params: aiohttp.TraceConnectionCreateEndParams
+        ) -> None:
+            self.created[ctx.host] += 1
+
+        async def on_connection_reuseconn(
+            session: aiohttp.ClientSession, ctx: SimpleNamespace, params: aiohttp.TraceConnectionReuseconnParams
+        ) -> None:
+            self.reused[ctx.host] += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+
+        return trace_config
+
+
+class RequestPhaseTimer:
+    """
+    Measure the durations of the phases of a single check's request (see `CheckPhaseTimes`), with a monotonic clock.
+
+    The DNS, connect and TTFB phases are measured by aiohttp's tracing: pass the timer as the request's `trace_request_ctx`,
+    and add `request_phases_trace_config()` to the session; else, they stay None.
+    The body read and regex phases are measured by the caller (see `add_regex_time` and `set_body_read_time`).
+    """
+
+    def __init__(self) -> None:
+        self._request_start: float | None = None
+        self._dns_start: float | None = None
+        self._connect_start: float | None = None
+        self._connect_dns: float = 0.0
+        """DNS time (if any) taken while creating the connection, to be discounted from its connect time."""
+
+        self.dns: float | None = None
+        self.connect: float | None = None
+        self.ttfb: float | None = None
+        self.body_read: float | None = None
+        self.regex: float | None = None
+
+    def add_regex_time(self, seconds: float) -> None:
+        self.regex = seconds if self.regex is None else self.regex + seconds
+
+    def set_body_read_time(self, seconds: float) -> None:
+        """Set the body read time, given the total time of reading the body and searching the regexes in it."""
+        self.body_read = seconds if self.regex is None else max(seconds - self.regex, 0.0)
+
+    def phase_times(self) -> CheckPhaseTimes:
+        return CheckPhaseTimes(
+            dns=self.dns, connect=self.connect, ttfb=self.ttfb, body_read=self.body_read, regex=self.regex
+        )
+
+
+def request_phases_trace_config() -> aiohttp.TraceConfig:
+    """
+    Return a trace config that measures the request phases of the requests that are given a `RequestPhaseTimer` as `trace_request_ctx`.
+
+    The requests without it are not measured (i.e. the overhead is a few function calls per request).
+    With redirects, the DNS and connect times of all the requests are added up.
+    """
+
+    def timer_of(ctx: SimpleNamespace) -> RequestPhaseTimer | None:
+        return ctx.trace_request_ctx if isinstance(ctx.trace_request_ctx, RequestPhaseTimer) else None
+
+    def add(current: float | None, seconds: float) -> float:
+        return seconds if current is None else current + seconds
+
+    async def on_request_start(
+        session: aiohttp.ClientSession, ctx: SimpleNamespace, params: aiohttp.TraceRequestStartParams
+    ) -> None:
+        if (timer := timer_of(ctx)) is not None and timer._request_start is None:
+            timer._request_start = time.perf_counter()
+
+    async def on_request_end(
+        session: aiohttp.ClientSession, ctx: SimpleNamespace, params: aiohttp.TraceRequestEndParams
+    ) -> None:
+        if (timer := timer_of(ctx)) is not None and timer._request_start is not None:
+            timer.ttfb = time.perf_counter() - timer._request_start
+
+    async def on_dns_resolvehost_start(
+        session: aiohttp.ClientSession, ctx: SimpleNamespace, params: aiohttp.TraceDnsResolveHostStartParams
+    ) -> None:
+        if (timer := timer_of(ctx)) is not None:
+            timer._dns_start = time.perf_counter()
+
+    async def on_dns_resolvehost_end(
+        session: aiohttp.ClientSession, ctx: SimpleNamespace, params: aiohttp.TraceDnsResolveHostEndParams
+    ) -> None:
+        if (timer := timer_of(ctx)) is not None and timer._dns_start is not None:
+            seconds = time.perf_counter() - timer._dns_start
+            timer._dns_start = None
+            timer.dns = add(timer.dns, seconds)
+            if timer._connect_start is not None:
+                timer._connect_dns += seconds
+
+    async def on_connection_create_start(
+        session: aiohttp.ClientSession, ctx: SimpleNamespace, params: aiohttp.TraceConnectionCreateStartParams
+    ) -> None:
+        if (timer := timer_of(ctx)) is not None:
+            timer._connect_start = time.perf_counter()
+            timer._connect_dns = 0.0
+
+    async def on_connection_create_end(
+        session: aiohttp.ClientSession, ctx: SimpleNamespace, params: aiohttp.TraceConnectionCreateEndParams
+    ) -> None:
+        if (timer := timer_of(ctx)) is not None and timer._connect_start is not None:
+            # The connection's creation includes resolving the host, which we measure separately
+            seconds = time.perf_counter() - timer._connect_start - timer._connect_dns
+            timer._connect_start = None
+            timer.connect = add(timer.connect, max(seconds, 0.0))
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+
+    return trace_config
@@ -15,24 +15,48 @@ _MAX_REPR_LEN: int = 410
 class WebsiteCheck(BaseModel):
     url: str
     regex: str | None = None
+    extra_regexes: list[str] | None = None
+    """More regexes that the response body must match too (if any, `regex` must be defined). All are searched in the same single read of the body."""
 
     @classmethod
-    def with_validation(cls, url: str, regex: str | None = None) -> "WebsiteCheck":
+    def with_validation(
+        cls, url: str, regex: str | None = None, extra_regexes: list[str] | None = None
+    ) -> "WebsiteCheck":
         """
-        Validate the given URL and regex (if any), and return a WebsiteCheck instance.
+        Validate the given URL and regexes (if any), and return a WebsiteCheck instance.
 
-        If the URL or regex are invalid, raise ValueError.
+        If the URL or regexes are invalid, raise ValueError.
         """
-        return cls(url=vutil.validated_web_url(url), regex=vutil.validated_regex_accepting_none(regex))
+        _extra_regexes = extra_regexes if extra_regexes else None
+        require(regex is not None or _extra_regexes is None, "Extra regexes can only be given together with a regex.")
+
+        return cls(
+            url=vutil.validated_web_url(url),
+            regex=vutil.validated_regex_accepting_none(regex),
+            extra_regexes=None if _extra_regexes is None else [vutil.validated_regex(x) for x in _extra_regexes],
+        )
 
     @classmethod
-    def without_validation(cls, url: str, regex: str | None = None) -> "WebsiteCheck":
+    def without_validation(
+        cls, url: str, regex: str | None = None, extra_regexes: list[str] | None = None
+    ) -> "WebsiteCheck":
+        """
+        Return a WebsiteCheck instance without validating the given URL and regexes (if any).
+
+        Only use this method if you are sure that the URL and regexes are valid (e.g., they were validated before).
         """
-        Return a WebsiteCheck instance without validating the given URL and regex (if any).
+        return cls(url=url, regex=regex, extra_regexes=extra_regexes)
 
-        Only use this method if you are sure that the URL and regex are valid (e.g., they were validated before).
+    def all_regexes(self) -> list[str]:
+        """
+        Return all the regexes to match, the main `regex` first; the list is empty if there is no regex.
         """
-        return cls(url=url, regex=regex)
+        if self.regex is None:
+            return []
+        elif self.extra_regexes is None:
+            return [self.regex]
+        else:
+            return [self.regex, *self.extra_regexes]
 
     def __repr__(self) -> str:
         return util.shorten_str(super().__repr__(), max=_MAX_REPR_LEN)
@@ -48,16 +72,49 @@ class WebsiteCheckScheduled(WebsiteCheck):
 
     # url: str
     # regex: str | None = None
+    # extra_regexes: list[str] | None = None
     interval_seconds: int | None
     """If None, later a system's default value will be used."""
 
     @classmethod
     def with_check(cls, check: WebsiteCheck, interval_seconds: int | None) -> "WebsiteCheckScheduled":
         return cls(
-            url=check.url, regex=check.regex, interval_seconds=conf.validated_interval_accepting_none(interval_seconds)
+            url=check.url,
+            regex=check.regex,
+            extra_regexes=check.extra_regexes,
+            interval_seconds=conf.validated_interval_accepting_none(interval_seconds),
         )
 
 
+class WebsiteCheckChange(BaseModel):
+    """
+    A change of the stored checks, e.g. as listened from the checks' data store (see `WebsiteCheckSocket.listen_changes`).
+    """
+
+    url: str | None
+    """The url of the changed check; None if all checks changed at once (e.g. all were deleted)."""
+    check: WebsiteCheckScheduled | None
+    """The check as currently stored; None if it was deleted (or if `url` is None)."""
+
+
+class CheckPhaseTimes(BaseModel):
+    """
+    Durations (in seconds, measured with a monotonic clock) of the phases of a check's request.
+
+    A phase is None if it did not happen (e.g. neither DNS resolution nor connection when a keep-alive connection is reused) or was not measured.
+    """
+
+    dns: float | None = None
+    connect: float | None = None
+    """TCP connect together with the TLS handshake, if any (aiohttp's tracing does not tell them apart); without the DNS resolution."""
+    ttfb: float | None = None
+    """Time to first byte: from the start of the request until the response's headers were received (including redirects)."""
+    body_read: float | None = None
+    """Reading (and decoding) the body to search the regexes; None if the body was not read for that."""
+    regex: float | None = None
+    """Searching the regexes in the read body."""
+
+
 class CheckResult(BaseModel):
     #
     check: WebsiteCheck
@@ -84,6 +141,16 @@ class CheckResult(BaseModel):
     bool False: the tested regex did not match.
     None: means "not tested" (e.g. there was no regex to test, the response was not OK, or the response body was ignored because it was too big or not text).
     """
+    extra_regex_matches: list[str | bool | None] | None = None
+    """
+    The match of each of the check's extra regexes (in the same order), with the same meaning as for `regex_match`.
+    None: means "not tested" (e.g. there were no extra regexes, or as for `regex_match`).
+    """
+    #
+    # Optional details
+    #
+    phase_times: CheckPhaseTimes | None = None
+    """Only if the request phases were traced."""
 
     def __init__(self, **data) -> None:
         """
@@ -94,6 +161,16 @@ class CheckResult(BaseModel):
         if self.check.regex is None:
             require(self.regex_match is None, "If there is no regex, regex_match MUST be None.")
 
+        if self.check.extra_regexes is None:
+            require(
+                self.extra_regex_matches is None, "If there are no extra regexes, extra_regex_matches MUST be None."
+            )
+        elif self.extra_regex_matches is not None:
+            require(
+                len(self.extra_regex_matches) == len(self.check.extra_regexes),
+                "There must be one extra regex match per extra regex.",
+            )
+
     def __repr__(self) -> str:
         return util.shorten_str(super().__repr__(), max=_MAX_REPR_LEN)
 
@@ -114,9 +191,9 @@ class CheckResult(BaseModel):
 
     def is_regex_validated(self) -> bool:
         """
-        Return True if the regex was validated (i.e. there was a regex and it matched).
+        Return True if the regexes were validated (i.e. there was no regex, or all regexes matched).
         """
-        return self.check.regex is None or self.is_regex_match_truthy()
+        return self.check.regex is None or (self.is_regex_match_truthy() and self.are_extra_regex_matches_truthy())
 
     def is_regex_match_truthy(self) -> bool:
         """
@@ -125,10 +202,23 @@ class CheckResult(BaseModel):
         Note: we consider a regex match to be truthy even if the matched string is the empty string.
         This could be changed.
         """
-        return self.regex_match is True or isinstance(self.regex_match, str)
+        return _is_match_truthy(self.regex_match)
+
+    def are_extra_regex_matches_truthy(self) -> bool:
+        """
+        Return True if there are no extra regexes, or all of them matched (see `is_regex_match_truthy`).
+        """
+        return self.check.extra_regexes is None or (
+            self.extra_regex_matches is not None and all(_is_match_truthy(x) for x in self.extra_regex_matches)
+        )
 
     def regex_match_to_bool_or_none(self) -> bool | None:
-        return None if self.regex_match is None else self.is_regex_match_truthy()
+        return _match_to_bool_or_none(self.regex_match)
+
+    def extra_regex_matches_to_bool_or_none(self) -> list[bool | None] | None:
+        return (
+            None if self.extra_regex_matches is None else [_match_to_bool_or_none(x) for x in self.extra_regex_matches]
+        )
 
     @classmethod
     def response(
@@ -138,6 +228,8 @@ class CheckResult(BaseModel):
         response_time: float,
         response_status: int,
         regex_match: str | bool | None,
+        extra_regex_matches: list[str | bool | None] | None = None,
+        phase_times: CheckPhaseTimes | None = None,
     ) -> "CheckResult":
         """
         Return a successful CheckResult.
@@ -154,6 +246,8 @@ class CheckResult(BaseModel):
             #
             response_status=response_status,
             regex_match=regex_match,
+            extra_regex_matches=extra_regex_matches,
+            phase_times=phase_times,
         )
 
     @classmethod
@@ -165,6 +259,7 @@ class CheckResult(BaseModel):
         timeout_error: bool = False,
         host_error: bool = False,
         other_error: bool = False,
+        phase_times: CheckPhaseTimes | None = None,
     ) -> "CheckResult":
         """
         Return a failed CheckResult.
@@ -186,4 +281,13 @@ class CheckResult(BaseModel):
             #
             response_status=None,
             regex_match=None,
+            phase_times=phase_times,
         )
+
+
+def _is_match_truthy(match: str | bool | None) -> bool:
+    return match is True or isinstance(match, str)
+
+
+def _match_to_bool_or_none(match: str | bool | None) -> bool | None:
+    return None if match is None else _is_match_truthy(match)
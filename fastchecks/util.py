@@ -1,3 +1,5 @@
+import asyncio
+import contextlib
 import datetime
 from typing import AsyncIterator, TypeVar
 from urllib.parse import urlparse, urlunparse
@@ -94,9 +96,51 @@ def is_content_length_less_than(response: aiohttp.ClientResponse, length: int, a
         return int(content_length) < length
 
 
+_DRAIN_CHUNK_SIZE = 2**16
+
+
+async def release_or_close_response(response: aiohttp.ClientResponse, max_drain_bytes: int) -> bool:
+    """
+    Release the response's connection back to the session's pool to be reused (keep-alive), or else close it.
+
+    To be reused, the connection's unread body (if any) must be drained first.
+    We only drain bodies up to `max_drain_bytes`: bigger ones (also if their unknown length turns out to be bigger) are closed instead,
+    since reading them is more expensive than opening a new connection.
+
+    Return True if the connection was released, False if it was closed.
+    """
+    try:
+        if not response.content.at_eof():
+            if not is_content_length_less_than(response, length=max_drain_bytes + 1, allow_none_content_length=True):
+                response.close()
+                return False
+
+            drained_bytes = 0
+            async for chunk in response.content.iter_chunked(_DRAIN_CHUNK_SIZE):
+                drained_bytes += len(chunk)
+                if drained_bytes > max_drain_bytes:
+                    response.close()
+                    return False
+
+        response.release()
+        return True
+
+    except Exception:
+        # e.g. the connection was lost or timed out while draining
+        response.close()
+        return False
+
+
 _A = TypeVar("_A")
 
 
 # MAYBE #1 (2023-07-08) improve with real async mapping
 async def async_itr_to_list(x: AsyncIterator[_A]) -> list[_A]:
     return [result async for result in x]
+
+
+async def cancel_and_wait(task: asyncio.Task) -> None:
+    """Cancel the task and wait until it's done (i.e. until it has handled its cancellation)."""
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
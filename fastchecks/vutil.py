@@ -47,6 +47,14 @@ def validated_is_positive_int(val: int) -> int:
     return val
 
 
+def validated_choice(name: str, val: str, choices: tuple[str, ...]) -> str:
+    """
+    Validate that the given value is one of the given choices, and return it if it is, otherwise raise ValueError.
+    """
+    require(val in choices, f"{name} must be one of: {', '.join(choices)} (got: {val})")
+    return val
+
+
 def validated_in_range(name: str, val: Number, min: Number, max: Number) -> Number:
     """
     Validate that the given value is between the given min and max, and return it if it is, otherwise raise ValueError.
@@ -0,0 +1,153 @@
+#
+# Supervisor of worker processes, each running its own shard of the checks (see `sharding.Shard`).
+#
+
+import asyncio
+import signal
+import sys
+import time
+from typing import Sequence
+
+from fastchecks import require
+from fastchecks.log import MAIN_LOGGER as logging
+
+
+class WorkersSupervisor:
+    """
+    Run `num_workers` worker processes until stopped, each running the checks of its own shard in its own event loop
+    (with its own HTTP session and database pool), so that all CPU cores can be used.
+
+    Each worker runs the CLI command `argv` (i.e. `python -m fastchecks.cli <argv>`, which must end with the `check_all_loop_fg` command and its options),
+    with the options `--workers 1 --shard INDEX/NUM_WORKERS` appended.
+
+    A worker that exits while not stopping (e.g. it crashed) is restarted, after a delay that doubles on each consecutive restart (up to `max_restart_delay_seconds`).
+
+    The number of workers can be changed while running with `resize` (or, on unix, with the signals SIGTTIN & SIGTTOU to add or remove a worker);
+    all workers are then restarted with the new shards. Thanks to the consistent hashing of the shards, most checks stay in the same worker.
+
+    On SIGINT (e.g. Ctrl+C) or SIGTERM (e.g. by a process manager on a deploy), the supervisor stops, and so the workers stop gracefully.
+    """
+
+    def __init__(
+        self,
+        argv: Sequence[str],
+        num_workers: int,
+        restart_delay_seconds: float = 1.0,
+        max_restart_delay_seconds: float = 60.0,
+        stop_timeout_seconds: float = 10.0,
+    ) -> None:
+        require(num_workers > 0, f"The number of workers must be positive: {num_workers}")
+
+        self.argv = list(argv)
+        self.num_workers = num_workers
+        self.restart_delay_seconds = restart_delay_seconds
+        self.max_restart_delay_seconds = max_restart_delay_seconds
+        self.stop_timeout_seconds = stop_timeout_seconds
+
+        self.restarts = 0
+        """Total number of restarted workers (excluding the restarts because of a resize)"""
+        self._procs: dict[int, asyncio.subprocess.Process] = {}
+        self._changed = asyncio.Event()
+        self._stopped = False
+
+    def worker_command(self, index: int) -> list[str]:
+        return [
+            sys.executable,
+            "-m",
+            "fastchecks.cli",
+            *self.argv,
+            "--workers",
+            "1",
+            "--shard",
+            f"{index}/{self.num_workers}",
+        ]
+
+    def resize(self, num_workers: int) -> None:
+        require(num_workers > 0, f"The number of workers must be positive: {num_workers}")
+
+        if num_workers != self.num_workers:
+            logging.info(f"Resizing workers: {self.num_workers} -> {num_workers}")
+            self.num_workers = num_workers
+            self._changed.set()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._changed.set()
+
+    async def run_until_stopped(self) -> None:
+        """
+        Run the workers until `stop` is called (or the task is cancelled); the workers are then interrupted (as with Ctrl+C),
+        so that they stop gracefully, and killed if they did not exit within `stop_timeout_seconds`.
+        """
+        self._stopped = False
+        self._add_signal_handlers()
+
+        try:
+            while not self._stopped:
+                self._changed.clear()
+                supervisors = [asyncio.create_task(self._supervise(i)) for i in range(self.num_workers)]
+                try:
+                    await self._changed.wait()
+                finally:
+                    for supervisor in supervisors:
+                        supervisor.cancel()
+                    await asyncio.gather(*supervisors, return_exceptions=True)
+                    await self._stop_procs()
+        finally:
+            self._remove_signal_handlers()
+
+    async def _supervise(self, index: int) -> None:
+        delay = self.restart_delay_seconds
+
+        while True:
+            start = time.monotonic()
+            # In its own process group, so that a Ctrl+C (SIGINT to the terminal's foreground group) is only received by the supervisor,
+            # which forwards it once to the workers (a second SIGINT would interrupt their shutdown)
+            proc = await asyncio.create_subprocess_exec(*self.worker_command(index), process_group=0)
+            self._procs[index] = proc
+            logging.info(f"Started worker {index}/{self.num_workers} (pid: {proc.pid})")
+
+            returncode = await proc.wait()
+            del self._procs[index]
+
+            if time.monotonic() - start > self.max_restart_delay_seconds:
+                # It was running fine for a while: restart it promptly
+                delay = self.restart_delay_seconds
+
+            logging.error(f"Worker {index}/{self.num_workers} exited with code {returncode}; restarting it in {delay}s")
+            self.restarts += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_restart_delay_seconds)
+
+    async def _stop_procs(self) -> None:
+        procs = list(self._procs.values())
+        self._procs.clear()
+
+        for proc in procs:
+            if proc.returncode is None:
+                proc.send_signal(signal.SIGINT)
+
+        try:
+            async with asyncio.timeout(self.stop_timeout_seconds):
+                await asyncio.gather(*(proc.wait() for proc in procs))
+        except TimeoutError:
+            for proc in procs:
+                if proc.returncode is None:
+                    logging.warning(f"Killing worker (pid: {proc.pid}) since it did not stop in time")
+                    proc.kill()
+            await asyncio.gather(*(proc.wait() for proc in procs))
+
+    def _add_signal_handlers(self) -> None:
+        # Note: not available on Windows
+        if hasattr(signal, "SIGTTIN"):
+            loop = asyncio.get_running_loop()
+            loop.add_signal_handler(signal.SIGTTIN, lambda: self.resize(self.num_workers + 1))
+            loop.add_signal_handler(signal.SIGTTOU, lambda: self.resize(max(self.num_workers - 1, 1)))
+            loop.add_signal_handler(signal.SIGINT, self.stop)
+            loop.add_signal_handler(signal.SIGTERM, self.stop)
+
+    def _remove_signal_handlers(self) -> None:
+        if hasattr(signal, "SIGTTIN"):
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGTTIN, signal.SIGTTOU, signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(sig)
@@ -1,6 +1,8 @@
+from typing import AsyncIterator
+
 import aiohttp
 import pytest
-from fastchecks.check import check_website
+from fastchecks.check import check_website, search_pattern_in_chunks, search_patterns_in_chunks
 from fastchecks.types import WebsiteCheck
 
 
@@ -82,3 +84,98 @@ async def test_wont_read_binary_response_bodies():
         assert not result.is_success()
         assert result.is_response_ok()
         assert result.regex_match == None
+
+
+# -----------------------------------------------------------------------------
+
+
+async def gen_chunks(text: str, chunk_size: int, encoding: str = "utf-8") -> AsyncIterator[bytes]:
+    content = text.encode(encoding)
+    for i in range(0, len(content), chunk_size):
+        yield content[i : i + chunk_size]
+
+
+@pytest.mark.asyncio
+async def test_search_pattern_in_chunks_finds_matches_spanning_chunks():
+    text = "x" * 100 + "Example Domain" + "." + "y" * 100
+
+    for chunk_size in [1, 3, 7, 50, 107, 1000]:
+        ret = await search_pattern_in_chunks(
+            "Example D[a-z]+", gen_chunks(text, chunk_size), encoding="utf-8", max_bytes=10000, overlap_chars=20
+        )
+        assert ret == "Example Domain", chunk_size
+
+        # Matches longer than the overlap are still found, but the matched string might be truncated
+        ret = await search_pattern_in_chunks(
+            "x+", gen_chunks(text, chunk_size), encoding="utf-8", max_bytes=10000, overlap_chars=20
+        )
+        assert isinstance(ret, str) and len(ret) > 0, chunk_size
+
+
+@pytest.mark.asyncio
+async def test_search_pattern_in_chunks_decodes_multibyte_chars_split_between_chunks():
+    text = "ñ" * 50 + "¡Olé!" + "ñ" * 50
+
+    for chunk_size in [1, 3, 10]:
+        ret = await search_pattern_in_chunks(
+            "¡Ol.!", gen_chunks(text, chunk_size), encoding="utf-8", max_bytes=10000, overlap_chars=10
+        )
+        assert ret == "¡Olé!", chunk_size
+
+
+@pytest.mark.asyncio
+async def test_search_pattern_in_chunks_returns_false_if_no_match():
+    ret = await search_pattern_in_chunks(
+        "Not in the text", gen_chunks("a" * 1000, 64), encoding="utf-8", max_bytes=10000, overlap_chars=20
+    )
+    assert ret is False
+
+
+@pytest.mark.asyncio
+async def test_search_pattern_in_chunks_keeps_anchors_semantics():
+    text = "abc" * 100
+
+    for chunk_size in [1, 4, 50]:
+        # Neither the start nor the end of a chunk are the start or the end of the text
+        assert await search_pattern_in_chunks("^bc", gen_chunks(text, chunk_size), "utf-8", 10000, 10) is False
+        assert await search_pattern_in_chunks("ab$", gen_chunks(text, chunk_size), "utf-8", 10000, 10) is False
+        assert await search_pattern_in_chunks("\\bbc", gen_chunks(text, chunk_size), "utf-8", 10000, 10) is False
+        #
+        assert await search_pattern_in_chunks("^abc", gen_chunks(text, chunk_size), "utf-8", 10000, 10) == "abc"
+        assert await search_pattern_in_chunks("bc$", gen_chunks(text, chunk_size), "utf-8", 10000, 10) == "bc"
+
+
+@pytest.mark.asyncio
+async def test_search_pattern_in_chunks_stops_reading_after_max_bytes():
+    text = "a" * 1000 + "Example Domain"
+
+    assert await search_pattern_in_chunks("Example", gen_chunks(text, 100), "utf-8", max_bytes=500) is None
+    assert await search_pattern_in_chunks("a+", gen_chunks(text, 100), "utf-8", max_bytes=500) is not None
+
+
+@pytest.mark.asyncio
+async def test_search_patterns_in_chunks_matches_all_regexes_in_one_read():
+    text = "x" * 100 + "Example Domain" + "." + "y" * 100 + "The End"
+
+    for chunk_size in [1, 7, 50, 1000]:
+        ret = await search_patterns_in_chunks(
+            ["Example D[a-z]+", "y{3}", "^x", "Not in the text", "End$"],
+            gen_chunks(text, chunk_size),
+            encoding="utf-8",
+            max_bytes=10000,
+            overlap_chars=20,
+        )
+        assert ret == ["Example Domain", "yyy", "x", False, "End"], chunk_size
+
+    # The reading stops once all regexes matched (i.e. before reaching max_bytes)
+    for chunk_size in [1, 7, 50]:
+        ret = await search_patterns_in_chunks(
+            ["Example D[a-z]+", "x{3}"], gen_chunks(text, chunk_size), encoding="utf-8", max_bytes=200, overlap_chars=20
+        )
+        assert ret == ["Example Domain", "xxx"], chunk_size
+
+    # Stopped reading before the end, so some regexes could not be tested
+    ret = await search_patterns_in_chunks(
+        ["Example D[a-z]+", "The End"], gen_chunks(text, 10), encoding="utf-8", max_bytes=150, overlap_chars=20
+    )
+    assert ret == ["Example Domain", None]
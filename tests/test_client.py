@@ -0,0 +1,28 @@
+import pytest
+
+from fastchecks import conf
+from fastchecks.client import ConnectorSettings
+
+
+@pytest.mark.asyncio
+async def test_connector_settings_default_to_conf():
+    connector = ConnectorSettings().new_connector()
+    try:
+        assert connector.limit == conf.CONNECTOR_LIMIT
+        assert connector.limit_per_host == conf.CONNECTOR_LIMIT_PER_HOST
+        assert connector.use_dns_cache
+    finally:
+        await connector.close()
+
+
+@pytest.mark.asyncio
+async def test_connector_settings_override_conf():
+    connector = ConnectorSettings(limit=10, limit_per_host=2, dns_cache_ttl_seconds=60).new_connector()
+    try:
+        assert connector.limit == 10
+        assert connector.limit_per_host == 2
+    finally:
+        await connector.close()
+
+    with pytest.raises(ValueError):
+        ConnectorSettings(limit=-1)
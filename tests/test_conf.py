@@ -1,3 +1,7 @@
+import os
+import subprocess
+import sys
+
 import pytest
 from fastchecks import conf
 
@@ -15,3 +19,20 @@ def test_get_postgres_conninfo_means_the_envar_is_defined_or_exception_is_raised
         assert value == conf._POSTGRES_CONNINFO
     except ValueError:
         assert conf._POSTGRES_CONNINFO is None
+
+
+@pytest.mark.parametrize(
+    "envar_name",
+    ["FC_SCHEDULER", "FC_OVERRUN_POLICY", "FC_RESULTS_PARTITION_PERIOD", "FC_EVENT_LOOP", "FC_DNS_RESOLVER"],
+)
+def test_choice_envars_are_validated_when_loaded(envar_name):
+    # In a new process, not to reload the conf of the other tests
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import fastchecks.conf"],
+        env={**os.environ, envar_name: "unknown"},
+        capture_output=True,
+        text=True,
+    )
+
+    assert loaded.returncode != 0
+    assert f"{envar_name} must be one of" in loaded.stderr
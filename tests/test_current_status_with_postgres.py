@@ -0,0 +1,115 @@
+import asyncio
+import datetime
+
+import psycopg
+import pytest
+import pytest_asyncio
+from psycopg import sql
+
+from fastchecks.runner import ChecksRunnerContext
+from fastchecks.sockets.postgres import CheckResultSocketPostgres
+from fastchecks.types import CheckPhaseTimes, CheckResult, WebsiteCheck
+from fastchecks.util import async_itr_to_list, get_utcnow
+from tests import tconf
+
+TEST_DBNAME: str
+TEST_CONNINFO: str
+
+NOW = get_utcnow().replace(microsecond=0)
+
+
+@pytest.fixture(scope="module")
+def event_loop():
+    loop = asyncio.get_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def setup_module():
+    global TEST_DBNAME, TEST_CONNINFO
+
+    (TEST_DBNAME, TEST_CONNINFO) = tconf.gen_new_test_postgres_conninfo()
+
+    with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+        conn.execute(
+            sql.SQL("CREATE DATABASE {} ENCODING 'UTF8' TEMPLATE template0").format(sql.Identifier(TEST_DBNAME))
+        )
+
+    async with await ChecksRunnerContext.with_single_datastore_postgres(TEST_CONNINFO, auto_init=True):
+        pass
+
+    yield "initialized"
+
+    with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+        conn.execute(sql.SQL("DROP DATABASE {} WITH (FORCE)").format(sql.Identifier(TEST_DBNAME)))
+
+
+def _up(url: str, seconds_ago: int) -> CheckResult:
+    return CheckResult.response(
+        WebsiteCheck.with_validation(url, regex="ok", extra_regexes=["fine"]),
+        NOW - datetime.timedelta(seconds=seconds_ago),
+        response_time=0.1,
+        response_status=200,
+        regex_match=True,
+        extra_regex_matches=[True],
+        phase_times=CheckPhaseTimes(ttfb=0.05),
+    )
+
+
+def _down(url: str, seconds_ago: int) -> CheckResult:
+    return CheckResult.failure(
+        WebsiteCheck.with_validation(url), NOW - datetime.timedelta(seconds=seconds_ago), 10.0, timeout_error=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_current_status_is_the_latest_result_of_each_url(setup_module):
+    global TEST_CONNINFO
+
+    async with CheckResultSocketPostgres(TEST_CONNINFO) as results:
+        await results.write(_down("http://127.0.0.1:1/b", 60))
+        # Several results of the same URL in the same batch
+        await results.write_many(
+            [_up("http://127.0.0.1:1/b", 10), _up("http://127.0.0.1:1/a", 30), _down("http://127.0.0.1:1/a", 20)]
+        )
+        # Written late, but older than the current status
+        await results.write(_up("http://127.0.0.1:1/a", 40))
+
+        current = await async_itr_to_list(results.read_current_status())
+        assert current == [_down("http://127.0.0.1:1/a", 20), _up("http://127.0.0.1:1/b", 10)]
+        assert [result.is_success() for result in current] == [False, True]
+
+        # The same as the last result per URL
+        assert await async_itr_to_list(results.read_last_n_per_url(1)) == current
+        assert len(await async_itr_to_list(results.read_last_n_per_url(2))) == 4
+
+        # Only of the results started after `since`
+        since = NOW - datetime.timedelta(seconds=35)
+        assert [
+            (r.check.url, r.timestamp_start) for r in await async_itr_to_list(results.read_last_n_per_url(2, since))
+        ] == [
+            ("http://127.0.0.1:1/a", NOW - datetime.timedelta(seconds=20)),
+            ("http://127.0.0.1:1/a", NOW - datetime.timedelta(seconds=30)),
+            ("http://127.0.0.1:1/b", NOW - datetime.timedelta(seconds=10)),
+        ]
+        assert await async_itr_to_list(results.read_last_n_per_url(1, NOW - datetime.timedelta(seconds=15))) == [
+            _up("http://127.0.0.1:1/b", 10)
+        ]
+
+
+@pytest.mark.asyncio
+async def test_expired_current_status_is_deleted(setup_module):
+    global TEST_CONNINFO
+
+    async with CheckResultSocketPostgres(TEST_CONNINFO, retention_days=1) as results:
+        # Long not checked
+        await results.write(_up("http://127.0.0.1:1/c", 3 * 24 * 3600))
+        assert len(await async_itr_to_list(results.read_current_status())) == 3
+
+        await results.drop_expired_partitions()
+
+        assert [result.check.url for result in await async_itr_to_list(results.read_current_status())] == [
+            "http://127.0.0.1:1/a",
+            "http://127.0.0.1:1/b",
+        ]
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from fastchecks import runner
+from fastchecks.types import WebsiteCheckScheduled
+from tests.test_shutdown import CHECKS, InMemoryWebsiteCheckSocket, SlowChecksRunnerContext
+
+
+class FlakyClaimingWebsiteCheckSocket(InMemoryWebsiteCheckSocket):
+    """Its first `num_failures` claims fail (e.g. the data store is restarting); the others claim each check once."""
+
+    def __init__(self, checks: list[WebsiteCheckScheduled], num_failures: int) -> None:
+        super().__init__(checks)
+        self.num_failures = num_failures
+        self.num_claims = 0
+        self.unclaimed = list(checks)
+
+    async def claim_due(self, n: int, default_interval_seconds: int) -> list[WebsiteCheckScheduled]:
+        self.num_claims += 1
+        if self.num_failures > 0:
+            self.num_failures -= 1
+            raise ConnectionError("Simulated connection failure")
+
+        claimed, self.unclaimed = self.unclaimed[:n], self.unclaimed[n:]
+        return claimed
+
+
+@pytest.mark.asyncio
+async def test_distributed_scheduler_keeps_claiming_after_a_failed_claim(monkeypatch):
+    monkeypatch.setattr(runner, "_CLAIM_MIN_RETRY_SECONDS", 0.01)
+
+    async with SlowChecksRunnerContext(check_seconds=0) as ctx:
+        checks = FlakyClaimingWebsiteCheckSocket(CHECKS, num_failures=1)
+        ctx.checks = checks
+
+        running = asyncio.create_task(
+            ctx.run_checks_until_stopped_in_foreground(
+                scheduler="distributed", poll_interval_seconds=0.01, drain_timeout_seconds=5
+            )
+        )
+        async with asyncio.timeout(5):
+            while len(ctx.results.results) < len(CHECKS):
+                await asyncio.sleep(0.01)
+
+        # Retried after the failed claim, without stopping the runner
+        assert checks.num_claims >= 2
+        assert not running.done()
+
+        ctx.stop()
+        async with asyncio.timeout(2):
+            await running
+
+        assert sorted(r.check.url for r in ctx.results.results) == sorted(check.url for check in CHECKS)
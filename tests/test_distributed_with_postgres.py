@@ -0,0 +1,117 @@
+import asyncio
+import os
+import signal
+import sys
+from collections import Counter
+
+import psycopg
+import pytest
+import pytest_asyncio
+from psycopg import sql
+
+from fastchecks import conf
+from fastchecks.runner import ChecksRunnerContext
+from fastchecks.types import WebsiteCheck, WebsiteCheckScheduled
+from fastchecks.util import PRACTICAL_MAX_INT, async_itr_to_list
+from tests import tconf
+
+TEST_DBNAME: str
+TEST_CONNINFO: str
+
+# Allow minimum of 1 interval second for tests for speed
+conf.MIN_INTERVAL_SECONDS = 1
+
+# Unreachable (connection refused) local urls, so that the checks are quick and need no network
+URLS = [f"http://127.0.0.1:1/check{i}" for i in range(20)]
+
+
+@pytest.fixture(scope="module")
+def event_loop():
+    loop = asyncio.get_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def setup_module():
+    global TEST_DBNAME, TEST_CONNINFO
+
+    (TEST_DBNAME, TEST_CONNINFO) = tconf.gen_new_test_postgres_conninfo()
+
+    with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+        conn.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(TEST_DBNAME)))
+
+    async with await ChecksRunnerContext.with_single_datastore_postgres(TEST_CONNINFO, auto_init=True) as ctx:
+        for url in URLS:
+            await ctx.checks.upsert(
+                WebsiteCheckScheduled.with_check(WebsiteCheck.with_validation(url), interval_seconds=1)
+            )
+
+    yield "initialized"
+
+    with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+        conn.execute(sql.SQL("DROP DATABASE {} WITH (FORCE)").format(sql.Identifier(TEST_DBNAME)))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_claims_are_disjoint_and_expire(setup_module):
+    global TEST_CONNINFO
+
+    nodes = [await ChecksRunnerContext.with_single_datastore_postgres(TEST_CONNINFO, auto_init=False) for _ in range(3)]
+
+    try:
+        # Each node claims up to 10 (30 in total) of the 20 due checks at the same time
+        claims = await asyncio.gather(*(node.checks.claim_due(10, 60) for node in nodes))
+        claimed_urls = [check.url for claim in claims for check in claim]
+        assert sorted(claimed_urls) == sorted(URLS)
+
+        # The claimed checks are no longer due
+        assert await nodes[0].checks.claim_due(10, 60) == []
+
+        # The claimed checks were not run (e.g. their nodes died), but they are due again after their interval
+        await asyncio.sleep(1.1)
+        claimed_again = await nodes[0].checks.claim_due(100, 60)
+        assert sorted(check.url for check in claimed_again) == sorted(URLS)
+
+    finally:
+        for node in nodes:
+            await node.close()
+
+
+@pytest.mark.asyncio
+async def test_several_runner_processes_share_the_checks(setup_module):
+    global TEST_CONNINFO
+
+    run_seconds = 5
+
+    runners = [
+        await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "fastchecks.cli",
+            "--pg_conninfo",
+            TEST_CONNINFO,
+            "check_all_loop_fg",
+            "--scheduler",
+            "distributed",
+            "--poll_interval",
+            "0.1",
+            stdout=asyncio.subprocess.DEVNULL,
+            env={**os.environ, "FC_MIN_INTERVAL_SECONDS": str(conf.MIN_INTERVAL_SECONDS)},
+        )
+        for _ in range(2)
+    ]
+
+    await asyncio.sleep(run_seconds)
+    for runner in runners:
+        runner.send_signal(signal.SIGINT)
+    assert [await runner.wait() for runner in runners] == [0, 0]
+
+    async with await ChecksRunnerContext.with_single_datastore_postgres(TEST_CONNINFO, auto_init=False) as ctx:
+        results = await async_itr_to_list(ctx.results.read_last_n(PRACTICAL_MAX_INT))
+
+    counts = Counter(result.check.url for result in results)
+    assert set(counts) == set(URLS)
+    assert all(result.host_error for result in results)
+    # Each check ran at most once per interval (1s), i.e. the runners did not both run it
+    assert max(counts.values()) <= run_seconds + 1, counts
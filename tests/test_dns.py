@@ -0,0 +1,68 @@
+import asyncio
+import socket
+
+import pytest
+
+from fastchecks.dns import TTLCachingResolver, new_dns_resolver
+
+
+def test_new_dns_resolver():
+    assert new_dns_resolver("default") is None
+
+    with pytest.raises(ValueError):
+        new_dns_resolver("unknown")
+
+
+@pytest.mark.asyncio
+async def test_ttl_caching_resolver_caches_and_shares_queries():
+    pytest.importorskip("aiodns")
+
+    resolver = TTLCachingResolver(min_ttl_seconds=60)
+    try:
+        assert resolver.clamped_ttl(0) == 60
+        assert resolver.clamped_ttl(7200) == 3600
+
+        # Concurrent resolutions of the same host share the same query
+        hosts1, hosts2 = await asyncio.gather(resolver.resolve("localhost"), resolver.resolve("localhost"))
+        assert hosts1 == hosts2
+        assert all(host["hostname"] == "localhost" for host in hosts1)
+        assert resolver.misses == 1 and resolver.hits == 1
+
+        # Cached
+        assert await resolver.resolve("localhost") == hosts1
+        assert resolver.misses == 1 and resolver.hits == 2
+
+        resolver.clear()
+        await resolver.resolve("localhost")
+        assert resolver.misses == 2
+    finally:
+        await resolver.close()
+
+
+@pytest.mark.asyncio
+async def test_ttl_caching_resolver_evicts_the_least_recently_used_and_expired_hosts():
+    pytest.importorskip("aiodns")
+
+    resolver = TTLCachingResolver(min_ttl_seconds=60, max_cached_hosts=2)
+    try:
+        # Different ports are cached apart
+        await resolver.resolve("localhost", 1)
+        await resolver.resolve("localhost", 2)
+        await resolver.resolve("localhost", 1)
+        await resolver.resolve("localhost", 3)
+        assert len(resolver._cache) == 2 and resolver.misses == 3 and resolver.hits == 1
+
+        # Port 2 was the least recently used
+        await resolver.resolve("localhost", 1)
+        await resolver.resolve("localhost", 2)
+        assert resolver.misses == 4 and resolver.hits == 2
+
+        # Expired: removed when looked up, and resolved again
+        resolver._cache[("localhost", 2, socket.AF_INET)] = (0, [])
+        assert len(await resolver.resolve("localhost", 2)) > 0
+        assert len(resolver._cache) == 2 and resolver.misses == 5
+    finally:
+        await resolver.close()
+
+    with pytest.raises(ValueError):
+        TTLCachingResolver(max_cached_hosts=0)
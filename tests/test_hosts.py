@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import pytest
+
+from fastchecks.hosts import HostLimiter
+
+
+async def run_requests(limiter: HostLimiter, urls: list[str], duration: float = 0.05) -> dict[str, int]:
+    """Return the maximum number of simultaneous requests per host."""
+    in_flight: dict[str, int] = {}
+    max_in_flight: dict[str, int] = {}
+
+    async def request(url: str) -> None:
+        host = HostLimiter.host_of(url)
+        async with limiter.slot(url):
+            in_flight[host] = in_flight.get(host, 0) + 1
+            max_in_flight[host] = max(max_in_flight.get(host, 0), in_flight[host])
+            await asyncio.sleep(duration)
+            in_flight[host] -= 1
+
+    await asyncio.gather(*(request(url) for url in urls))
+    return max_in_flight
+
+
+def test_host_of():
+    assert HostLimiter.host_of("https://Example.org:8080/path?q=1") == "example.org"
+
+
+@pytest.mark.asyncio
+async def test_host_limiter_limits_concurrency_per_host():
+    limiter = HostLimiter(max_concurrency=2, min_spacing_seconds=0)
+
+    urls = [f"https://example.org/{i}" for i in range(5)] + [f"https://python.org/{i}" for i in range(3)]
+    max_in_flight = await run_requests(limiter, urls)
+
+    assert max_in_flight == {"example.org": 2, "python.org": 2}
+
+
+@pytest.mark.asyncio
+async def test_host_limiter_spaces_the_requests_of_the_same_host():
+    limiter = HostLimiter(max_concurrency=0, min_spacing_seconds=0.05)
+
+    start = time.monotonic()
+    max_in_flight = await run_requests(limiter, [f"https://example.org/{i}" for i in range(4)], duration=0)
+    elapsed = time.monotonic() - start
+
+    assert max_in_flight == {"example.org": 1}
+    # The 1st request starts immediately, the next 3 are spaced
+    assert elapsed >= 3 * 0.05
+
+    start = time.monotonic()
+    await run_requests(limiter, ["https://python.org/", "https://python.org/"], duration=0)
+    assert time.monotonic() - start < 0.1
+
+
+@pytest.mark.asyncio
+async def test_host_limiter_evicts_the_idle_hosts():
+    limiter = HostLimiter(max_concurrency=1, min_spacing_seconds=0.1)
+
+    await run_requests(limiter, [f"https://host{i}.org/" for i in range(10)], duration=0)
+    # Kept while their spacing is not over
+    assert len(limiter._hosts) == 10
+
+    await asyncio.sleep(0.15)
+    assert len(limiter._hosts) == 0
+
+    # The next requests are not affected
+    max_in_flight = await run_requests(limiter, ["https://example.org/"] * 3)
+    assert max_in_flight == {"example.org": 1}
+
+
+def test_host_limiter_requires_valid_limits():
+    with pytest.raises(ValueError):
+        HostLimiter(max_concurrency=-1, min_spacing_seconds=0)
+    with pytest.raises(ValueError):
+        HostLimiter(max_concurrency=1, min_spacing_seconds=-1)
@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import psycopg
+import pytest
+import pytest_asyncio
+from psycopg import sql
+
+from fastchecks import cli
+from fastchecks.runner import ChecksRunnerContext
+from fastchecks.types import WebsiteCheck, WebsiteCheckScheduled
+from fastchecks.util import async_itr_to_list
+from tests import tconf
+
+TEST_DBNAME: str
+TEST_CONNINFO: str
+
+
+def gen_check(i: int, interval_seconds: int | None = 60) -> WebsiteCheckScheduled:
+    return WebsiteCheckScheduled.with_check(
+        WebsiteCheck.with_validation(f"https://example.org/{i}", "Example D[a-z]+", ["domain"]), interval_seconds
+    )
+
+
+@pytest.fixture(scope="module")
+def event_loop():
+    loop = asyncio.get_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def setup_module():
+    global TEST_DBNAME, TEST_CONNINFO
+
+    (TEST_DBNAME, TEST_CONNINFO) = tconf.gen_new_test_postgres_conninfo()
+
+    with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+        conn.execute(
+            sql.SQL("CREATE DATABASE {} ENCODING 'UTF8' TEMPLATE template0").format(sql.Identifier(TEST_DBNAME))
+        )
+
+    async with await ChecksRunnerContext.with_single_datastore_postgres(TEST_CONNINFO, auto_init=True):
+        pass
+
+    yield "initialized"
+
+    with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+        conn.execute(sql.SQL("DROP DATABASE {} WITH (FORCE)").format(sql.Identifier(TEST_DBNAME)))
+
+
+@pytest.mark.asyncio
+async def test_upsert_many_counts_the_inserted_and_updated_checks(setup_module):
+    global TEST_CONNINFO
+
+    async with await ChecksRunnerContext.with_single_datastore_postgres(TEST_CONNINFO, auto_init=False) as ctx:
+        assert await ctx.checks.upsert_many([gen_check(i) for i in range(3)]) == (3, 0)
+
+        # 1 unchanged, 1 updated (the last one of the same url wins), 1 inserted
+        assert await ctx.checks.upsert_many([gen_check(0), gen_check(1), gen_check(1, None), gen_check(3)]) == (1, 1)
+        assert await ctx.checks.read(gen_check(1).url) == gen_check(1, None)
+
+        assert await ctx.checks.upsert_many([]) == (0, 0)
+        assert len(await async_itr_to_list(await ctx.checks.read_all())) == 4
+
+        await ctx.checks.delete_all(confirm=True)
+
+
+@pytest.mark.asyncio
+async def test_import_checks_cli(setup_module, tmp_path, capsys):
+    global TEST_CONNINFO
+
+    path = tmp_path / "checks.jsonl"
+    lines = [gen_check(i).model_dump_json() for i in range(5)] + [json.dumps({"url": "nope"})]
+    path.write_text("\n".join(lines))
+
+    await cli.run_seq(["--pg_conninfo", TEST_CONNINFO, "import_checks", str(path), "--batch_size", "2"])
+    assert "inserted=5 updated=0 unchanged=0 invalid=1" in capsys.readouterr().out
+
+    await cli.run_seq(["--pg_conninfo", TEST_CONNINFO, "import_checks", str(path)])
+    assert "inserted=0 updated=0 unchanged=5 invalid=1" in capsys.readouterr().out
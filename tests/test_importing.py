@@ -0,0 +1,61 @@
+import pytest
+
+from fastchecks.importing import format_of, import_checks, read_rows, validated_check
+from fastchecks.types import WebsiteCheck, WebsiteCheckScheduled
+from tests.test_shutdown import InMemoryWebsiteCheckSocket
+
+CSV = """url,regex,extra_regexes,interval_seconds
+https://example.org,Example D[a-z]+,"[""domain""]",60
+https://python.org,,,
+not a url,,,
+https://example.com,(unclosed,,
+https://example.net,,,1000000
+"""
+
+JSONL = """{"url": "https://example.org", "regex": "Example D[a-z]+", "extra_regexes": ["domain"], "interval_seconds": 60}
+
+{"url": "https://python.org"}
+{"url": "https://example.com", "regexp": "typo"}
+not json
+["https://example.net"]
+"""
+
+EXAMPLE_ORG = WebsiteCheckScheduled.with_check(
+    WebsiteCheck.with_validation("https://example.org", "Example D[a-z]+", ["domain"]), interval_seconds=60
+)
+PYTHON_ORG = WebsiteCheckScheduled.with_check(WebsiteCheck.with_validation("https://python.org"), interval_seconds=None)
+
+
+def test_format_of():
+    assert format_of("checks.csv") == "csv"
+    assert format_of("/tmp/checks.JSONL") == "jsonl"
+
+    with pytest.raises(ValueError):
+        format_of("checks.txt")
+
+
+@pytest.mark.parametrize("format, content", [("csv", CSV), ("jsonl", JSONL)])
+def test_read_and_validate_rows(tmp_path, format, content):
+    path = tmp_path / f"checks.{format}"
+    path.write_text(content)
+
+    rows = list(read_rows(str(path), format))
+    assert len(rows) == 5
+
+    assert validated_check(rows[0][1]) == EXAMPLE_ORG
+    assert validated_check(rows[1][1]) == PYTHON_ORG
+
+    for _, row in rows[2:]:
+        with pytest.raises(ValueError):
+            validated_check(row)
+
+
+@pytest.mark.asyncio
+async def test_import_checks_in_batches(tmp_path):
+    path = tmp_path / "checks.jsonl"
+    path.write_text(JSONL)
+    checks = InMemoryWebsiteCheckSocket([PYTHON_ORG])
+
+    stats = await import_checks(checks, str(path), batch_size=1)
+    assert (stats.inserted, stats.updated, stats.unchanged, stats.invalid) == (1, 0, 1, 3)
+    assert checks.checks == {EXAMPLE_ORG.url: EXAMPLE_ORG, PYTHON_ORG.url: PYTHON_ORG}
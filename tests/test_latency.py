@@ -0,0 +1,71 @@
+import pytest
+
+from fastchecks.latency import AdaptiveTimeouts, percentile
+from fastchecks.types import CheckResult, WebsiteCheck
+from fastchecks.util import get_utcnow
+
+URL = "https://example.org"
+
+
+def gen_response(response_time: float, url: str = URL) -> CheckResult:
+    return CheckResult.response(
+        WebsiteCheck.with_validation(url), get_utcnow(), response_time, response_status=200, regex_match=None
+    )
+
+
+def gen_failure(response_time: float, timeout_error: bool = False, host_error: bool = False) -> CheckResult:
+    return CheckResult.failure(
+        WebsiteCheck.with_validation(URL),
+        get_utcnow(),
+        response_time,
+        timeout_error=timeout_error,
+        host_error=host_error,
+    )
+
+
+def test_percentile():
+    assert percentile([1.0], 99) == 1.0
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 0) == 1.0
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 50) == 3.0
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 100) == 5.0
+    assert percentile([1.0, 2.0], 50) == 1.5
+
+
+def test_adaptive_timeouts():
+    timeouts = AdaptiveTimeouts(percentile=50, multiplier=2, min_seconds=0.5, max_seconds=10, window=4, min_samples=2)
+
+    # Not enough samples yet
+    assert timeouts.timeout(URL) == 10
+    timeouts.observe(gen_response(1.0))
+    assert timeouts.timeout(URL) == 10
+
+    timeouts.observe(gen_response(2.0))
+    assert timeouts.timeout(URL) == 3.0
+
+    # Unreachable hosts say nothing about the latency
+    timeouts.observe(gen_failure(0.01, host_error=True))
+    assert timeouts.timeout(URL) == 3.0
+
+    # Clamped to the min
+    timeouts.observe_all([gen_response(0.1)] * 4)
+    assert timeouts.timeout(URL) == 0.5
+
+    # Timeouts count, so repeated timeouts grow the timeout up to the max
+    timeouts.observe_all([gen_failure(0.5, timeout_error=True)] * 3)
+    assert timeouts.timeout(URL) == 1.0
+    timeouts.observe_all([gen_failure(8.0, timeout_error=True)] * 3)
+    assert timeouts.timeout(URL) == 10
+
+    # Other URLs are independent
+    assert timeouts.timeout("https://python.org") == 10
+
+
+@pytest.mark.asyncio
+async def test_adaptive_timeouts_seed_keeps_the_most_recent_results():
+    async def results_most_recent_first():
+        for response_time in [1.0, 1.0, 9.0, 9.0]:
+            yield gen_response(response_time)
+
+    timeouts = AdaptiveTimeouts(percentile=100, multiplier=1, min_seconds=0.1, max_seconds=10, window=2, min_samples=2)
+    assert await timeouts.seed(results_most_recent_first()) == 4
+    assert timeouts.timeout(URL) == 1.0
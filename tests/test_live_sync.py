@@ -0,0 +1,81 @@
+import asyncio
+import contextlib
+from typing import AsyncIterator
+
+import pytest
+
+from fastchecks import runner
+from fastchecks.types import WebsiteCheck, WebsiteCheckChange, WebsiteCheckScheduled
+from tests.test_shutdown import CHECKS, InMemoryWebsiteCheckSocket, SlowChecksRunnerContext
+
+
+def gen_check(url: str) -> WebsiteCheckScheduled:
+    return WebsiteCheckScheduled.with_check(WebsiteCheck.with_validation(url), interval_seconds=60)
+
+
+class FlakyListeningWebsiteCheckSocket(InMemoryWebsiteCheckSocket):
+    """Its first `num_failures` listens fail right away (e.g. the data store is restarting); the others wait for changes forever."""
+
+    def __init__(self, checks: list[WebsiteCheckScheduled], num_failures: int) -> None:
+        super().__init__(checks)
+        self.num_failures = num_failures
+        self.num_listens = 0
+
+    @contextlib.asynccontextmanager
+    async def listen_changes(self) -> AsyncIterator[AsyncIterator[WebsiteCheckChange]]:
+        self.num_listens += 1
+        if self.num_failures > 0:
+            self.num_failures -= 1
+            raise ConnectionError("Simulated connection failure")
+
+        async def changes() -> AsyncIterator[WebsiteCheckChange]:
+            await asyncio.Event().wait()
+            yield WebsiteCheckChange(url=None, check=None)  # unreachable
+
+        yield changes()
+
+
+@pytest.mark.asyncio
+async def test_live_sync_listens_again_and_reconciles_when_the_changes_stop(monkeypatch):
+    monkeypatch.setattr(runner, "_LIVE_SYNC_MIN_RETRY_SECONDS", 0.01)
+
+    async with SlowChecksRunnerContext(check_seconds=0) as ctx:
+        checks = FlakyListeningWebsiteCheckSocket(CHECKS, num_failures=2)
+        ctx.checks = checks
+
+        added = gen_check("https://example.org/added_while_connected")
+        added_meanwhile = gen_check("https://example.org/added_while_disconnected")
+
+        async def changes_until_disconnected() -> AsyncIterator[WebsiteCheckChange]:
+            await checks.upsert(added)
+            yield WebsiteCheckChange(url=added.url, check=added)
+            # Changed while disconnected, so never notified
+            await checks.upsert(added_meanwhile)
+            await checks.delete(CHECKS[0].url)
+            raise ConnectionError("Simulated dropped connection")
+
+        scheduled = {check.url: check for check in CHECKS}
+        schedule_calls: list[str] = []
+        unschedule_calls: list[str] = []
+
+        async def schedule(check: WebsiteCheckScheduled) -> None:
+            schedule_calls.append(check.url)
+
+        async def unschedule(url: str) -> None:
+            unschedule_calls.append(url)
+
+        sync = asyncio.create_task(
+            ctx._sync_check_changes(changes_until_disconnected(), scheduled, schedule, unschedule)
+        )
+        try:
+            async with asyncio.timeout(5):
+                while checks.num_listens < 3 or len(scheduled) != len(checks.checks):
+                    await asyncio.sleep(0.01)
+        finally:
+            sync.cancel()
+
+        # Retried after the failed listens, and reconciled once listening again
+        assert checks.num_listens == 3
+        assert scheduled == checks.checks
+        assert schedule_calls == [added.url, added_meanwhile.url]
+        assert unschedule_calls == [CHECKS[0].url]
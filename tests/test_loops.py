@@ -0,0 +1,28 @@
+import asyncio
+import sys
+
+import pytest
+
+from fastchecks.loops import event_loop_factory
+
+
+def test_event_loop_factory():
+    assert event_loop_factory("asyncio") is asyncio.new_event_loop
+
+    with pytest.raises(ValueError):
+        event_loop_factory("unknown")
+
+
+def test_uvloop_event_loop_factory():
+    uvloop = pytest.importorskip("uvloop")
+
+    with asyncio.Runner(loop_factory=event_loop_factory("uvloop")) as runner:
+        assert isinstance(runner.get_loop(), uvloop.Loop)
+        assert runner.run(asyncio.sleep(0, result=42)) == 42
+
+
+def test_uvloop_event_loop_factory_falls_back_to_asyncio_if_not_installed(monkeypatch):
+    # Make `import uvloop` fail
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+
+    assert event_loop_factory("uvloop") is asyncio.new_event_loop
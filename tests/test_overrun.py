@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from fastchecks.overrun import OverrunGuard
+
+
+async def fire_3_times_while_in_flight(guard: OverrunGuard[int]) -> tuple[list[int | None], int]:
+    """Fire 3 times the same key, while the first run is in flight; return the results and the number of actual runs."""
+    runs = 0
+
+    async def fun() -> int:
+        nonlocal runs
+        runs += 1
+        run = runs
+        await asyncio.sleep(0.05)
+        return run
+
+    first = asyncio.create_task(guard.run("url", fun))
+    await asyncio.sleep(0.01)
+    assert guard.is_in_flight("url")
+    results = await asyncio.gather(first, guard.run("url", fun), guard.run("url", fun))
+
+    assert not guard.is_in_flight("url")
+    return list(results), runs
+
+
+@pytest.mark.asyncio
+async def test_overrun_guard_skip():
+    guard: OverrunGuard[int] = OverrunGuard("skip")
+    assert await fire_3_times_while_in_flight(guard) == ([1, None, None], 1)
+    assert guard.skipped == {"url": 2}
+
+
+@pytest.mark.asyncio
+async def test_overrun_guard_coalesce():
+    guard: OverrunGuard[int] = OverrunGuard("coalesce")
+    assert await fire_3_times_while_in_flight(guard) == ([1, 1, 1], 1)
+    assert guard.skipped == {"url": 2}
+
+
+@pytest.mark.asyncio
+async def test_overrun_guard_queue_one():
+    guard: OverrunGuard[int] = OverrunGuard("queue_one")
+    assert await fire_3_times_while_in_flight(guard) == ([1, 2, None], 2)
+    assert guard.skipped == {"url": 1}
+
+
+@pytest.mark.asyncio
+async def test_overrun_guard_keys_are_independent_and_errors_propagate():
+    guard: OverrunGuard[int] = OverrunGuard("coalesce")
+
+    async def fail() -> int:
+        await asyncio.sleep(0.01)
+        raise ValueError("Simulated failure")
+
+    async def succeed() -> int:
+        return 42
+
+    failing = asyncio.create_task(guard.run("a", fail))
+    await asyncio.sleep(0)
+    assert await guard.run("b", succeed) == 42
+
+    with pytest.raises(ValueError):
+        await asyncio.gather(failing, guard.run("a", fail))
+    assert guard.skipped == {"a": 1}
+
+    with pytest.raises(ValueError):
+        OverrunGuard("unknown")
+
+
+@pytest.mark.asyncio
+async def test_overrun_guard_newly_skipped_since_the_previous_call():
+    guard: OverrunGuard[int] = OverrunGuard("skip")
+    await fire_3_times_while_in_flight(guard)
+    assert guard.newly_skipped() == {"url": 2}
+    assert guard.newly_skipped() == {}
+
+    await fire_3_times_while_in_flight(guard)
+    assert guard.newly_skipped() == {"url": 2}
+    # The total is kept
+    assert guard.skipped == {"url": 4}
@@ -0,0 +1,22 @@
+from fastchecks.patterns import compiled_regex, compiled_regex_cache_info
+
+
+def test_compiled_regex_is_reused_from_cache():
+    compiled_regex.cache_clear()
+
+    regex1 = compiled_regex("Example D[a-z]+")
+    assert compiled_regex_cache_info().misses == 1
+    assert compiled_regex_cache_info().hits == 0
+
+    regex2 = compiled_regex("Example D[a-z]+")
+    assert regex2 is regex1
+    assert compiled_regex_cache_info().misses == 1
+    assert compiled_regex_cache_info().hits == 1
+
+    # A different (e.g. changed) regex is compiled
+    regex3 = compiled_regex("Example d[a-z]+")
+    assert regex3 is not regex1
+    assert compiled_regex_cache_info().misses == 2
+    assert compiled_regex_cache_info().currsize == 2
+
+    assert regex1.search("This is Example Domain")[0] == "Example Domain"
@@ -0,0 +1,84 @@
+import asyncio
+
+import psycopg
+import pytest
+import pytest_asyncio
+from psycopg import sql
+
+from fastchecks.runner import ChecksRunnerContext
+from fastchecks.sockets.postgres import WebsiteCheckSocketPostgres
+from fastchecks.types import WebsiteCheck, WebsiteCheckScheduled
+from fastchecks.util import async_itr_to_list
+from tests import tconf
+
+TEST_DBNAME: str
+TEST_CONNINFO: str
+
+CHECKS = [
+    WebsiteCheckScheduled.with_check(
+        WebsiteCheck.with_validation(f"http://127.0.0.1:1/check{i:02}"), interval_seconds=60
+    )
+    for i in range(25)
+]
+URLS = [check.url for check in CHECKS]
+
+
+@pytest.fixture(scope="module")
+def event_loop():
+    loop = asyncio.get_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def setup_module():
+    global TEST_DBNAME, TEST_CONNINFO
+
+    (TEST_DBNAME, TEST_CONNINFO) = tconf.gen_new_test_postgres_conninfo()
+
+    with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+        conn.execute(
+            sql.SQL("CREATE DATABASE {} ENCODING 'UTF8' TEMPLATE template0").format(sql.Identifier(TEST_DBNAME))
+        )
+
+    async with await ChecksRunnerContext.with_single_datastore_postgres(TEST_CONNINFO, auto_init=True) as ctx:
+        # Inserted out of order
+        for check in reversed(CHECKS):
+            await ctx.checks.upsert(check)
+
+    yield "initialized"
+
+    with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+        conn.execute(sql.SQL("DROP DATABASE {} WITH (FORCE)").format(sql.Identifier(TEST_DBNAME)))
+
+
+@pytest.mark.asyncio
+async def test_read_checks_in_pages_ordered_by_url(setup_module):
+    global TEST_CONNINFO
+
+    async with WebsiteCheckSocketPostgres(TEST_CONNINFO, fetch_size=10) as checks:
+        assert [check.url for check in await async_itr_to_list(await checks.read_all())] == URLS
+        assert await async_itr_to_list(checks.read_n(12)) == CHECKS[:12]
+        # Exactly a page
+        assert await async_itr_to_list(checks.read_n(10)) == CHECKS[:10]
+
+        # Resumed after a known url
+        assert await async_itr_to_list(checks.read_n(100, after_url=URLS[19])) == CHECKS[20:]
+        assert await async_itr_to_list(checks.read_n(100, after_url=URLS[-1])) == []
+
+
+@pytest.mark.asyncio
+async def test_read_checks_does_not_hold_a_connection_while_consumed(setup_module):
+    global TEST_CONNINFO
+
+    async with WebsiteCheckSocketPostgres(TEST_CONNINFO, fetch_size=10) as checks:
+        # Otherwise, the connections still being opened are not available yet
+        await checks._pool.wait()
+
+        read = 0
+        async for _ in await checks.read_all():
+            read += 1
+            # All the pool's connections are available to others meanwhile
+            assert checks._pool.get_stats().get("pool_available", 0) == checks._pool.get_stats()["pool_size"]
+
+        assert read == len(CHECKS)
@@ -0,0 +1,229 @@
+import asyncio
+import datetime
+
+import psycopg
+import pytest
+import pytest_asyncio
+from psycopg import sql
+
+from fastchecks.rollups import ROLLUP_GRAINS
+from fastchecks.runner import ChecksRunnerContext
+from fastchecks.sockets.postgres import (
+    RESULTS_PARTITIONS_AHEAD,
+    SCHEMA_VERSION,
+    CheckResultSocketPostgres,
+    common_single_pg_datastore_schema_version,
+)
+from fastchecks.types import CheckResult, WebsiteCheck
+from fastchecks.util import async_itr_to_list, get_utcnow
+from tests import tconf
+
+TEST_DBNAME: str
+TEST_CONNINFO: str
+
+OLD_DAY = datetime.datetime(2020, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def event_loop():
+    loop = asyncio.get_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def setup_module():
+    global TEST_DBNAME, TEST_CONNINFO
+
+    (TEST_DBNAME, TEST_CONNINFO) = tconf.gen_new_test_postgres_conninfo()
+
+    with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+        conn.execute(
+            sql.SQL("CREATE DATABASE {} ENCODING 'UTF8' TEMPLATE template0").format(sql.Identifier(TEST_DBNAME))
+        )
+
+    # The daily partitions are created together with the context
+    async with await ChecksRunnerContext.with_single_datastore_postgres(TEST_CONNINFO, auto_init=True):
+        pass
+
+    yield "initialized"
+
+    with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+        conn.execute(sql.SQL("DROP DATABASE {} WITH (FORCE)").format(sql.Identifier(TEST_DBNAME)))
+
+
+def _result(url: str, timestamp_start: datetime.datetime) -> CheckResult:
+    return CheckResult(
+        check=WebsiteCheck.with_validation(url),
+        timestamp_start=timestamp_start,
+        response_time=0.1,
+        timeout_error=False,
+        host_error=False,
+        other_error=False,
+        response_status=200,
+        regex_match=None,
+    )
+
+
+def _partitions_of_results() -> dict[str, int]:
+    """Return the number of results in each partition, by partition name."""
+    with psycopg.connect(TEST_CONNINFO) as conn:
+        partitions = conn.execute(
+            """
+            SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'checkresult'::regclass;"""
+        ).fetchall()
+        counts: dict[str, int] = dict(
+            conn.execute("SELECT tableoid::regclass::text, count(*) FROM CheckResult GROUP BY 1;").fetchall()
+        )
+
+    return {name: counts.get(name, 0) for (name,) in partitions}
+
+
+@pytest.mark.asyncio
+async def test_results_are_written_in_the_partition_of_their_day(setup_module):
+    global TEST_CONNINFO
+
+    today = get_utcnow().date()
+    expected_partitions = {
+        f"checkresult_p{today + datetime.timedelta(days=i):%Y%m%d}" for i in range(RESULTS_PARTITIONS_AHEAD + 1)
+    }
+    assert expected_partitions | {"checkresult_default"} == set(_partitions_of_results().keys())
+
+    async with CheckResultSocketPostgres(TEST_CONNINFO) as results:
+        # Already created
+        assert await results.create_partitions() == 0
+
+        await results.write(_result("http://127.0.0.1:1/today", get_utcnow()))
+        # Out of the created partitions
+        await results.write_many([_result("http://127.0.0.1:1/old", OLD_DAY)])
+
+        assert [r.check.url for r in await async_itr_to_list(results.read_last_n(2))] == [
+            "http://127.0.0.1:1/today",
+            "http://127.0.0.1:1/old",
+        ]
+
+    partitions = _partitions_of_results()
+    assert partitions[f"checkresult_p{today:%Y%m%d}"] == 1
+    assert partitions["checkresult_default"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_partitions_are_dropped(setup_module):
+    global TEST_CONNINFO
+
+    with psycopg.connect(TEST_CONNINFO) as conn:
+        conn.execute(
+            "CREATE TABLE checkresult_p20200102 PARTITION OF CheckResult FOR VALUES FROM ('2020-01-02') TO ('2020-01-03');"
+        )
+
+    async with CheckResultSocketPostgres(TEST_CONNINFO) as results:
+        await results.write(_result("http://127.0.0.1:1/expired", OLD_DAY + datetime.timedelta(days=1)))
+        assert "checkresult_p20200102" in _partitions_of_results()
+
+        # The default is to keep all results
+        assert await results.drop_expired_partitions() == 0
+        assert len(await async_itr_to_list(results.read_last_n(10))) == 3
+
+    async with CheckResultSocketPostgres(TEST_CONNINFO, retention_days=30) as results:
+        await results.maintain()
+
+        assert [r.check.url for r in await async_itr_to_list(results.read_last_n(10))] == ["http://127.0.0.1:1/today"]
+        assert await results.drop_expired_partitions() == 0
+
+    partitions = _partitions_of_results()
+    assert "checkresult_p20200102" not in partitions
+    # The recent partitions are kept, and the expired results of the default partition are deleted
+    assert len(partitions) == RESULTS_PARTITIONS_AHEAD + 2
+    assert partitions["checkresult_default"] == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_rollups_are_deleted_per_grain(setup_module):
+    global TEST_CONNINFO
+
+    url = "http://127.0.0.1:1/rolled_up"
+    since = get_utcnow() - datetime.timedelta(days=10)
+
+    async def num_rollups_per_grain(results: CheckResultSocketPostgres) -> dict[str, int]:
+        return {grain: len(await async_itr_to_list(results.read_rollups(grain, since, url))) for grain in ROLLUP_GRAINS}
+
+    async with CheckResultSocketPostgres(TEST_CONNINFO) as results:
+        await results.write(_result(url, get_utcnow() - datetime.timedelta(days=2)))
+        await results.write(_result(url, get_utcnow()))
+
+        # By default, the recent rollups are kept
+        await results.maintain()
+        assert await num_rollups_per_grain(results) == {"minute": 2, "hour": 2, "day": 2}
+
+    async with CheckResultSocketPostgres(TEST_CONNINFO, rollups_retention_days={"minute": 1, "hour": 3}) as results:
+        await results.maintain()
+
+        assert await num_rollups_per_grain(results) == {"minute": 1, "hour": 2, "day": 2}
+        assert await results.delete_expired_rollups() == 0
+
+
+@pytest.mark.asyncio
+async def test_weekly_partitions_start_on_monday(setup_module):
+    global TEST_CONNINFO
+
+    async with CheckResultSocketPostgres(TEST_CONNINFO, partition_period="week") as results:
+        # The first weeks overlap the daily partitions, so they are skipped
+        await results.create_partitions(num_ahead=3)
+
+    today = get_utcnow().date()
+    next_monday = today + datetime.timedelta(days=7 - today.weekday())
+    assert f"checkresult_p{next_monday + datetime.timedelta(weeks=1):%Y%m%d}" in _partitions_of_results()
+
+
+def test_invalid_partition_period_or_retention():
+    with pytest.raises(ValueError):
+        CheckResultSocketPostgres("postgresql://localhost/nonexistent", partition_period="month")
+
+    with pytest.raises(ValueError):
+        CheckResultSocketPostgres("postgresql://localhost/nonexistent", retention_days=-1)
+
+    with pytest.raises(ValueError):
+        CheckResultSocketPostgres("postgresql://localhost/nonexistent", rollups_retention_days={"week": 1})
+
+    with pytest.raises(ValueError):
+        CheckResultSocketPostgres("postgresql://localhost/nonexistent", rollups_retention_days={"minute": -1})
+
+
+@pytest.mark.asyncio
+async def test_databases_with_an_older_schema_are_refused(setup_module):
+    global TEST_CONNINFO
+
+    async with CheckResultSocketPostgres(TEST_CONNINFO) as results:
+        assert await common_single_pg_datastore_schema_version(results._pool, timeout=5) == SCHEMA_VERSION
+
+    (old_dbname, old_conninfo) = tconf.gen_new_test_postgres_conninfo()
+
+    with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+        conn.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(old_dbname)))
+
+    try:
+        # As created before the results were partitioned
+        with psycopg.connect(old_conninfo) as conn:
+            conn.execute(
+                "CREATE TABLE WebsiteCheck (url VARCHAR(2048) PRIMARY KEY, regex VARCHAR(2048), interval_seconds SMALLINT);"
+            )
+            conn.execute("CREATE TABLE CheckResult (id serial PRIMARY KEY, url VARCHAR(2048) NOT NULL);")
+            conn.execute("INSERT INTO WebsiteCheck VALUES ('https://example.org', 'Example', 30);")
+
+        with pytest.raises(SystemExit) as e:
+            await ChecksRunnerContext.with_single_datastore_postgres(old_conninfo, auto_init=True)
+        assert e.value.code == 2
+
+        # Unless only read, e.g. to export the checks before migrating them
+        async with await ChecksRunnerContext.with_single_datastore_postgres(
+            old_conninfo, auto_init=True, read_only=True
+        ) as ctx:
+            checks = await async_itr_to_list(await ctx.checks.read_all())
+            assert [(c.url, c.regex, c.extra_regexes, c.interval_seconds) for c in checks] == [
+                ("https://example.org", "Example", None, 30)
+            ]
+
+    finally:
+        with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+            conn.execute(sql.SQL("DROP DATABASE {} WITH (FORCE)").format(sql.Identifier(old_dbname)))
@@ -0,0 +1,103 @@
+import asyncio
+import datetime
+
+import psycopg
+import pytest
+import pytest_asyncio
+from psycopg import sql
+
+from fastchecks import conf
+from fastchecks.runner import ChecksRunnerContext
+from fastchecks.types import WebsiteCheck, WebsiteCheckScheduled
+from tests import tconf
+
+TEST_DBNAME: str
+TEST_CONNINFO: str
+
+# Allow minimum of 1 interval second for tests for speed
+conf.MIN_INTERVAL_SECONDS = 1
+
+# Unreachable (connection refused) local url, so that the check is quick and needs no network
+CHECK = WebsiteCheckScheduled.with_check(WebsiteCheck.with_validation("http://127.0.0.1:1/check"), interval_seconds=60)
+
+
+@pytest.fixture(scope="module")
+def event_loop():
+    loop = asyncio.get_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def setup_module():
+    global TEST_DBNAME, TEST_CONNINFO
+
+    (TEST_DBNAME, TEST_CONNINFO) = tconf.gen_new_test_postgres_conninfo()
+
+    with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+        # With UTF8 explicitly, since psycopg returns bytes (instead of str) for the text of SQL_ASCII databases (e.g. some local installations' default)
+        conn.execute(
+            sql.SQL("CREATE DATABASE {} ENCODING 'UTF8' TEMPLATE template0").format(sql.Identifier(TEST_DBNAME))
+        )
+
+    async with await ChecksRunnerContext.with_single_datastore_postgres(TEST_CONNINFO, auto_init=True) as ctx:
+        await ctx.checks.upsert(CHECK)
+
+    yield "initialized"
+
+    with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+        conn.execute(sql.SQL("DROP DATABASE {} WITH (FORCE)").format(sql.Identifier(TEST_DBNAME)))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("scheduler", ["native", "apscheduler"])
+async def test_restarted_runner_resumes_the_phases(setup_module, scheduler):
+    global TEST_CONNINFO
+
+    async with await ChecksRunnerContext.with_single_datastore_postgres(TEST_CONNINFO, auto_init=False) as ctx:
+        # The first run has no persisted state yet: without phase spreading, the check is fired right away
+        started = datetime.datetime.now(datetime.timezone.utc)
+        async with asyncio.timeout(delay=1.5):
+            try:
+                await ctx.run_checks_until_stopped_in_foreground(
+                    scheduler=scheduler, phase_spreading=False, resume_phases=True
+                )
+            except asyncio.CancelledError:
+                pass
+
+        # Persisted when stopped
+        next_due_at = (await ctx.checks.read_next_due_times())[CHECK.url]
+        assert started + datetime.timedelta(seconds=59) < next_due_at < started + datetime.timedelta(seconds=62)
+
+        # A restarted runner waits until then, instead of firing the check right away again
+        delay = ctx.get_first_fire_delay_seconds(CHECK, phase_spreading=False, next_due_at=next_due_at)
+        assert 57 < delay < 60
+
+    # Clear the state for the next parametrized run
+    with psycopg.connect(TEST_CONNINFO, autocommit=True) as conn:
+        conn.execute("UPDATE WebsiteCheck SET next_due_at = NULL")
+
+
+@pytest.mark.asyncio
+async def test_overdue_checks_resume_their_phase(setup_module):
+    global TEST_CONNINFO
+
+    async with await ChecksRunnerContext.with_single_datastore_postgres(TEST_CONNINFO, auto_init=False) as ctx:
+        # Missed 2 runs, the last one 10s ago: the next one is in 50s
+        next_due_at = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=130)
+        delay = ctx.get_first_fire_delay_seconds(CHECK, phase_spreading=True, next_due_at=next_due_at)
+        assert 49 < delay <= 50
+
+
+@pytest.mark.asyncio
+async def test_persisting_the_state_does_not_notify_changes(setup_module):
+    global TEST_CONNINFO
+
+    async with await ChecksRunnerContext.with_single_datastore_postgres(TEST_CONNINFO, auto_init=False) as ctx:
+        async with ctx.checks.listen_changes() as changes:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            assert await ctx.checks.write_next_due_times({CHECK.url: now, "https://not.stored.org": now}) == 1
+
+            with pytest.raises(TimeoutError):
+                async with asyncio.timeout(delay=0.5):
+                    await anext(changes)
@@ -0,0 +1,106 @@
+import datetime
+import random
+
+import pytest
+
+from fastchecks.latency import percentile
+from fastchecks.rollups import (
+    SKETCH_NUM_BUCKETS,
+    bucket_start_of,
+    last_buckets_start,
+    merged_rollups,
+    new_sketch,
+    rollups_of_results,
+    sketch_bucket_of,
+    sketch_quantile,
+)
+from fastchecks.types import CheckResult, WebsiteCheck
+
+START = datetime.datetime(2023, 9, 25, 10, 30, 15, 123)
+
+
+def _result(url: str, timestamp_start: datetime.datetime, response_time: float, status: int | None) -> CheckResult:
+    check = WebsiteCheck.with_validation(url)
+
+    if status is None:
+        return CheckResult.failure(check, timestamp_start, response_time, timeout_error=True)
+    else:
+        return CheckResult.response(check, timestamp_start, response_time, status, regex_match=None)
+
+
+def test_sketch_buckets():
+    assert sketch_bucket_of(0) == 0
+    assert sketch_bucket_of(0.001) == 0
+    assert sketch_bucket_of(0.0011) == 1
+    assert sketch_bucket_of(0.5) == 35
+    assert sketch_bucket_of(1000) == SKETCH_NUM_BUCKETS - 1
+
+    assert sum(new_sketch([0.1, 0.2, 0.2])) == 3
+    assert sketch_quantile([0] * SKETCH_NUM_BUCKETS, 0.5) is None
+
+
+def test_sketch_quantiles_are_within_the_relative_error():
+    rng = random.Random(42)
+    response_times = sorted(rng.lognormvariate(-2, 1) for _ in range(10000))
+    sketch = new_sketch(response_times)
+
+    for q in (0, 0.5, 0.95, 0.99, 1):
+        assert sketch_quantile(sketch, q) == pytest.approx(percentile(response_times, q * 100), rel=0.1)
+
+    with pytest.raises(ValueError):
+        sketch_quantile(sketch, 1.5)
+
+
+def test_bucket_starts():
+    assert bucket_start_of(START, "minute") == datetime.datetime(2023, 9, 25, 10, 30)
+    assert bucket_start_of(START, "hour") == datetime.datetime(2023, 9, 25, 10)
+    assert bucket_start_of(START, "day") == datetime.datetime(2023, 9, 25)
+    assert last_buckets_start(7, "day", START) == datetime.datetime(2023, 9, 19)
+    assert last_buckets_start(1, "hour", START) == datetime.datetime(2023, 9, 25, 10)
+
+    with pytest.raises(ValueError):
+        bucket_start_of(START, "week")
+
+    with pytest.raises(ValueError):
+        last_buckets_start(0, "day", START)
+
+
+def test_rollups_of_results_and_their_merge():
+    results = [
+        _result("http://a.com", START, 0.1, 200),
+        _result("http://a.com", START + datetime.timedelta(minutes=1), 0.3, 500),
+        _result("http://a.com", START + datetime.timedelta(hours=1), 10, None),
+        _result("http://b.com", START, 0.2, 200),
+    ]
+
+    minute_rollups = rollups_of_results(results, "minute")
+    assert [(rollup.url, rollup.bucket_start.minute) for rollup in minute_rollups] == [
+        ("http://a.com", 30),
+        ("http://a.com", 31),
+        ("http://a.com", 30),
+        ("http://b.com", 30),
+    ]
+
+    [a, b] = rollups_of_results(results, "day")
+    merged = merged_rollups(rollup for rollup in minute_rollups if rollup.url == "http://a.com")
+    assert merged.model_dump(exclude={"grain", "bucket_start"}) == a.model_dump(exclude={"grain", "bucket_start"})
+    assert (a.num_checks, a.num_successes, a.num_timeout_errors, a.num_responses, a.num_response_errors) == (
+        3,
+        1,
+        1,
+        2,
+        1,
+    )
+    # The timed-out check's response time is not counted
+    assert (a.response_time_min, a.response_time_max, a.response_time_mean()) == (0.1, 0.3, pytest.approx(0.2))
+    assert a.uptime() == pytest.approx(1 / 3)
+    assert a.response_time_quantile(0) == pytest.approx(0.1, rel=0.1)
+    assert a.response_time_quantile(1) == pytest.approx(0.3, rel=0.1)
+    assert b.uptime() == 1
+
+    [timed_out] = rollups_of_results(results[2:3], "hour")
+    assert timed_out.response_time_sketch is None and timed_out.response_time_quantile(0.95) is None
+    assert "uptime=0.00%" in timed_out.summary()
+
+    with pytest.raises(ValueError):
+        merged_rollups([a, b])
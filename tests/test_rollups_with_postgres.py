@@ -0,0 +1,113 @@
+import asyncio
+import datetime
+import random
+
+import psycopg
+import pytest
+import pytest_asyncio
+from psycopg import sql
+
+from fastchecks.rollups import ROLLUP_GRAINS, rollups_of_results
+from fastchecks.runner import ChecksRunnerContext
+from fastchecks.sockets.postgres import CheckResultSocketPostgres
+from fastchecks.types import CheckResult, WebsiteCheck
+from fastchecks.util import async_itr_to_list, get_utcnow
+from tests import tconf
+
+TEST_DBNAME: str
+TEST_CONNINFO: str
+
+URLS = [f"http://127.0.0.1:1/rollup{i}" for i in range(3)]
+
+
+@pytest.fixture(scope="module")
+def event_loop():
+    loop = asyncio.get_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def setup_module():
+    global TEST_DBNAME, TEST_CONNINFO
+
+    (TEST_DBNAME, TEST_CONNINFO) = tconf.gen_new_test_postgres_conninfo()
+
+    with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+        conn.execute(
+            sql.SQL("CREATE DATABASE {} ENCODING 'UTF8' TEMPLATE template0").format(sql.Identifier(TEST_DBNAME))
+        )
+
+    async with await ChecksRunnerContext.with_single_datastore_postgres(TEST_CONNINFO, auto_init=True):
+        pass
+
+    yield "initialized"
+
+    with psycopg.connect(tconf.TEST_POSTGRES_DEFAULT_DB_CONNINFO, autocommit=True) as conn:
+        conn.execute(sql.SQL("DROP DATABASE {} WITH (FORCE)").format(sql.Identifier(TEST_DBNAME)))
+
+
+def _random_results(n: int, since: datetime.datetime, rng: random.Random) -> list[CheckResult]:
+    results = []
+
+    for _ in range(n):
+        url = rng.choice(URLS)
+        timestamp_start = since + datetime.timedelta(seconds=rng.uniform(0, 3 * 3600))
+        # Rounded to float4, as stored by the database
+        response_time = float(f"{rng.lognormvariate(-2, 1):.5}")
+
+        match rng.choice(["ok", "regex_mismatch", "status_error", "timeout"]):
+            case "ok":
+                check = WebsiteCheck.with_validation(url, regex="ok", extra_regexes=["fine"])
+                results.append(CheckResult.response(check, timestamp_start, response_time, 200, True, [True]))
+            case "regex_mismatch":
+                check = WebsiteCheck.with_validation(url, regex="ok", extra_regexes=["fine"])
+                results.append(CheckResult.response(check, timestamp_start, response_time, 200, True, [False]))
+            case "status_error":
+                check = WebsiteCheck.with_validation(url)
+                results.append(CheckResult.response(check, timestamp_start, response_time, 503, None))
+            case "timeout":
+                check = WebsiteCheck.with_validation(url)
+                results.append(CheckResult.failure(check, timestamp_start, response_time, timeout_error=True))
+
+    return results
+
+
+@pytest.mark.asyncio
+async def test_rollups_are_maintained_as_results_are_written(setup_module):
+    global TEST_CONNINFO
+
+    rng = random.Random(42)
+    since = get_utcnow() - datetime.timedelta(hours=3)
+    results = _random_results(300, since, rng)
+
+    async with CheckResultSocketPostgres(TEST_CONNINFO) as socket:
+        # Written one by one, and in batches (with COPY), also to the same buckets
+        for result in results[:50]:
+            await socket.write(result)
+        await socket.write_many(results[50:200])
+        await socket.write_many(results[200:])
+
+        for grain in ROLLUP_GRAINS:
+            expected = rollups_of_results(results, grain)
+            actual = await async_itr_to_list(socket.read_rollups(grain, since))
+
+            assert len(actual) == len(expected)
+            for a, e in zip(actual, expected):
+                assert a.model_dump(exclude={"response_time_sum"}) == e.model_dump(exclude={"response_time_sum"})
+                assert a.response_time_sum == pytest.approx(e.response_time_sum)
+
+        url_rollups = await async_itr_to_list(socket.read_rollups("day", since, URLS[0]))
+        assert {rollup.url for rollup in url_rollups} == {URLS[0]}
+        assert sum(rollup.num_checks for rollup in url_rollups) == sum(
+            result.check.url == URLS[0] for result in results
+        )
+
+        # From the bucket that contains `since` on
+        last_hour_start = since.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=2)
+        last_hour = await async_itr_to_list(socket.read_rollups("hour", since + datetime.timedelta(hours=2)))
+        assert last_hour[0].bucket_start == last_hour_start
+        assert all(rollup.bucket_start >= last_hour_start for rollup in last_hour)
+
+        with pytest.raises(ValueError):
+            await async_itr_to_list(socket.read_rollups("week", since))
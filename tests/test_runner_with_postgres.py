@@ -8,7 +8,7 @@ from psycopg import sql
 
 from fastchecks import conf, cli
 from fastchecks.runner import ChecksRunnerContext
-from fastchecks.types import WebsiteCheck, WebsiteCheckScheduled
+from fastchecks.types import WebsiteCheck, WebsiteCheckChange, WebsiteCheckScheduled
 from fastchecks.util import PRACTICAL_MAX_INT, async_itr_to_list
 from tests import tconf
 
@@ -101,7 +101,9 @@ async def test_simple_checks_workflow(setup_module):
     assert len(results00) == 0, f"{results00} - {type(results00)}"
     # We expect an error since there are no checks yet
     with pytest.raises(ValueError):
-        await CTX.run_checks_until_stopped_in_foreground()
+        await CTX.run_checks_until_stopped_in_foreground(scheduler="native")
+    with pytest.raises(ValueError):
+        await CTX.run_checks_until_stopped_in_foreground(scheduler="apscheduler")
 
     #
     # 01: We insert 1 check
@@ -119,6 +121,8 @@ async def test_simple_checks_workflow(setup_module):
             "https://python.org",
             "--regex",
             "Python .* lets you work quickly",
+            "--extra_regex",
+            "programming",
             "--interval",
             "2",
         ]
@@ -150,6 +154,9 @@ async def test_simple_checks_workflow(setup_module):
         and results02a[0].regex_match == "Python is a programming language that lets you work quickly"
     )
     assert results02b[0].is_regex_match_truthy() and results02b[0].regex_match == True
+    assert results02a[0].extra_regex_matches == ["programming"]
+    assert results02b[0].extra_regex_matches == [True]
+    assert results02b[0].check.extra_regexes == ["programming"]
 
     #
     # 03: We insert 1 more check, and then run & store all checks
@@ -193,6 +200,10 @@ async def test_simple_checks_workflow(setup_module):
     results04_example_org = list(filter(lambda r: r.check.url == "https://example.org", results04_all_results))
     assert len(results04_python_org) == 3, f"{results04_python_org}"
     assert len(results04_example_org) == 2, f"{results04_example_org}"
+    #
+    results04_last_2_per_url = await async_itr_to_list(CTX.results.read_last_n_per_url(2))
+    assert [r.check.url for r in results04_last_2_per_url] == ["https://example.org"] * 2 + ["https://python.org"] * 2
+    assert results04_last_2_per_url[0].timestamp_start > results04_last_2_per_url[1].timestamp_start
 
     #
     # 05: Run scheduled checks in the background for some seconds, then stop
@@ -210,6 +221,18 @@ async def test_simple_checks_workflow(setup_module):
                     TEST_CONNINFO,
                     "--log_root_level",  # use this other option to increase tested line coverage
                     "DEBUG",
+                    "--results_batch_size",  # buffered results must be flushed when the run is stopped
+                    "3",
+                    "--trace_request_phases",
+                    "true",
+                    "--connector_limit_per_host",
+                    "4",
+                    "--keepalive_timeout",
+                    "30",
+                    "--host_max_concurrency",
+                    "1",
+                    "--adaptive_timeouts",  # seeded with the results above
+                    "true",
                     "check_all_loop_fg",
                 ]
             )
@@ -233,3 +256,105 @@ async def test_simple_checks_workflow(setup_module):
     assert len(results05_example_org) > len(
         results05_python_org
     ), f"{len(results05_example_org)} - {len(results05_python_org)}"
+
+    # Only the results of the checks run with the CLI (the most recent ones) have their request phases traced
+    results05_new_results = results05_all_results[: len(results05_all_results) - len(results04_all_results)]
+    assert all(r.phase_times is not None and r.phase_times.ttfb is not None for r in results05_new_results)
+    assert all(r.phase_times is None for r in results04_all_results)
+
+    #
+    # 06: We listen to the changes of the checks while changing them
+    #     We expect to get each change in order, with the check as currently stored (None if deleted)
+    #
+    check06 = WebsiteCheckScheduled.with_check(
+        WebsiteCheck.with_validation(url="https://example.org/live_sync", regex=None), interval_seconds=1
+    )
+
+    async with CTX.checks.listen_changes() as changes:
+        await CTX.checks.upsert(check06)
+        await CTX.checks.delete("https://python.org")
+
+        async with asyncio.timeout(delay=5):
+            changes06 = [await anext(changes), await anext(changes)]
+
+    assert changes06 == [
+        WebsiteCheckChange(url=check06.url, check=check06),
+        WebsiteCheckChange(url="https://python.org", check=None),
+    ]
+    assert await CTX.checks.read(check06.url) == check06
+    assert await CTX.checks.read("https://python.org") is None
+
+    #
+    # 07: Run the scheduled checks while a new check is added
+    #     We expect the new check to be run without restarting
+    #
+    check07 = WebsiteCheckScheduled.with_check(
+        WebsiteCheck.with_validation(url="https://example.org/live_sync_while_running", regex=None), interval_seconds=1
+    )
+
+    async def upsert_check07_while_running():
+        await asyncio.sleep(1)
+        await CTX.checks.upsert(check07)
+
+    async with asyncio.timeout(delay=4):
+        try:
+            await asyncio.gather(
+                CTX.run_checks_until_stopped_in_foreground(live_sync=True), upsert_check07_while_running()
+            )
+        except asyncio.CancelledError:
+            pass
+
+    results07_all_results = await async_itr_to_list(CTX.results.read_last_n(PRACTICAL_MAX_INT))
+    assert any(r.check.url == check07.url for r in results07_all_results)
+
+    #
+    # 08: We delete all checks while listening
+    #     We expect a single change for all checks
+    #
+    async with CTX.checks.listen_changes() as changes:
+        await CTX.checks.delete_all(confirm=True)
+
+        async with asyncio.timeout(delay=5):
+            assert await anext(changes) == WebsiteCheckChange(url=None, check=None)
+
+
+@pytest.mark.asyncio
+async def test_check_all_once_n_write_with_bounded_concurrency(setup_module):
+    global CTX
+
+    # Not to depend on the outcome of the other tests (e.g. the workflow's checks left behind if it failed)
+    await CTX.checks.delete_all(confirm=True)
+
+    # Refused connections, so that the test does not depend on the network
+    urls = [f"http://127.0.0.1:1/concurrent{i}" for i in range(6)]
+    for url in urls:
+        await CTX.checks.upsert(WebsiteCheckScheduled.with_check(WebsiteCheck.with_validation(url), interval_seconds=1))
+
+    in_flight = 0
+    max_in_flight = 0
+    check_n_write = CTX.check_n_write
+
+    async def check_n_write_counting_in_flight(check):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        try:
+            await asyncio.sleep(0.05)
+            return await check_n_write(check)
+        finally:
+            in_flight -= 1
+
+    CTX.check_n_write = check_n_write_counting_in_flight  # type: ignore[method-assign]
+    try:
+        results = await async_itr_to_list(CTX.check_all_once_n_write(max_concurrency=2))
+    finally:
+        del CTX.check_n_write
+
+    assert max_in_flight == 2
+    assert sorted(r.check.url for r in results) == urls
+    assert all(r.host_error or r.other_error for r in results)
+    # All of them were written
+    written = await async_itr_to_list(CTX.results.read_last_n_per_url(1))
+    assert {r.check.url for r in written} >= set(urls)
+
+    await CTX.checks.delete_all(confirm=True)
@@ -0,0 +1,169 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from fastchecks.scheduling import HeapScheduler, fire_rate_histogram, phase_offset_seconds
+
+
+async def run_for(scheduler: HeapScheduler, seconds: float) -> None:
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(seconds):
+            await scheduler.run_until_stopped()
+
+
+@pytest.mark.asyncio
+async def test_heap_scheduler_runs_jobs_at_their_intervals():
+    runs: Counter[str] = Counter()
+
+    async def fun(key: str) -> None:
+        runs[key] += 1
+
+    scheduler = HeapScheduler(fun, num_workers=2)
+    scheduler.add("fast", "fast", interval_seconds=0.1)
+    scheduler.add("slow", "slow", interval_seconds=0.25)
+    scheduler.add("later", "later", interval_seconds=0.1, first_fire_delay_seconds=10)
+    assert len(scheduler) == 3 and "fast" in scheduler
+
+    await run_for(scheduler, 0.58)
+
+    # The first runs are immediate
+    assert runs["fast"] == 6
+    assert runs["slow"] == 3
+    assert runs["later"] == 0
+
+
+@pytest.mark.asyncio
+async def test_heap_scheduler_remove_and_replace_jobs():
+    runs: Counter[str] = Counter()
+
+    async def fun(key: str) -> None:
+        runs[key] += 1
+
+    scheduler = HeapScheduler(fun, num_workers=1)
+    scheduler.add("a", "a", interval_seconds=0.1)
+    scheduler.add("b", "b", interval_seconds=0.1)
+    assert scheduler.remove("b")
+    assert not scheduler.remove("b")
+    # Replaced: only the new one runs
+    scheduler.add("a", "a2", interval_seconds=0.1)
+    assert len(scheduler) == 1
+
+    await run_for(scheduler, 0.25)
+
+    assert runs == {"a2": 3}
+
+
+@pytest.mark.asyncio
+async def test_heap_scheduler_add_many_jobs_at_once():
+    runs: Counter[str] = Counter()
+
+    async def fun(key: str) -> None:
+        runs[key] += 1
+
+    scheduler = HeapScheduler(fun, num_workers=2)
+    scheduler.add("a", "old", interval_seconds=0.1)
+    scheduler.add_many([("a", "a", 0.1, 0.0), ("b", "b", 0.25, 0.0), ("later", "later", 0.1, 10.0)])
+    # Replaced: only the new one runs
+    assert len(scheduler) == 3
+
+    await run_for(scheduler, 0.58)
+
+    assert runs == {"a": 6, "b": 3}
+
+
+@pytest.mark.asyncio
+async def test_heap_scheduler_stops_and_survives_failing_jobs():
+    runs = 0
+
+    async def fun(_: None) -> None:
+        nonlocal runs
+        runs += 1
+        if runs == 3:
+            scheduler.stop()
+        raise ValueError("Simulated failure")
+
+    scheduler = HeapScheduler(fun, num_workers=1)
+    scheduler.add("failing", None, interval_seconds=0.01)
+
+    await asyncio.wait_for(scheduler.run_until_stopped(), timeout=1)
+    assert runs == 3
+
+
+@pytest.mark.asyncio
+async def test_heap_scheduler_bounds_the_concurrent_jobs():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fun(_: int) -> None:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+
+    scheduler = HeapScheduler(fun, num_workers=3)
+    for i in range(10):
+        scheduler.add(str(i), i, interval_seconds=1)
+
+    await run_for(scheduler, 0.3)
+
+    assert max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_heap_scheduler_coalesces_the_fires_while_all_workers_are_busy():
+    runs: Counter[str] = Counter()
+    max_queued_per_job = 0
+
+    async def fun(key: str) -> None:
+        nonlocal max_queued_per_job
+        runs[key] += 1
+        await asyncio.sleep(0.1)
+        queued = Counter(job.key for job in scheduler._queue._queue)  # type: ignore[attr-defined]
+        max_queued_per_job = max(max_queued_per_job, *queued.values(), 0)
+
+    # The jobs are much slower than their interval
+    scheduler = HeapScheduler(fun, num_workers=1)
+    scheduler.add("a", "a", interval_seconds=0.01)
+    scheduler.add("b", "b", interval_seconds=0.01)
+
+    await run_for(scheduler, 0.55)
+
+    assert max_queued_per_job == 1
+    assert scheduler._queue.qsize() <= 2
+    # Taking turns in the only worker
+    assert runs == {"a": 3, "b": 3}
+
+
+def test_phase_offsets_are_deterministic_and_spread():
+    assert phase_offset_seconds("https://example.org", 180) == phase_offset_seconds("https://example.org", 180)
+
+    offsets = [phase_offset_seconds(f"https://example.org/{i}", 180) for i in range(1800)]
+    assert all(0 <= offset < 180 for offset in offsets)
+
+    histogram = fire_rate_histogram(((offset, 180) for offset in offsets), horizon_seconds=180)
+    assert sum(histogram) == 1800
+    # About 10 per second; without spreading, it would be 1800 in the first second
+    assert max(histogram) < 30
+
+
+def test_fire_rate_histogram():
+    assert fire_rate_histogram([(0, 2), (1.5, 2), (0.2, 5)], horizon_seconds=6) == [2, 1, 1, 1, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_heap_scheduler_jitter_delays_the_runs():
+    runs = 0
+
+    async def fun(_: None) -> None:
+        nonlocal runs
+        runs += 1
+
+    scheduler = HeapScheduler(fun, num_workers=1, max_jitter_seconds=0.05)
+    scheduler.add("a", None, interval_seconds=0.1)
+
+    await run_for(scheduler, 0.33)
+
+    # Without jitter, it would run at 0, 0.1, 0.2 & 0.3; with it, each run is delayed a bit, but they do not drift
+    assert 3 <= runs <= 4
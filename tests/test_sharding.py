@@ -0,0 +1,49 @@
+from collections import Counter
+
+import pytest
+
+from fastchecks.sharding import HashRing, Shard
+
+URLS = [f"https://example{i}.org/path" for i in range(10_000)]
+
+
+def test_hash_ring_is_deterministic_and_balanced():
+    ring = HashRing(4)
+    shards = [ring.shard_of(url) for url in URLS]
+
+    # E.g. in another process
+    same_ring = HashRing(4)
+    assert shards == [same_ring.shard_of(url) for url in URLS]
+
+    counts = Counter(shards)
+    assert set(counts) == {0, 1, 2, 3}
+    # Ideally 2500 each
+    assert all(1750 < count < 3250 for count in counts.values()), counts
+
+
+def test_hash_ring_moves_few_keys_when_adding_a_shard():
+    ring4 = HashRing(4)
+    ring5 = HashRing(5)
+
+    moved = [url for url in URLS if ring4.shard_of(url) != ring5.shard_of(url)]
+
+    # Ideally 1/5 of the keys, all to the new shard
+    assert 0.1 < len(moved) / len(URLS) < 0.3
+    assert all(ring5.shard_of(url) == 4 for url in moved)
+
+
+def test_shards_partition_the_urls():
+    shards = [Shard(i, 3) for i in range(3)]
+
+    for url in URLS[:1000]:
+        assert sum(shard.owns(url) for shard in shards) == 1
+
+
+def test_shard_parse():
+    shard = Shard.parse("1/4")
+    assert (shard.index, shard.num_shards) == (1, 4)
+    assert str(shard) == "1/4"
+
+    for invalid in ["1", "4/4", "-1/4", "0/0", "a/b"]:
+        with pytest.raises(ValueError):
+            Shard.parse(invalid)
@@ -0,0 +1,130 @@
+import asyncio
+import os
+import signal
+from typing import AsyncIterator
+
+import aiohttp
+import pytest
+from pydantic import PositiveInt
+
+from fastchecks.runner import ChecksRunnerContext
+from fastchecks.sockets import WebsiteCheckSocket
+from fastchecks.types import CheckResult, WebsiteCheck, WebsiteCheckScheduled
+from fastchecks.util import get_utcnow
+from tests.test_sockets_buffered import InMemoryCheckResultSocket
+
+CHECKS = [
+    WebsiteCheckScheduled.with_check(WebsiteCheck.with_validation(f"https://example.org/{i}"), interval_seconds=60)
+    for i in range(3)
+]
+
+
+class InMemoryWebsiteCheckSocket(WebsiteCheckSocket):
+    def __init__(self, checks: list[WebsiteCheckScheduled]) -> None:
+        self.checks = {check.url: check for check in checks}
+
+    def is_closed(self) -> bool:
+        return False
+
+    async def upsert(self, check: WebsiteCheckScheduled) -> int:
+        self.checks[check.url] = check
+        return 1
+
+    async def read_n(self, n: PositiveInt, after_url: str | None = None) -> AsyncIterator[WebsiteCheckScheduled]:
+        urls = sorted(url for url in self.checks if after_url is None or url > after_url)
+        for url in urls[:n]:
+            yield self.checks[url]
+
+    async def delete(self, url: str) -> int:
+        return 0 if self.checks.pop(url, None) is None else 1
+
+    async def delete_all(self, confirm: bool) -> int:
+        num_checks = len(self.checks)
+        self.checks.clear()
+        return num_checks
+
+    async def close(self) -> None:
+        pass
+
+
+class SlowChecksRunnerContext(ChecksRunnerContext):
+    """Each check takes `check_seconds` (without making any request)."""
+
+    def __init__(self, check_seconds: float) -> None:
+        super().__init__(
+            session=aiohttp.ClientSession(),
+            checks=InMemoryWebsiteCheckSocket(CHECKS),
+            results=InMemoryCheckResultSocket(),
+        )
+        self.check_seconds = check_seconds
+        self.started = 0
+
+    async def check_only(self, check: WebsiteCheck) -> CheckResult:
+        self.started += 1
+        await asyncio.sleep(self.check_seconds)
+        return CheckResult.response(check, get_utcnow(), response_time=0.1, response_status=200, regex_match=None)
+
+
+async def run_until_all_started(ctx: SlowChecksRunnerContext, **kwargs) -> asyncio.Task:
+    runner = asyncio.create_task(
+        ctx.run_checks_until_stopped_in_foreground(
+            phase_spreading=False, live_sync=False, resume_phases=False, **kwargs
+        )
+    )
+    async with asyncio.timeout(5):
+        while ctx.started < len(CHECKS):
+            await asyncio.sleep(0.01)
+    return runner
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("scheduler", ["native", "apscheduler"])
+async def test_stop_drains_the_checks_in_flight(scheduler):
+    async with SlowChecksRunnerContext(check_seconds=0.3) as ctx:
+        runner = await run_until_all_started(ctx, scheduler=scheduler, drain_timeout_seconds=5)
+
+        ctx.stop()
+        async with asyncio.timeout(2):
+            await runner
+
+        # No result was lost, and no new check was fired
+        assert len(ctx.results.results) == len(CHECKS)
+        assert ctx.started == len(CHECKS)
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_the_checks_in_flight_after_the_drain_timeout():
+    async with SlowChecksRunnerContext(check_seconds=60) as ctx:
+        runner = await run_until_all_started(ctx, drain_timeout_seconds=0.2)
+
+        ctx.stop()
+        async with asyncio.timeout(2):
+            await runner
+
+        assert len(ctx.results.results) == 0
+
+
+@pytest.mark.asyncio
+async def test_stopping_again_cancels_the_checks_in_flight_right_away():
+    async with SlowChecksRunnerContext(check_seconds=60) as ctx:
+        runner = await run_until_all_started(ctx, drain_timeout_seconds=60)
+
+        ctx.stop()
+        await asyncio.sleep(0.1)
+        assert not runner.done()
+
+        ctx.stop()
+        async with asyncio.timeout(2):
+            await runner
+
+
+@pytest.mark.asyncio
+async def test_sigterm_stops_gracefully():
+    async with SlowChecksRunnerContext(check_seconds=0.3) as ctx:
+        runner = await run_until_all_started(ctx, drain_timeout_seconds=5)
+
+        os.kill(os.getpid(), signal.SIGTERM)
+        async with asyncio.timeout(2):
+            await runner
+
+        assert len(ctx.results.results) == len(CHECKS)
@@ -0,0 +1,161 @@
+import asyncio
+from typing import AsyncIterator, Sequence
+
+import pytest
+from pydantic import PositiveInt
+
+from fastchecks.sockets import CheckResultSocket
+from fastchecks.sockets.buffered import BufferedCheckResultSocket
+from fastchecks.types import CheckResult, WebsiteCheck
+from fastchecks.util import get_utcnow
+
+
+class InMemoryCheckResultSocket(CheckResultSocket):
+    def __init__(self) -> None:
+        self.results: list[CheckResult] = []
+        self.num_write_calls = 0
+        self.closed = False
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def write(self, result: CheckResult) -> int:
+        return await self.write_many([result])
+
+    async def write_many(self, results: Sequence[CheckResult]) -> int:
+        self.num_write_calls += 1
+        self.results.extend(results)
+        return len(results)
+
+    async def read_last_n(self, n: PositiveInt) -> AsyncIterator[CheckResult]:
+        for result in self.results[::-1][:n]:
+            yield result
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def gen_result(url: str = "https://example.org") -> CheckResult:
+    return CheckResult.response(
+        WebsiteCheck.with_validation(url), get_utcnow(), response_time=0.1, response_status=200, regex_match=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_buffered_socket_writes_in_batches_of_max_size():
+    inner = InMemoryCheckResultSocket()
+    buffered = BufferedCheckResultSocket(inner, max_size=3, max_age_seconds=60)
+
+    assert await buffered.write(gen_result()) == 0
+    assert await buffered.write(gen_result()) == 0
+    assert len(inner.results) == 0 and len(buffered) == 2
+
+    assert await buffered.write(gen_result()) == 3
+    assert len(inner.results) == 3 and len(buffered) == 0
+    assert inner.num_write_calls == 1
+
+    await buffered.close()
+
+
+@pytest.mark.asyncio
+async def test_buffered_socket_flushes_after_max_age():
+    inner = InMemoryCheckResultSocket()
+    buffered = BufferedCheckResultSocket(inner, max_size=100, max_age_seconds=0.05)
+
+    await buffered.write(gen_result())
+    await buffered.write(gen_result())
+    assert len(inner.results) == 0
+
+    await asyncio.sleep(0.2)
+    assert len(inner.results) == 2 and len(buffered) == 0
+    assert inner.num_write_calls == 1
+
+    await buffered.close()
+
+
+@pytest.mark.asyncio
+async def test_buffered_socket_flushes_before_reading_and_on_close():
+    inner = InMemoryCheckResultSocket()
+    buffered = BufferedCheckResultSocket(inner, max_size=100, max_age_seconds=60)
+
+    await buffered.write(gen_result("https://example.org/1"))
+    read = [result async for result in buffered.read_last_n(10)]
+    assert [r.check.url for r in read] == ["https://example.org/1"]
+
+    await buffered.write(gen_result("https://example.org/2"))
+    await buffered.close()
+    assert inner.closed
+    assert [r.check.url for r in inner.results] == ["https://example.org/1", "https://example.org/2"]
+
+
+@pytest.mark.asyncio
+async def test_current_status_is_sorted_by_url():
+    inner = InMemoryCheckResultSocket()
+    buffered = BufferedCheckResultSocket(inner, max_size=100, max_age_seconds=60)
+
+    for url in ["https://example.org/b", "https://example.org/a", "https://example.org/c", "https://example.org/a"]:
+        await buffered.write(gen_result(url))
+
+    status = [result async for result in buffered.read_current_status()]
+    assert [r.check.url for r in status] == ["https://example.org/a", "https://example.org/b", "https://example.org/c"]
+    # The latest result of each URL
+    assert status[0] is inner.results[-1]
+
+    await buffered.close()
+
+
+class FailingSocket(InMemoryCheckResultSocket):
+    def __init__(self, num_failures: int) -> None:
+        super().__init__()
+        self.num_failures = num_failures
+
+    async def write_many(self, results: Sequence[CheckResult]) -> int:
+        if self.num_failures > 0:
+            self.num_failures -= 1
+            raise ConnectionError("Simulated write failure")
+        return await super().write_many(results)
+
+
+@pytest.mark.asyncio
+async def test_buffered_socket_keeps_results_if_the_batch_write_fails():
+    inner = FailingSocket(num_failures=1)
+    buffered = BufferedCheckResultSocket(inner, max_size=2, max_age_seconds=60)
+
+    await buffered.write(gen_result())
+    # The failure is not raised to the writer
+    assert await buffered.write(gen_result()) == 0
+    assert len(buffered) == 2
+    # Nor retried by size until the retry
+    assert await buffered.write(gen_result()) == 0
+    assert len(buffered) == 3 and len(inner.results) == 0
+
+    assert await buffered.flush() == 3
+    assert len(inner.results) == 3 and len(buffered) == 0
+
+    # Explicit flushes do raise the failure
+    inner.num_failures = 1
+    await buffered.write(gen_result())
+    with pytest.raises(ConnectionError):
+        await buffered.flush()
+    assert len(buffered) == 1
+
+    await buffered.close()
+    assert len(inner.results) == 4
+
+
+@pytest.mark.asyncio
+async def test_buffered_socket_retries_failed_flushes_after_max_age():
+    inner = FailingSocket(num_failures=2)
+    buffered = BufferedCheckResultSocket(inner, max_size=2, max_age_seconds=0.05)
+
+    # Failed flush by size, and then by age
+    await buffered.write(gen_result())
+    await buffered.write(gen_result())
+    await asyncio.sleep(0.08)
+    assert inner.num_failures == 0 and len(inner.results) == 0
+
+    # Retried without further writes
+    await asyncio.sleep(0.1)
+    assert len(inner.results) == 2 and len(buffered) == 0
+
+    await buffered.close()
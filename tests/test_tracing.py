@@ -0,0 +1,76 @@
+import aiohttp
+import pytest
+
+from fastchecks.check import check_website
+from fastchecks.tracing import ConnectionReuseStats, RequestPhaseTimer, request_phases_trace_config
+from fastchecks.types import WebsiteCheck
+
+TEST_TIMEOUT_SECONDS = 5
+
+
+def test_connection_reuse_ratio():
+    stats = ConnectionReuseStats()
+    assert stats.reuse_ratio() is None
+
+    stats.created["example.org"] += 1
+    stats.reused["example.org"] += 3
+    stats.created["python.org"] += 4
+
+    assert stats.reuse_ratio("example.org") == 0.75
+    assert stats.reuse_ratio("python.org") == 0.0
+    assert stats.reuse_ratio("unknown.org") is None
+    assert stats.reuse_ratio() == 3 / 8
+    assert stats.reuse_ratios() == {"example.org": 0.75, "python.org": 0.0}
+
+
+@pytest.mark.asyncio
+async def test_connections_are_reused_when_no_regex_is_checked():
+    stats = ConnectionReuseStats()
+
+    async with aiohttp.ClientSession(trace_configs=[stats.trace_config()]) as session:
+        url = "https://example.org"
+
+        for _ in range(3):
+            result = await check_website(session, WebsiteCheck.with_validation(url), timeout=TEST_TIMEOUT_SECONDS)
+            assert result.is_success()
+
+    assert stats.hosts() == {"example.org"}
+    assert stats.created["example.org"] == 1
+    assert stats.reused["example.org"] == 2
+
+
+def test_request_phase_timer_discounts_regex_time_from_body_read():
+    timer = RequestPhaseTimer()
+    assert timer.phase_times().model_dump() == dict(dns=None, connect=None, ttfb=None, body_read=None, regex=None)
+
+    timer.add_regex_time(0.25)
+    timer.add_regex_time(0.5)
+    timer.set_body_read_time(2.0)
+
+    phase_times = timer.phase_times()
+    assert phase_times.regex == 0.75
+    assert phase_times.body_read == 1.25
+    assert phase_times.dns is None and phase_times.connect is None and phase_times.ttfb is None
+
+
+@pytest.mark.asyncio
+async def test_request_phases_are_traced():
+    async with aiohttp.ClientSession(trace_configs=[request_phases_trace_config()]) as session:
+        check = WebsiteCheck.with_validation("https://example.org", "Example D[a-z]+")
+
+        result1 = await check_website(session, check, timeout=TEST_TIMEOUT_SECONDS, trace_phases=True)
+        assert result1.is_success()
+        assert result1.phase_times is not None
+        assert result1.phase_times.connect is not None and result1.phase_times.connect > 0
+        assert result1.phase_times.ttfb is not None and 0 < result1.phase_times.ttfb <= result1.response_time
+        assert result1.phase_times.body_read is not None and result1.phase_times.regex is not None
+
+        # The connection is reused, so there is no (new) connection
+        result2 = await check_website(session, check, timeout=TEST_TIMEOUT_SECONDS, trace_phases=True)
+        assert result2.phase_times is not None
+        assert result2.phase_times.dns is None and result2.phase_times.connect is None
+        assert result2.phase_times.ttfb is not None
+
+        # Not traced
+        result3 = await check_website(session, check, timeout=TEST_TIMEOUT_SECONDS)
+        assert result3.phase_times is None
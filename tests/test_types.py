@@ -1,4 +1,7 @@
-from fastchecks.types import WebsiteCheck, WebsiteCheckScheduled
+import pytest
+
+from fastchecks.types import CheckResult, WebsiteCheck, WebsiteCheckScheduled
+from fastchecks.util import get_utcnow
 
 
 def test_WebsiteCheckScheduled():
@@ -12,3 +15,40 @@ def test_WebsiteCheckScheduled():
     assert check_scheduled.url == check.url == "https://example.com"
     assert check_scheduled.regex == check.regex == ".*"
     assert check_scheduled.interval_seconds == 60
+
+
+def test_WebsiteCheck_with_extra_regexes():
+    check = WebsiteCheck.with_validation("https://example.com", "Example", ["Domain", "[a-z]+"])
+
+    assert check.all_regexes() == ["Example", "Domain", "[a-z]+"]
+    assert WebsiteCheck.with_validation("https://example.com", "Example").all_regexes() == ["Example"]
+    assert WebsiteCheck.with_validation("https://example.com").all_regexes() == []
+
+    check_scheduled = WebsiteCheckScheduled.with_check(check, 60)
+    assert check_scheduled.extra_regexes == ["Domain", "[a-z]+"]
+
+    # Empty extra regexes are the same as none
+    assert WebsiteCheck.with_validation("https://example.com", "Example", []).extra_regexes is None
+
+    with pytest.raises(ValueError):
+        WebsiteCheck.with_validation("https://example.com", None, ["Domain"])
+
+    with pytest.raises(ValueError):
+        WebsiteCheck.with_validation("https://example.com", "Example", ["*"])
+
+
+def test_CheckResult_with_extra_regex_matches():
+    check = WebsiteCheck.with_validation("https://example.com", "Example", ["Domain", "Other"])
+
+    def result(regex_match, extra_regex_matches) -> CheckResult:
+        return CheckResult.response(check, get_utcnow(), 0.1, 200, regex_match, extra_regex_matches)
+
+    assert result("Example", ["Domain", True]).is_success()
+    assert not result("Example", ["Domain", False]).is_success()
+    assert not result(False, ["Domain", True]).is_success()
+    assert not result("Example", ["Domain", None]).is_success()
+
+    assert result("Example", ["Domain", False]).extra_regex_matches_to_bool_or_none() == [True, False]
+
+    with pytest.raises(ValueError):
+        result("Example", ["Domain"])  # one match per extra regex
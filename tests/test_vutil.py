@@ -1,6 +1,7 @@
 import pytest
 from fastchecks.vutil import (
     validated_parsed_bool_answer,
+    validated_choice,
     validate_regex,
     validated_web_url,
     validate_url,
@@ -21,6 +22,12 @@ def test_validated_parsed_bool_answer_basic():
         fun("This is not booleable")
 
 
+def test_validated_choice():
+    assert validated_choice("FC_OVERRUN_POLICY", "skip", ("skip", "coalesce")) == "skip"
+    with pytest.raises(ValueError):
+        validated_choice("FC_OVERRUN_POLICY", "unknown", ("skip", "coalesce"))
+
+
 def test_validated_web_url():
     fun = validated_web_url
 
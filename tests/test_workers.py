@@ -0,0 +1,54 @@
+import asyncio
+import sys
+
+import pytest
+
+from fastchecks.workers import WorkersSupervisor
+
+
+class FakeWorkersSupervisor(WorkersSupervisor):
+    """Its workers run the given python code (with the shard as argument) instead of the checks."""
+
+    def __init__(self, code: str, num_workers: int, **kwargs) -> None:
+        super().__init__([], num_workers, **kwargs)
+        self.code = code
+        self.started: list[str] = []
+
+    def worker_command(self, index: int) -> list[str]:
+        self.started.append(f"{index}/{self.num_workers}")
+        return [sys.executable, "-c", self.code, f"{index}/{self.num_workers}"]
+
+
+async def run_for(supervisor: WorkersSupervisor, seconds: float) -> None:
+    task = asyncio.create_task(supervisor.run_until_stopped())
+    await asyncio.sleep(seconds)
+    supervisor.stop()
+    await task
+
+
+@pytest.mark.asyncio
+async def test_crashed_workers_are_restarted():
+    supervisor = FakeWorkersSupervisor(
+        "import sys; sys.exit(1)", num_workers=2, restart_delay_seconds=0.1, max_restart_delay_seconds=0.4
+    )
+    await run_for(supervisor, 1.5)
+
+    assert supervisor.restarts >= 4
+    assert set(supervisor.started) == {"0/2", "1/2"}
+
+
+@pytest.mark.asyncio
+async def test_workers_are_resharded_when_resized_and_stopped():
+    supervisor = FakeWorkersSupervisor("import time; time.sleep(60)", num_workers=2, stop_timeout_seconds=5)
+    task = asyncio.create_task(supervisor.run_until_stopped())
+
+    await asyncio.sleep(0.5)
+    supervisor.resize(3)
+    await asyncio.sleep(0.5)
+
+    async with asyncio.timeout(5):
+        supervisor.stop()
+        await task
+
+    assert supervisor.restarts == 0
+    assert sorted(supervisor.started) == ["0/2", "0/3", "1/2", "1/3", "2/3"]